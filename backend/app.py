@@ -3,33 +3,101 @@ FastAPI Backend for Document Workflow Tool
 Handles file uploads, table extraction, and downloads
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Request, Query, Header
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import Awaitable, Callable, List, Dict, Optional
+from contextlib import asynccontextmanager
 import tempfile
-import shutil
 import os
 import json
+import time
 import uuid
+import zipfile
 from pathlib import Path
 import logging
 
+import anyio
+
 # Import our table extractor - FIXED IMPORT
-from extractor import TableExtractor
+from extractor import TableExtractor, DEFAULT_MEMORY_BUDGET
+from extraction_pool import ExtractionPool, ExtractionQueueFull, close_iterator
+from jobs import JobStore, JobRunner, CompletedJobsView, COMPLETED, FAILED
+from result_cache import ResultCache
+from table_format import COMPACT, LEGACY, TABLE_FORMATS, format_result, to_legacy
+from serialization import encode_response, DEFAULT_COMPRESS_MIN_BYTES
+from table_store import TableStore
+from table_spill import TableSpill, close_tables
+from zip_stream import iter_zip
+from artifact_cache import ArtifactCache, etag_matches
+from bounded_cache import BoundedCache
+from state_store import open_state
+from janitor import Janitor
+from upload_store import (UploadStore, UploadTooLarge, UploadSizeLimit, ChunkRejected, OffsetMismatch,
+                          ChecksumMismatch, DEFAULT_MAX_BYTES)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Local state (job database etc.) lives under DATA_DIR
+DATA_DIR = Path(os.getenv("DATA_DIR", Path(tempfile.gettempdir()) / "document_workflow"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+EXTRACT_MEMORY_BUDGET = int(os.getenv("EXTRACT_MEMORY_BUDGET", DEFAULT_MEMORY_BUDGET))
+# Upper bound on the processes one parallel PDF extraction may use, whatever the client asks for
+MAX_PDF_WORKERS = max(1, int(os.getenv("MAX_PDF_WORKERS", os.cpu_count() or 1)))
+
+# Initialize table extractor; repeat extractions of the same document come from the result cache
+result_cache = ResultCache(DATA_DIR / "result_cache.sqlite3", max_bytes=RESULT_CACHE_MAX_BYTES)
+extractor = TableExtractor(result_cache=result_cache, memory_budget=EXTRACT_MEMORY_BUDGET,
+                           spill_dir=DATA_DIR / "spill", max_workers=MAX_PDF_WORKERS)
+
+# Columnar copies of extracted tables for windowed reads
+TABLE_WINDOW_MAX_ROWS = int(os.getenv("TABLE_WINDOW_MAX_ROWS", 10000))
+table_store = TableStore(DATA_DIR / "tables")
+
+# Durable extraction jobs; completed jobs double as the extraction cache.
+# Low-memory jobs hand their spilled tables straight to the table store.
+job_store = JobStore(DATA_DIR / "jobs.sqlite3")
+job_runner = JobRunner(job_store, extractor, workers=JOB_WORKERS, table_sink=table_store.put)
+
+# Rendered downloads; bump ARTIFACT_VERSION whenever their content changes
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+ARTIFACT_VERSION = "1"
+artifact_cache = ArtifactCache(DATA_DIR / "artifacts", max_bytes=ARTIFACT_CACHE_MAX_BYTES)
+
+# Uploaded documents, stored once per SHA-256 so duplicate uploads share a file
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", DATA_DIR / "uploads"))
+MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", DEFAULT_MAX_BYTES))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+upload_store = UploadStore(UPLOAD_DIR, max_bytes=MAX_FILE_SIZE, chunk_size=UPLOAD_CHUNK_SIZE)
+ALLOWED_EXTENSIONS = ('.pdf', '.docx', '.doc')
+# Uploads up to this size can be extracted in one request, from memory, without being stored
+INLINE_EXTRACT_MAX_BYTES = int(os.getenv("INLINE_EXTRACT_MAX_BYTES", 8 * 1024 * 1024))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_runner.start()
+    janitor.start()
+    yield
+    janitor.stop()
+    job_runner.stop()
+    extractor.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Document Workflow API",
     description="API for extracting tables from PDF and DOCX documents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Oversized uploads are refused before their body is read, not after it has been spooled
+app.add_middleware(UploadSizeLimit, store=upload_store, paths=("/upload", "/extract/upload"))
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -39,29 +107,148 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize table extractor
-extractor = TableExtractor()
+# Extractions run on a dedicated pool so large documents don't block the event loop
+EXTRACT_MAX_CONCURRENCY = int(os.getenv("EXTRACT_MAX_CONCURRENCY", os.cpu_count() or 2))
+EXTRACT_MAX_QUEUE = int(os.getenv("EXTRACT_MAX_QUEUE", 8))
+EXTRACT_RETRY_AFTER = int(os.getenv("EXTRACT_RETRY_AFTER", 5))
+# Result bodies at least this large are gzip/zstd compressed when the client accepts it
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", DEFAULT_COMPRESS_MIN_BYTES))
+extraction_pool = ExtractionPool(EXTRACT_MAX_CONCURRENCY, EXTRACT_MAX_QUEUE)
+
+def server_busy(exc: ExtractionQueueFull) -> HTTPException:
+    """503 response telling the client when to retry a rejected extraction"""
+    logger.warning(f"Rejecting extraction: {exc}")
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy extracting other documents. Please retry later.",
+        headers={"Retry-After": str(EXTRACT_RETRY_AFTER)}
+    )
 
 # Pydantic models for request/response
 class ExtractionResponse(BaseModel):
     extraction_id: str
+    file_id: Optional[str] = None  # None when extracted from memory by /extract/upload
     tables: List[Dict]
     file_name: str
     status: str
     extraction_method: Optional[str] = None
+    page_engines: Optional[Dict[str, str]] = None  # PDF page number -> engine
+    engine_errors: Optional[List[str]] = None  # Engines that failed; such results are not cached
     error: Optional[str] = None
 
+# Table download formats: media type and compression inside a ZIP (Parquet is already compressed)
+TABLE_DOWNLOAD_FORMATS = {
+    "csv": ("text/csv", zipfile.ZIP_DEFLATED),
+    "parquet": ("application/vnd.apache.parquet", zipfile.ZIP_STORED),
+    "arrow": ("application/vnd.apache.arrow.file", zipfile.ZIP_DEFLATED)
+}
+
 class DownloadRequest(BaseModel):
     extraction_id: str
-    format: str  # 'csv' or 'json'
+    format: str  # 'csv', 'json', 'parquet' or 'arrow'
     table_id: Optional[str] = None  # For specific table download
+    table_format: str = LEGACY  # Shape of the tables in a json download: 'compact' or 'legacy'
+
+class UploadSessionRequest(BaseModel):
+    filename: str
+    size: int = Field(gt=0)  # Total bytes the client will send
+
+class CompleteUploadRequest(BaseModel):
+    sha256: Optional[str] = None  # Checked against the assembled file when given
 
 class ExtractRequest(BaseModel):
     file_id: str
+    parallel: bool = False  # Split PDF pages across a process pool
+    workers: Optional[int] = Field(None, ge=1, le=MAX_PDF_WORKERS)  # Defaults to MAX_PDF_WORKERS
+    chunk_size: Optional[int] = None  # Pages per worker task
+    low_memory: bool = False  # Bound memory for very large PDFs
+    table_format: str = COMPACT  # Shape of the returned tables: 'compact' or 'legacy'
+
+    def extraction_options(self) -> Dict:
+        return {
+            "parallel": self.parallel,
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "low_memory": self.low_memory
+        }
 
-# In-memory storage for demo (use Redis/DB in production)
-extraction_cache = {}
-temp_files = {}
+def encode_result(http_request: Request, content: Dict):
+    """Extraction result as JSON, MessagePack or Arrow IPC depending on the Accept header"""
+    return encode_response(http_request, content, min_bytes=RESPONSE_COMPRESS_MIN_BYTES)
+
+async def result_response(http_request: Request, content: Dict):
+    """Encode a result in a worker thread; serializing and compressing a large one would stall the event loop"""
+    return await run_in_threadpool(encode_result, http_request, content)
+
+class CleanupStreamingResponse(StreamingResponse):
+    """Streaming response that runs ``cleanup`` once it is done with the client
+
+    Unlike a background task, ``cleanup`` also runs when the client went away
+    before or during the stream, so whatever the stream holds is always given back.
+    """
+
+    def __init__(self, content, cleanup: Callable[[], Awaitable[None]], **kwargs):
+        super().__init__(content, **kwargs)
+        self.cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.cleanup()
+
+def check_table_format(table_format: str):
+    if table_format not in TABLE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid table format. Use one of: {', '.join(TABLE_FORMATS)}.")
+
+# Upload records live in the state backend: 'sqlite' shares them between every
+# worker process on the host, 'memory' keeps them in this process only
+STATE_BACKEND = os.getenv("STATE_BACKEND", "sqlite")
+state = open_state(STATE_BACKEND, DATA_DIR)
+
+# Recently used extraction results and upload records are kept in memory up to
+# a byte ceiling and TTL; everything is also in the job store or state backend
+# and reloaded from there after eviction
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("MEMORY_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+MEMORY_CACHE_TTL = float(os.getenv("MEMORY_CACHE_TTL", 3600))
+extraction_cache = BoundedCache(CompletedJobsView(job_store), max_bytes=MEMORY_CACHE_MAX_BYTES,
+                                ttl=MEMORY_CACHE_TTL, revalidate=state.shared)
+temp_files = BoundedCache(state.namespace("uploads"), max_bytes=16 * 1024 * 1024,
+                          ttl=MEMORY_CACHE_TTL, revalidate=state.shared)
+
+def release_upload(file_id: str) -> bool:
+    """Forget an upload, deleting its stored file unless another upload shares it"""
+    file_info = temp_files.pop(file_id)
+    if any(info["path"] == file_info["path"] for info in temp_files.values()):
+        return False
+    return upload_store.delete(file_info["path"])
+
+def delete_extraction(extraction_id: str) -> int:
+    """Drop the tables and downloads kept for an extraction, returning the table bytes freed"""
+    extraction_cache.invalidate(extraction_id)
+    freed = table_store.size(extraction_id)
+    table_store.delete(extraction_id)
+    artifact_cache.delete_extraction(extraction_id)
+    return freed
+
+# Periodic cleanup: upload records and finished jobs expire after their TTL, and
+# stored documents nothing refers to are evicted (oldest first) past the quota
+JANITOR_INTERVAL = float(os.getenv("JANITOR_INTERVAL", 300))
+UPLOAD_TTL = float(os.getenv("UPLOAD_TTL", 24 * 3600))
+RESULT_TTL = float(os.getenv("RESULT_TTL", 7 * 24 * 3600))
+UPLOAD_DISK_QUOTA = int(os.getenv("UPLOAD_DISK_QUOTA", 10 * 1024 * 1024 * 1024))
+janitor = Janitor(
+    upload_store, temp_files, job_store, delete_extraction,
+    upload_ttl=UPLOAD_TTL, result_ttl=RESULT_TTL, quota_bytes=UPLOAD_DISK_QUOTA,
+    scratch=[
+        (DATA_DIR / "spill", "spill_*"),
+        (UPLOAD_DIR, "*.part"),
+        (DATA_DIR / "artifacts", "*.part"),
+        (DATA_DIR / "tables", ".*.tmp")
+    ],
+    interval=JANITOR_INTERVAL
+)
 
 @app.get("/")
 async def root():
@@ -69,13 +256,59 @@ async def root():
     return {
         "message": "Document Workflow API is running",
         "version": "1.0.0",
-        "endpoints": ["/upload", "/extract", "/download", "/docs"]
+        "endpoints": ["/upload", "/uploads", "/extract", "/extract/upload", "/jobs", "/download", "/docs"]
     }
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/stats")
+async def get_stats():
+    """Runtime statistics for the extraction pool and caches"""
+    return {
+        "extraction_pool": extraction_pool.stats(),
+        "result_cache": result_cache.stats(),
+        "artifact_cache": artifact_cache.stats(),
+        "extraction_cache": extraction_cache.stats(),
+        "upload_index": temp_files.stats(),
+        "janitor": janitor.stats()
+    }
+
+def check_file_type(filename: str) -> str:
+    """Extension of an uploaded file name, rejecting unsupported types"""
+    file_extension = Path(filename).suffix.lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type: {file_extension}. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+    return file_extension
+
+def register_upload(filename: str, stored: Dict) -> Dict:
+    """Track a stored document under a new file ID and build the upload response"""
+    file_id = str(uuid.uuid4())
+
+    temp_files[file_id] = {
+        "path": stored["path"],
+        "original_name": filename,
+        "size": stored["size"],
+        "extension": Path(stored["path"]).suffix,
+        "sha256": stored["sha256"],
+        "uploaded_at": time.time()
+    }
+
+    logger.info(f"File uploaded successfully: {filename} -> {file_id}")
+
+    return {
+        "file_id": file_id,
+        "filename": filename,
+        "size": stored["size"],  # Return as integer
+        "sha256": stored["sha256"],
+        "duplicate": stored["duplicate"],
+        "status": "uploaded"
+    }
+
 @app.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
     """
@@ -83,57 +316,141 @@ async def upload_file(file: UploadFile = File(...)):
     Returns upload confirmation with file ID
     """
     try:
-        # Validate file type
-        allowed_extensions = {'.pdf', '.docx', '.doc'}
-        file_extension = Path(file.filename).suffix.lower()
-
-        if file_extension not in allowed_extensions:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Unsupported file type: {file_extension}. Allowed: {', '.join(allowed_extensions)}"
-            )
+        file_extension = check_file_type(file.filename)
 
-        # Generate unique file ID
-        file_id = str(uuid.uuid4())
+        # Stream to the content-addressed store, hashing as we go
+        stored = await upload_store.save(file, file_extension)
+        return register_upload(file.filename, stored)
 
-        # Create temporary file
-        temp_file = tempfile.NamedTemporaryFile(
-            delete=False, 
-            suffix=file_extension,
-            prefix=f"upload_{file_id}_"
-        )
+    except HTTPException:
+        raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.error(f"Upload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
+
+def upload_session(upload_id: str) -> Dict:
+    status = upload_store.status(upload_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Upload not found.")
+    return status
+
+def chunk_rejected(exc: ChunkRejected) -> HTTPException:
+    """409 for out-of-order chunks (with the offset to resume at), 422 for corrupt data"""
+    if isinstance(exc, OffsetMismatch):
+        return HTTPException(status_code=409, detail=str(exc), headers={"Upload-Offset": str(exc.offset)})
+    if isinstance(exc, ChecksumMismatch):
+        return HTTPException(status_code=422, detail=str(exc))
+    return HTTPException(status_code=409, detail=str(exc))
+
+@app.post("/uploads")
+async def begin_upload(request: UploadSessionRequest):
+    """
+    Start a resumable upload; send the file with PUT /uploads/{upload_id}
+    """
+    file_extension = check_file_type(request.filename)
+    try:
+        session = upload_store.begin(request.filename, file_extension, request.size)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-        # Copy uploaded file content to temporary file
-        shutil.copyfileobj(file.file, temp_file)
-        temp_file.close()
+    logger.info(f"Started resumable upload {session['upload_id']} for: {request.filename}")
+    return session
 
-        # Store file info
-        temp_files[file_id] = {
-            "path": temp_file.name,
-            "original_name": file.filename,
-            "size": os.path.getsize(temp_file.name),
-            "extension": file_extension
-        }
+@app.get("/uploads/{upload_id}")
+async def get_upload(upload_id: str):
+    """
+    Progress of a resumable upload; ``offset`` is where the next chunk starts
+    """
+    return upload_session(upload_id)
 
-        logger.info(f"File uploaded successfully: {file.filename} -> {file_id}")
+@app.put("/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, http_request: Request, offset: int = Query(..., ge=0),
+                       x_chunk_sha256: str = Header(...)):
+    """
+    Append the request body at ``offset`` after checking it against X-Chunk-SHA256
+    """
+    try:
+        status = await upload_store.write_chunk(upload_id, offset, http_request.stream(), x_chunk_sha256)
+    except ChunkRejected as e:
+        raise chunk_rejected(e)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    if status is None:
+        raise HTTPException(status_code=404, detail="Upload not found.")
+    return status
+
+@app.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str, request: Optional[CompleteUploadRequest] = None):
+    """
+    Finish a resumable upload; the file can then be extracted like any other upload
+    """
+    try:
+        stored = await run_in_threadpool(upload_store.finish, upload_id, request.sha256 if request else None)
+    except ChunkRejected as e:
+        raise chunk_rejected(e)
 
-        return {
-            "file_id": file_id,
-            "filename": file.filename,
-            "size": temp_files[file_id]['size'],  # Return as integer
-            "status": "uploaded"
-        }
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Upload not found.")
+    return register_upload(stored["filename"], stored)
 
-    except Exception as e:
-        logger.error(f"Upload error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
+@app.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str):
+    """
+    Discard a resumable upload and the data received so far
+    """
+    if not upload_store.abort(upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found.")
+    return {"message": f"Upload {upload_id} aborted"}
+
+def read_spill(extraction_result: Dict) -> List[Dict]:
+    """Every table of a low-memory result, removing its spill"""
+    try:
+        return list(extraction_result["tables"])
+    finally:
+        close_tables(extraction_result)
+
+async def extraction_response(http_request: Request, extraction_result: Dict, file_id: Optional[str],
+                              file_name: str, table_format: str):
+    """Keep an extraction result under a new extraction ID and build the /extract response"""
+    extraction_id = str(uuid.uuid4())
+
+    if isinstance(extraction_result.get("tables"), TableSpill):
+        # The response carries every table anyway, so read the spill back once, off the event loop
+        extraction_result = {**extraction_result, "tables": await run_in_threadpool(read_spill, extraction_result)}
+
+    # Recording serializes the whole result into the job store, so keep it off the event loop
+    await run_in_threadpool(extraction_cache.__setitem__, extraction_id, {
+        **extraction_result,
+        "file_id": file_id,
+        "extraction_id": extraction_id
+    })
+
+    logger.info(f"Extraction completed. Found {len(extraction_result.get('tables', []))} tables")
+
+    # Tables are passed through as-is rather than validated against ExtractionResponse
+    return await result_response(http_request, {
+        "extraction_id": extraction_id,
+        "file_id": file_id,
+        "tables": format_result(extraction_result, table_format).get("tables", []),
+        "file_name": extraction_result.get("file_name", file_name),
+        "status": extraction_result.get("status", "unknown"),
+        "extraction_method": extraction_result.get("extraction_method"),
+        "page_engines": extraction_result.get("page_engines"),
+        "engine_errors": extraction_result.get("engine_errors"),
+        "error": extraction_result.get("error")
+    })
 
 @app.post("/extract", response_model=ExtractionResponse)
-async def extract_tables(request: ExtractRequest):
+async def extract_tables(request: ExtractRequest, http_request: Request):
     """Extract tables from uploaded document"""
     file_id = request.file_id
 
     try:
+        check_table_format(request.table_format)
+
         if file_id not in temp_files:
             raise HTTPException(status_code=404, detail="File not found. Please upload file first.")
 
@@ -142,109 +459,300 @@ async def extract_tables(request: ExtractRequest):
 
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail="File no longer exists on server.")
+        upload_store.touch(file_path)
 
         logger.info(f"Starting extraction for file: {file_info['original_name']}")
 
-        extraction_result = extractor.extract_tables(file_path)
-        extraction_id = str(uuid.uuid4())
-
-        extraction_cache[extraction_id] = {
-            **extraction_result,
-            "file_id": file_id,
-            "extraction_id": extraction_id
-        }
-
-        logger.info(f"Extraction completed. Found {len(extraction_result.get('tables', []))} tables")
-
-        return ExtractionResponse(
-            extraction_id=extraction_id,
-            tables=extraction_result.get("tables", []),
-            file_name=extraction_result.get("file_name", file_info["original_name"]),
-            status=extraction_result.get("status", "unknown"),
-            extraction_method=extraction_result.get("extraction_method"),
-            error=extraction_result.get("error")
+        extraction_result = await extraction_pool.run(
+            extractor.extract_tables,
+            file_path,
+            content_hash=file_info.get("sha256"),
+            **request.extraction_options()
         )
+        return await extraction_response(http_request, extraction_result, file_id, file_info["original_name"],
+                                   request.table_format)
 
     except HTTPException:
         raise
+    except ExtractionQueueFull as e:
+        raise server_busy(e)
     except Exception as e:
         logger.error(f"Extraction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Table extraction failed: {str(e)}")
 
 @app.get("/extract/{file_id}")
-async def extract_tables_get(file_id: str):
+async def extract_tables_get(file_id: str, http_request: Request, parallel: bool = False,
+                             workers: Optional[int] = Query(None, ge=1, le=MAX_PDF_WORKERS),
+                             chunk_size: Optional[int] = None,
+                             low_memory: bool = False, table_format: str = COMPACT):
     """
     Alternative GET endpoint for extraction (for easier testing)
     """
-    request = ExtractRequest(file_id=file_id)
-    return await extract_tables(request)
+    request = ExtractRequest(
+        file_id=file_id,
+        parallel=parallel,
+        workers=workers,
+        chunk_size=chunk_size,
+        low_memory=low_memory,
+        table_format=table_format
+    )
+    return await extract_tables(request, http_request)
+
+@app.post("/extract/upload")
+async def upload_and_extract(http_request: Request, file: UploadFile = File(...), parallel: bool = False,
+                             workers: Optional[int] = Query(None, ge=1, le=MAX_PDF_WORKERS),
+                             chunk_size: Optional[int] = None,
+                             low_memory: bool = False, table_format: str = COMPACT):
+    """
+    Upload a document and extract its tables in one request
+
+    Documents up to INLINE_EXTRACT_MAX_BYTES are extracted straight from memory
+    and not kept. Larger ones are stored as by /upload first, and the response
+    then carries their file_id.
+    """
+    try:
+        check_table_format(table_format)
+        file_extension = check_file_type(file.filename)
+        options = {"parallel": parallel, "workers": workers, "chunk_size": chunk_size, "low_memory": low_memory}
+
+        data = await file.read(INLINE_EXTRACT_MAX_BYTES + 1)
+        if len(data) <= INLINE_EXTRACT_MAX_BYTES:
+            file_id = None
+            extraction_result = await extraction_pool.run(
+                extractor.extract_tables, data, file_name=file.filename, **options
+            )
+        else:
+            del data
+            await file.seek(0)
+            stored = await upload_store.save(file, file_extension)
+            file_id = register_upload(file.filename, stored)["file_id"]
+            extraction_result = await extraction_pool.run(
+                extractor.extract_tables, stored["path"], content_hash=stored["sha256"], **options
+            )
+
+        return await extraction_response(http_request, extraction_result, file_id, file.filename, table_format)
+
+    except HTTPException:
+        raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ExtractionQueueFull as e:
+        raise server_busy(e)
+    except Exception as e:
+        logger.error(f"Extraction error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Table extraction failed: {str(e)}")
+
+@app.get("/extract/{file_id}/stream")
+async def extract_tables_stream(file_id: str, parallel: bool = False,
+                                workers: Optional[int] = Query(None, ge=1, le=MAX_PDF_WORKERS),
+                                chunk_size: Optional[int] = None,
+                                low_memory: bool = False, table_format: str = COMPACT):
+    """
+    Stream extracted tables as newline-delimited JSON as each page finishes
+    """
+    check_table_format(table_format)
+
+    if file_id not in temp_files:
+        raise HTTPException(status_code=404, detail="File not found. Please upload file first.")
+
+    file_info = temp_files[file_id]
+    file_path = file_info["path"]
+
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="File no longer exists on server.")
+    upload_store.touch(file_path)
+
+    try:
+        extraction_pool.acquire()
+    except ExtractionQueueFull as e:
+        raise server_busy(e)
+
+    # Nothing is read until the stream first asks for a table
+    tables = extractor.iter_tables(file_path, parallel=parallel, workers=workers,
+                                   chunk_size=chunk_size, low_memory=low_memory)
+
+    async def table_lines():
+        try:
+            async for table in extraction_pool.iterate(tables):
+                if table_format != COMPACT:
+                    table = to_legacy(table)
+                yield json.dumps(table, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming extraction error: {str(e)}")
+            yield json.dumps({"status": "failed", "error": str(e)}) + "\n"
+
+    async def finish():
+        # Closing the generator releases the document and any pool workers, however
+        # the response ended; that can block, so it happens off the event loop
+        try:
+            await run_in_threadpool(close_iterator, tables)
+        finally:
+            extraction_pool.release()
+
+    logger.info(f"Streaming extraction for file: {file_info['original_name']}")
+    return CleanupStreamingResponse(table_lines(), cleanup=finish, media_type="application/x-ndjson")
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: ExtractRequest):
+    """
+    Queue an extraction job and return its ID immediately
+    """
+    if request.file_id not in temp_files:
+        raise HTTPException(status_code=404, detail="File not found. Please upload file first.")
+
+    file_info = temp_files[request.file_id]
+    upload_store.touch(file_info["path"])
+    job = job_runner.submit(
+        request.file_id,
+        file_info["path"],
+        file_info["original_name"],
+        {**request.extraction_options(), "content_hash": file_info.get("sha256")}
+    )
+
+    logger.info(f"Queued extraction job {job['job_id']} for file: {file_info['original_name']}")
+    return job
+
+@app.get("/jobs")
+async def list_jobs(status: Optional[str] = None):
+    """
+    List extraction jobs, optionally filtered by status
+    """
+    return {"jobs": job_store.list(status)}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get job status and progress
+    """
+    job = job_store.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, http_request: Request, table_format: str = COMPACT):
+    """
+    Get the extraction result of a completed job
+    """
+    check_table_format(table_format)
+    job = job_store.get(job_id, include_result=True)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=422, detail=f"Job failed: {job['error']}")
+    if job["status"] != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}.")
+    return await result_response(http_request, format_result(job["result"], table_format))
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """
+    Delete a job and its result
+    """
+    if not job_store.delete(job_id):
+        raise HTTPException(status_code=404, detail="Job not found.")
+    delete_extraction(job_id)
+    return {"message": f"Deleted job {job_id}."}
+
+def download_manifest(extraction_id: str, extraction_data: Dict, download_format: str) -> bytes:
+    """manifest.json describing every table file in a ZIP download"""
+    manifest = {
+        "extraction_id": extraction_id,
+        "file_name": extraction_data.get("file_name"),
+        "format": download_format,
+        "tables": [
+            {
+                "table_id": table["table_id"],
+                "file": f"{table['table_id']}.{download_format}",
+                "page": table.get("page"),
+                "source": table.get("source"),
+                "engine": table.get("engine"),
+                "headers": table["headers"],
+                "rows": table["shape"][0],
+                "columns": table["shape"][1]
+            }
+            for table in extraction_data.get("tables", [])
+        ]
+    }
+    return json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8")
+
+def render_download(extraction_id: str, extraction_data: Dict, download_format: str,
+                    table_id: Optional[str] = None, table_format: str = LEGACY) -> tuple:
+    """(byte chunks, media type, filename) of a download; tables are encoded as the chunks are read"""
+    tables = extraction_data.get("tables", [])
+
+    if not tables:
+        raise HTTPException(status_code=404, detail="No tables found in extraction.")
+
+    if download_format == "json":
+        content = json.dumps(format_result(extraction_data, table_format), indent=2,
+                             ensure_ascii=False).encode("utf-8")
+        return iter([content]), "application/json", "extraction_result.json"
+
+    if download_format not in TABLE_DOWNLOAD_FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format. Use 'csv', 'json', 'parquet' or 'arrow'.")
+
+    media_type, compression = TABLE_DOWNLOAD_FORMATS[download_format]
+
+    if table_id:
+        # Find specific table
+        target_table = next((t for t in tables if t.get("table_id") == table_id), None)
+        if not target_table:
+            raise HTTPException(status_code=404, detail=f"Table {table_id} not found.")
+        tables = [target_table]
+
+    if len(tables) == 1:
+        # Single file download
+        return (extractor.iter_export(tables[0], download_format), media_type,
+                f"{tables[0]['table_id']}.{download_format}")
+
+    # Multiple files - each table is encoded and compressed into the ZIP in turn
+    entries = [("manifest.json",
+                iter([download_manifest(extraction_id, extraction_data, download_format)]),
+                zipfile.ZIP_DEFLATED)]
+    entries += [
+        (f"{table['table_id']}.{download_format}", extractor.iter_export(table, download_format), compression)
+        for table in tables
+    ]
+    return iter_zip(entries), "application/zip", f"extracted_tables_{download_format}.zip"
 
 @app.post("/download")
-async def download_tables(request: DownloadRequest):
+async def download_tables(request: DownloadRequest, http_request: Request):
     """
-    Download extracted tables as CSV or JSON
+    Download extracted tables as CSV, JSON, Parquet or Arrow
+
+    Several tables come as a ZIP with a manifest.json. Rendered files are
+    cached per extraction, format and table and carry a strong ETag, so
+    repeat downloads are served from disk or answered with 304.
     """
     try:
         # Validate extraction ID
         if request.extraction_id not in extraction_cache:
             raise HTTPException(status_code=404, detail="Extraction not found.")
-        
-        extraction_data = extraction_cache[request.extraction_id]
-        tables = extraction_data.get("tables", [])
-        
-        if not tables:
-            raise HTTPException(status_code=404, detail="No tables found in extraction.")
-        
-        # Create temporary directory for downloads
-        download_dir = tempfile.mkdtemp(prefix="download_")
-        
-        try:
-            if request.format.lower() == "csv":
-                # Export specific table or all tables to CSV
-                if request.table_id:
-                    # Find specific table
-                    target_table = next((t for t in tables if t.get("table_id") == request.table_id), None)
-                    if not target_table:
-                        raise HTTPException(status_code=404, detail=f"Table {request.table_id} not found.")
-                    tables_to_export = [target_table]
-                else:
-                    tables_to_export = tables
-                
-                csv_files = extractor.export_to_csv(tables_to_export, download_dir)
-                
-                if len(csv_files) == 1:
-                    # Single file download
-                    return FileResponse(
-                        csv_files[0],
-                        media_type="text/csv",
-                        filename=Path(csv_files[0]).name
-                    )
-                else:
-                    # Multiple files - create ZIP (simplified: return first file for demo)
-                    return FileResponse(
-                        csv_files[0],
-                        media_type="text/csv",
-                        filename="extracted_tables.csv"
-                    )
-                    
-            elif request.format.lower() == "json":
-                # Export to JSON
-                json_path = Path(download_dir) / "extraction_result.json"
-                extractor.export_to_json(extraction_data, json_path)
-                
-                return FileResponse(
-                    json_path,
-                    media_type="application/json",
-                    filename="extraction_result.json"
-                )
-                
-            else:
-                raise HTTPException(status_code=400, detail="Invalid format. Use 'csv' or 'json'.")
-                
-        except Exception as e:
-            # Clean up download directory
-            shutil.rmtree(download_dir, ignore_errors=True)
-            raise
+
+        check_table_format(request.table_format)
+        download_format = request.format.lower()
+        # Only the json download carries tables in either shape
+        table_format = request.table_format if download_format == "json" else None
+        cache_key = artifact_cache.make_key(request.extraction_id, download_format, request.table_id,
+                                            {"version": ARTIFACT_VERSION, "table_format": table_format})
+
+        def render():
+            return render_download(request.extraction_id, extraction_cache[request.extraction_id],
+                                   download_format, request.table_id, request.table_format)
+
+        artifact = await run_in_threadpool(artifact_cache.get_or_render, cache_key, request.extraction_id, render)
+
+        headers = {"ETag": artifact["etag"]}
+        if etag_matches(http_request.headers.get("if-none-match"), artifact["etag"]):
+            return Response(status_code=304, headers=headers)
+
+        return FileResponse(
+            artifact["path"],
+            media_type=artifact["media_type"],
+            filename=artifact["filename"],
+            headers=headers
+        )
             
     except HTTPException:
         raise
@@ -253,43 +761,114 @@ async def download_tables(request: DownloadRequest):
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
 
 @app.get("/download/{extraction_id}/{format}")
-async def download_tables_get(extraction_id: str, format: str, table_id: Optional[str] = None):
+async def download_tables_get(extraction_id: str, format: str, http_request: Request,
+                              table_id: Optional[str] = None, table_format: str = LEGACY):
     """
     Alternative GET endpoint for downloads
     """
     request = DownloadRequest(
         extraction_id=extraction_id,
         format=format,
-        table_id=table_id
+        table_id=table_id,
+        table_format=table_format
     )
-    return await download_tables(request)
+    return await download_tables(request, http_request)
 
 @app.get("/extractions")
 async def list_extractions():
     """
     List all cached extractions (for debugging)
     """
+    # Built from the job rows alone, without decoding any stored result
     return {
         "extractions": [
             {
-                "extraction_id": eid,
-                "file_name": data.get("file_name", "unknown"),
-                "status": data.get("status", "unknown"),
-                "table_count": len(data.get("tables", []))
+                "extraction_id": job["job_id"],
+                "file_name": job["file_name"] or "unknown",
+                # Failed extractions are never completed, so the table count settles the status
+                "status": "success" if job["table_count"] else "no_tables_found",
+                "table_count": job["table_count"] or 0
             }
-            for eid, data in extraction_cache.items()
+            for job in await run_in_threadpool(job_store.list, COMPLETED)
         ]
     }
 
 @app.get("/extractions/{extraction_id}")
-async def get_extraction(extraction_id: str):
+async def get_extraction(extraction_id: str, http_request: Request, table_format: str = COMPACT):
     """
     Get specific extraction details
     """
+    check_table_format(table_format)
     if extraction_id not in extraction_cache:
         raise HTTPException(status_code=404, detail="Extraction not found.")
     
-    return extraction_cache[extraction_id]
+    return await result_response(http_request, format_result(extraction_cache[extraction_id], table_format))
+
+@app.get("/extractions/{extraction_id}/tables/{table_id}")
+def get_table_window(extraction_id: str, table_id: str, http_request: Request,
+                     offset: int = Query(0, ge=0),
+                     limit: int = Query(100, ge=1, le=TABLE_WINDOW_MAX_ROWS),
+                     columns: Optional[List[str]] = Query(None),
+                     where: Optional[List[str]] = Query(None),
+                     table_format: str = COMPACT):
+    """
+    Get a window of rows from one table, optionally projecting columns and filtering rows
+
+    ``where`` takes ``column:op:value`` filters (op: eq, ne, contains, gt, ge, lt, le).
+    """
+    check_table_format(table_format)
+
+    # Tables are copied into the columnar store the first time any of them is read
+    if not table_store.has(extraction_id):
+        if extraction_id not in extraction_cache:
+            raise HTTPException(status_code=404, detail="Extraction not found.")
+        table_store.put(extraction_id, extraction_cache[extraction_id].get("tables", []))
+
+    try:
+        window = table_store.window(extraction_id, table_id, offset=offset, limit=limit,
+                                    columns=columns, filters=where)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if window is None:
+        raise HTTPException(status_code=404, detail=f"Table {table_id} not found.")
+
+    if table_format != COMPACT:
+        window = to_legacy(window)
+    # A plain def endpoint already runs in a worker thread
+    return encode_result(http_request, window)
+
+@app.delete("/extractions/{extraction_id}")
+async def delete_extraction_endpoint(extraction_id: str):
+    """
+    Delete an extraction with its stored tables and cached downloads
+    """
+    if extraction_id not in extraction_cache:
+        raise HTTPException(status_code=404, detail="Extraction not found.")
+    del extraction_cache[extraction_id]
+    delete_extraction(extraction_id)
+    return {"message": "Extraction deleted successfully", "extraction_id": extraction_id}
+
+@app.delete("/files/{file_id}")
+async def delete_file(file_id: str):
+    """
+    Delete an uploaded file and the finished extractions made from it
+    """
+    if file_id not in temp_files:
+        raise HTTPException(status_code=404, detail="File not found.")
+
+    extractions = [job["job_id"] for job in job_store.list(file_id=file_id)
+                   if job["status"] in (COMPLETED, FAILED)]
+    for extraction_id in extractions:
+        job_store.delete(extraction_id)
+        delete_extraction(extraction_id)
+    release_upload(file_id)
+
+    return {
+        "message": "File deleted successfully",
+        "file_id": file_id,
+        "extractions_deleted": len(extractions)
+    }
 
 @app.delete("/cleanup")
 async def cleanup_temp_files():
@@ -298,37 +877,22 @@ async def cleanup_temp_files():
     """
     cleaned_files = 0
     
-    for file_id, file_info in list(temp_files.items()):
+    for file_id in list(temp_files):
         try:
-            if os.path.exists(file_info["path"]):
-                os.unlink(file_info["path"])
+            if release_upload(file_id):
                 cleaned_files += 1
-            del temp_files[file_id]
         except Exception as e:
             logger.error(f"Error cleaning up {file_id}: {e}")
     
+    upload_store.clear_partial()
+
     # Clear extraction cache
     extraction_cache.clear()
+    table_store.clear()
+    artifact_cache.clear()
     
     return {"message": f"Cleaned up {cleaned_files} temporary files and all cached extractions."}
 
-# Background task to clean up old files periodically
-def cleanup_old_files():
-    """Background task to clean up files older than 1 hour"""
-    import time
-    
-    for file_id, file_info in list(temp_files.items()):
-        try:
-            file_path = file_info["path"]
-            if os.path.exists(file_path):
-                # Check if file is older than 1 hour
-                if time.time() - os.path.getctime(file_path) > 3600:
-                    os.unlink(file_path)
-                    del temp_files[file_id]
-                    logger.info(f"Cleaned up old file: {file_id}")
-        except Exception as e:
-            logger.error(f"Error in background cleanup: {e}")
-
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
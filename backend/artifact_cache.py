@@ -0,0 +1,247 @@
+"""
+Disk cache of rendered download artifacts (CSV, JSON, Parquet, Arrow, ZIP)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    cache_key TEXT PRIMARY KEY,
+    extraction_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    media_type TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_last_access ON artifacts (last_access);
+CREATE INDEX IF NOT EXISTS artifacts_extraction ON artifacts (extraction_id);
+"""
+
+ARTIFACT_COLUMNS = ("cache_key", "extraction_id", "path", "etag", "media_type", "filename", "size")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+class ArtifactCache:
+    """Rendered downloads stored as files, indexed in SQLite
+
+    Extractions never change once stored, so an artifact rendered for an
+    (extraction, format, table, options) key can be served again as-is. Each
+    file gets a strong ETag from its SHA-256, which is also part of its name,
+    so a file being served is never replaced with different bytes. Least
+    recently used files are evicted once the cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # cache_key -> (lock, number of threads holding or waiting for it)
+        self._key_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.root / "artifacts.sqlite3", timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def make_key(extraction_id: str, download_format: str, table_id: Optional[str], options: Dict) -> str:
+        settings = json.dumps([extraction_id, download_format, table_id, options], sort_keys=True, default=str)
+        return hashlib.sha256(settings.encode("utf-8")).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    f"SELECT {', '.join(ARTIFACT_COLUMNS)} FROM artifacts WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+                if row is not None and not Path(row["path"]).exists():
+                    conn.execute("DELETE FROM artifacts WHERE cache_key = ?", (cache_key,))
+                    row = None
+                if row is not None:
+                    conn.execute(
+                        "UPDATE artifacts SET last_access = ? WHERE cache_key = ?", (time.time(), cache_key)
+                    )
+        finally:
+            conn.close()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return dict(row)
+
+    @contextmanager
+    def _key_lock(self, cache_key: str):
+        with self._lock:
+            lock, holders = self._key_locks.get(cache_key, (threading.Lock(), 0))
+            self._key_locks[cache_key] = (lock, holders + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, holders = self._key_locks[cache_key]
+                if holders == 1:
+                    del self._key_locks[cache_key]
+                else:
+                    self._key_locks[cache_key] = (lock, holders - 1)
+
+    def get_or_render(self, cache_key: str, extraction_id: str,
+                      render: Callable[[], Tuple[Iterator[bytes], str, str]]) -> Dict:
+        """Cached artifact for a key, calling ``render`` for (chunks, media type, filename) on a miss
+
+        Concurrent misses for the same key render it once; the others wait
+        and are served the stored file.
+        """
+        with self._key_lock(cache_key):
+            artifact = self.get(cache_key)
+            if artifact is None:
+                chunks, media_type, filename = render()
+                artifact = self.put(cache_key, extraction_id, chunks, media_type, filename)
+            return artifact
+
+    def put(self, cache_key: str, extraction_id: str, chunks: Iterator[bytes],
+            media_type: str, filename: str) -> Dict:
+        """Write an artifact from its byte chunks, hashing as it goes, and index it"""
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            # Renders of one key with the same bytes share a name; different bytes never overwrite it
+            path = self.root / f"{cache_key}.{digest.hexdigest()[:16]}{Path(filename).suffix}"
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        artifact = {
+            "cache_key": cache_key,
+            "extraction_id": extraction_id,
+            "path": str(path),
+            "etag": f'"{digest.hexdigest()}"',
+            "media_type": media_type,
+            "filename": filename,
+            "size": size
+        }
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                replaced = conn.execute(
+                    "SELECT path FROM artifacts WHERE cache_key = ? AND path != ?", (cache_key, str(path))
+                ).fetchone()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO artifacts ({', '.join(ARTIFACT_COLUMNS)}, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    tuple(artifact[column] for column in ARTIFACT_COLUMNS) + (now, now)
+                )
+                self._evict(conn, keep=cache_key)
+        finally:
+            conn.close()
+        if replaced is not None:
+            Path(replaced["path"]).unlink(missing_ok=True)
+        return artifact
+
+    def _evict(self, conn: sqlite3.Connection, keep: str):
+        """Drop least recently used artifacts until the cache fits in max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for row in conn.execute("SELECT cache_key, path, size FROM artifacts ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            if row["cache_key"] == keep:
+                continue
+            evicted.append(row)
+            total -= row["size"]
+
+        self._remove(conn, evicted)
+        with self._lock:
+            self.evictions += len(evicted)
+        logger.info(f"Evicted {len(evicted)} cached artifacts")
+
+    @staticmethod
+    def _remove(conn: sqlite3.Connection, rows):
+        conn.executemany("DELETE FROM artifacts WHERE cache_key = ?", [(row["cache_key"],) for row in rows])
+        for row in rows:
+            Path(row["path"]).unlink(missing_ok=True)
+
+    def delete_extraction(self, extraction_id: str) -> int:
+        """Remove every artifact rendered from an extraction"""
+        conn = self._connect()
+        try:
+            with conn:
+                rows = conn.execute(
+                    "SELECT cache_key, path FROM artifacts WHERE extraction_id = ?", (extraction_id,)
+                ).fetchall()
+                self._remove(conn, rows)
+        finally:
+            conn.close()
+        return len(rows)
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            with conn:
+                self._remove(conn, conn.execute("SELECT cache_key, path FROM artifacts").fetchall())
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        try:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts"
+            ).fetchone()
+        finally:
+            conn.close()
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes
+            }
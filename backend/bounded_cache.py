@@ -0,0 +1,169 @@
+"""
+Size-bounded in-memory cache in front of a durable mapping
+"""
+
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def approx_size(value: Any) -> int:
+    """Approximate bytes held by a JSON-like value, counting shared objects once"""
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(item)
+    return size
+
+
+class BoundedCache(MutableMapping):
+    """LRU cache with a memory ceiling and TTL, writing through to ``spill``
+
+    Every entry is also written to ``spill`` (a durable mapping such as the
+    job store or a SQLite state namespace), so entries dropped from memory,
+    whether by LRU eviction past ``max_bytes`` or after ``ttl`` seconds, are
+    read back from disk on their next access instead of being lost. Entry
+    sizes come from ``sizeof``, which estimates the memory a value holds.
+
+    Values are treated as immutable. When ``spill`` is shared with other
+    processes, ``revalidate`` checks that a key still exists there before
+    serving it from memory, so deletions made elsewhere are seen at once.
+    """
+
+    def __init__(self, spill: MutableMapping, max_bytes: int = 256 * 1024 * 1024,
+                 ttl: Optional[float] = None, sizeof: Callable[[Any], int] = approx_size,
+                 revalidate: bool = False):
+        self.spill = spill
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.revalidate = revalidate
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+        # key -> (value, size, stored_at), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _admit(self, key: str, value: Any):
+        size = self.sizeof(value)
+        with self._lock:
+            self._drop(key)
+            if size > self.max_bytes:
+                # Too big to keep in memory at all; it lives on disk only
+                return
+            self._entries[key] = (value, size, time.monotonic())
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def _drop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry[1]
+        return True
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.monotonic() - stored_at > self.ttl
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[2]):
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None and not self.revalidate:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        if entry is not None:
+            if key in self.spill:
+                with self._lock:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                return entry[0]
+            self.invalidate(key)
+            raise KeyError(key)
+
+        with self._lock:
+            self.misses += 1
+        value = self.spill[key]
+        self._admit(key, value)
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        self.spill[key] = value
+        self._admit(key, value)
+
+    def __delitem__(self, key: str):
+        with self._lock:
+            self._drop(key)
+        del self.spill[key]
+
+    def __contains__(self, key) -> bool:
+        if not self.revalidate:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and not self._expired(entry[2]):
+                    return True
+        return key in self.spill
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.spill)
+
+    def __len__(self) -> int:
+        return len(self.spill)
+
+    def items(self):
+        """Entries straight from ``spill``; a full scan shouldn't churn the LRU"""
+        return self.spill.items()
+
+    def values(self):
+        return self.spill.values()
+
+    def invalidate(self, key: str) -> bool:
+        """Drop the in-memory copy of ``key`` after it changed in ``spill`` directly"""
+        with self._lock:
+            return self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+        self.spill.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl
+            }
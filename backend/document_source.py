@@ -0,0 +1,149 @@
+"""
+Documents to extract from, given as a path or as bytes already in memory
+"""
+
+import hashlib
+import io
+import logging
+import mmap
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+from result_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+
+class BufferReader(io.RawIOBase):
+    """Seekable read-only stream over a buffer, without copying it
+
+    Each reader keeps its own position, so several engines can read the
+    same bytes at once.
+    """
+
+    def __init__(self, buffer):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        chunk = self._view[self._position:self._position + len(b)]
+        b[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        # Release the view so the underlying buffer (e.g. an mmap) can be closed
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+class DocumentSource:
+    """A document given as a path, bytes, a memory map or a binary file object
+
+    Engines that accept a stream read in-memory documents through
+    :meth:`stream` without them touching disk. :meth:`path` writes a
+    temporary copy only for engines that need a real file (Camelot, process
+    pool workers); :meth:`close` removes it again.
+
+    Regular files opened in binary mode are memory-mapped; other file objects
+    are read into memory once. ``name`` supplies the file name (and so the
+    format) when the source doesn't carry one.
+    """
+
+    def __init__(self, source: Source, name: Optional[str] = None):
+        self._path: Optional[str] = None
+        self._buffer = None
+        self._temp_path: Optional[str] = None
+        self._mapped: Optional[mmap.mmap] = None
+
+        if isinstance(source, (str, os.PathLike)):
+            self._path = str(source)
+        elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._buffer = source
+        elif hasattr(source, "getbuffer"):
+            self._buffer = source.getbuffer()
+        else:
+            self._buffer = self._map_file(source)
+            if isinstance(self._buffer, mmap.mmap):
+                self._mapped = self._buffer
+
+        name = name or self._path or getattr(source, "name", None)
+        self.name = Path(name).name if isinstance(name, (str, os.PathLike)) else "document"
+        self.extension = Path(self.name).suffix.lower()
+
+    @staticmethod
+    def _map_file(file: BinaryIO):
+        """Memory map a regular file, falling back to reading it"""
+        if isinstance(file, (io.BufferedReader, io.FileIO)):
+            try:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Pipes and empty files can't be mapped
+                pass
+        return file.read()
+
+    @property
+    def in_memory(self) -> bool:
+        return self._path is None
+
+    def stream(self) -> BinaryIO:
+        """A new binary stream over the document from its start; the caller closes it"""
+        if self._path is not None:
+            return open(self._path, "rb")
+        return BufferReader(self._buffer)
+
+    def path(self) -> str:
+        """A file path for engines that can't read streams, written out at most once"""
+        if self._path is not None:
+            return self._path
+        if self._temp_path is None:
+            fd, temp_path = tempfile.mkstemp(suffix=self.extension)
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._buffer)
+            self._temp_path = temp_path
+            logger.info(f"Wrote {self.name} to disk for an engine that needs a file path")
+        return self._temp_path
+
+    def sha256(self) -> str:
+        if self._path is not None:
+            return file_sha256(self._path)
+        return hashlib.sha256(self._buffer).hexdigest()
+
+    def close(self):
+        if self._temp_path is not None:
+            Path(self._temp_path).unlink(missing_ok=True)
+            self._temp_path = None
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,131 @@
+"""
+Streaming reader for tables in DOCX files
+"""
+
+import zipfile
+from typing import BinaryIO, Dict, Iterator, List, Union
+
+from lxml import etree
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+BODY = f"{W}body"
+TBL = f"{W}tbl"
+TR = f"{W}tr"
+TC = f"{W}tc"
+P = f"{W}p"
+R = f"{W}r"
+HYPERLINK = f"{W}hyperlink"
+TC_PR = f"{W}tcPr"
+TR_PR = f"{W}trPr"
+GRID_SPAN = f"{W}gridSpan"
+GRID_BEFORE = f"{W}gridBefore"
+V_MERGE = f"{W}vMerge"
+VAL = f"{W}val"
+TYPE = f"{W}type"
+
+# Elements whose end events matter: rows, tables and whatever else sits in the body
+STREAM_TAGS = (TR, TBL, P, f"{W}sdt", f"{W}sectPr", f"{W}customXml", f"{W}altChunk")
+
+DOCUMENT_PART = "word/document.xml"
+
+# Text of run children other than w:t and w:br, as python-docx renders them
+RUN_TEXT = {f"{W}tab": "\t", f"{W}ptab": "\t", f"{W}cr": "\n", f"{W}noBreakHyphen": "-"}
+
+
+def _run_text(run: etree._Element) -> str:
+    parts = []
+    for child in run:
+        if child.tag == f"{W}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{W}br":
+            # Page and column breaks have no text
+            parts.append("\n" if child.get(TYPE, "textWrapping") == "textWrapping" else "")
+        else:
+            parts.append(RUN_TEXT.get(child.tag, ""))
+    return "".join(parts)
+
+
+def _paragraph_text(paragraph: etree._Element) -> str:
+    parts = []
+    for child in paragraph:
+        if child.tag == R:
+            parts.append(_run_text(child))
+        elif child.tag == HYPERLINK:
+            parts.extend(_run_text(run) for run in child.iterchildren(R))
+    return "".join(parts)
+
+
+def _cell_text(tc: etree._Element) -> str:
+    return " ".join(_paragraph_text(p).strip() for p in tc.iterchildren(P))
+
+
+def _int_val(element: etree._Element, default: int) -> int:
+    try:
+        return int(element.get(VAL))
+    except (TypeError, ValueError):
+        return default
+
+
+def _cell_layout(tc: etree._Element) -> tuple:
+    """(gridSpan, whether the cell continues a vertical merge) from a cell's w:tcPr"""
+    span = 1
+    continues = False
+    tc_pr = tc[0] if len(tc) and tc[0].tag == TC_PR else None
+    if tc_pr is not None:
+        for prop in tc_pr:
+            if prop.tag == GRID_SPAN:
+                span = max(1, _int_val(prop, 1))
+            elif prop.tag == V_MERGE:
+                continues = prop.get(VAL, "continue") == "continue"
+    return span, continues
+
+
+def _row_cells(tr: etree._Element, above: Dict[int, str]) -> tuple:
+    """Cell texts of a row, one per layout-grid column it covers, and its text by grid offset
+
+    A cell spanning several grid columns repeats its text in each of them, and
+    a vertically merged continuation cell takes the text of the cell above it.
+    Grid columns skipped at the start of the row are left out, as python-docx does.
+    """
+    cells = []
+    by_offset = {}
+    grid_before = tr.find(f"{TR_PR}/{GRID_BEFORE}")
+    offset = _int_val(grid_before, 0) if grid_before is not None else 0
+    for tc in tr.iterchildren(TC):
+        span, continues = _cell_layout(tc)
+        if continues:
+            text = above.get(offset, "")
+        else:
+            text = _cell_text(tc)
+        by_offset[offset] = text
+        cells.extend([text] * span)
+        offset += span
+    return cells, by_offset
+
+
+def iter_docx_tables(source: Union[str, BinaryIO]) -> Iterator[List[List[str]]]:
+    """Yield each top-level table of a DOCX as rows of cell text, in document order
+
+    ``word/document.xml`` is parsed incrementally and each row is converted
+    and dropped from the tree as soon as it ends, so memory stays flat however
+    long the document is. Cell text matches python-docx's
+    ``' '.join(p.text.strip() for p in cell.paragraphs)`` over ``row.cells``.
+    """
+    with zipfile.ZipFile(source) as archive, archive.open(DOCUMENT_PART) as xml:
+        rows = []
+        above = {}
+        for _, element in etree.iterparse(xml, events=("end",), tag=STREAM_TAGS, resolve_entities=False,
+                                          no_network=True, huge_tree=True):
+            parent = element.getparent()
+            if element.tag == TR and parent is not None and parent.tag == TBL:
+                table_parent = parent.getparent()
+                if table_parent is not None and table_parent.tag == BODY:
+                    cells, above = _row_cells(element, above)
+                    rows.append(cells)
+                    parent.remove(element)
+            elif parent is not None and parent.tag == BODY:
+                if element.tag == TBL:
+                    yield rows
+                    rows = []
+                    above = {}
+                parent.remove(element)
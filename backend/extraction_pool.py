@@ -0,0 +1,103 @@
+"""
+Bounded executor for running blocking table extraction off the event loop
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+def close_iterator(iterator: Iterator):
+    """Close a generator driven by ExtractionPool.iterate, running its cleanup
+
+    Blocking, so call it from a worker thread. If iterate() was cancelled
+    while a pool thread was still producing an item, waits for that first.
+    """
+    while getattr(iterator, "gi_running", False):
+        time.sleep(0.01)
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
+
+
+class ExtractionPool:
+    """Runs extractions on a dedicated thread pool with a bounded wait queue
+
+    At most ``max_workers`` extractions run at once and up to ``max_queue``
+    more may wait for a worker. Anything beyond that is rejected immediately
+    with ``ExtractionQueueFull`` so callers can back off.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="extract")
+        self._pending = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def acquire(self):
+        """Reserve a slot for one extraction or raise ExtractionQueueFull"""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise ExtractionQueueFull(
+                    f"{self._pending} extractions in progress or queued (limit {self.capacity})"
+                )
+            self._pending += 1
+
+    def release(self):
+        """Give back a slot reserved with acquire()"""
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run a blocking call on the pool and await its result"""
+        self.acquire()
+        try:
+            future = self.executor.submit(func, *args, **kwargs)
+        except Exception:
+            self.release()
+            raise
+        # Release when the work finishes, even if the awaiting request is cancelled
+        future.add_done_callback(lambda _: self.release())
+        return await asyncio.wrap_future(future)
+
+    async def iterate(self, iterator: Iterator) -> AsyncIterator:
+        """Drive a blocking iterator on the pool, one item at a time
+
+        The caller is expected to hold a slot from acquire() for the lifetime
+        of the iteration.
+        """
+        loop = asyncio.get_running_loop()
+        done = object()
+        while True:
+            item = await loop.run_in_executor(self.executor, next, iterator, done)
+            if item is done:
+                break
+            yield item
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = self._pending
+            rejected = self._rejected
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": min(pending, self.max_workers),
+            "queued": max(0, pending - self.max_workers),
+            "rejected": rejected
+        }
@@ -1,175 +1,1015 @@
+import numpy as np
 import pandas as pd
 import camelot
 import pdfplumber
+import docx
 from docx import Document
 from docx.table import Table as DocxTable
+from lxml import etree
+import csv
+import functools
+import gc
+import io
 import json
 import logging
-from typing import List, Dict, Union, Optional
+import multiprocessing
+from typing import Callable, List, Dict, Iterator, Union, Optional
 from pathlib import Path
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+import os
 import tempfile
+import threading
+
+import psutil
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from document_source import DocumentSource, Source
+from docx_stream import iter_docx_tables
+from result_cache import ResultCache
+from table_normalize import normalize_headers, normalize_table
+from table_format import compact_table, decode_column, table_frame, table_rows
+from table_spill import TableSpill
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pages handed to each worker in parallel PDF mode
+DEFAULT_CHUNK_SIZE = 10
+
+# Resident memory above which low-memory mode reopens the PDF between page windows
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+
+# Bump whenever extraction output changes so cached results are not reused
+EXTRACTOR_VERSION = "11"
+
+# PDF engines a page can be routed to
+VECTOR_LATTICE = "vector-lattice"
+LATTICE = "camelot-lattice"
+WHITESPACE_STREAM = "whitespace-stream"
+STREAM = "camelot-stream"
+PDFPLUMBER = "pdfplumber"
+
+# DOCX engines: streaming document.xml reader, python-docx as its fallback
+DOCX_STREAM = "docx-stream"
+PYTHON_DOCX = "python-docx"
+
+# Engines tried in order for each routed engine until one finds tables. The
+# in-process engines run while the page is parsed; Camelot engines re-read the
+# file from disk, so they come last and are batched over the pages that need them.
+ENGINE_CHAINS = {
+    VECTOR_LATTICE: [VECTOR_LATTICE, PDFPLUMBER, LATTICE],
+    PDFPLUMBER: [PDFPLUMBER, WHITESPACE_STREAM, STREAM],
+    WHITESPACE_STREAM: [WHITESPACE_STREAM, STREAM]
+}
+CAMELOT_ENGINES = {LATTICE: 'lattice', STREAM: 'stream'}
+
+# Page classifier thresholds (in PDF points)
+MIN_RULING_LENGTH = 10
+COLUMN_GAP = 15
+MIN_COLUMN_ROWS = 3
+# Ruling coordinates closer than this are treated as the same grid line
+SNAP_TOLERANCE = 3
+# Side of the square buckets CharIndex sorts characters into
+CHAR_BUCKET_SIZE = 24
+
+# Cells like "007" are identifiers, so such columns are not typed as numbers
+LEADING_ZERO_PATTERN = r"^[-+]?0\d"
+PARQUET_COMPRESSION = "zstd"
+
+# Rows encoded per chunk when streaming CSV
+CSV_BATCH_ROWS = 1000
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+
+ENGINE_VERSIONS = {
+    "camelot": camelot.__version__,
+    "pdfplumber": pdfplumber.__version__,
+    "python-docx": docx.__version__,
+    "lxml": etree.__version__,
+    "pandas": pd.__version__
+}
+
+
+def _snap(coords: np.ndarray, tolerance: float = SNAP_TOLERANCE) -> np.ndarray:
+    """Replace coordinates with the mean of their cluster (gaps > tolerance split clusters)"""
+    order = np.argsort(coords)
+    sorted_coords = coords[order]
+    cluster_ids = np.concatenate(([0], np.cumsum(np.diff(sorted_coords) > tolerance)))
+    means = np.bincount(cluster_ids, weights=sorted_coords) / np.bincount(cluster_ids)
+    snapped = np.empty_like(coords)
+    snapped[order] = means[cluster_ids]
+    return snapped
+
+
+def _rulings_cover(edges: np.ndarray, positions: np.ndarray, spans: np.ndarray) -> np.ndarray:
+    """Whether a ruling at each position crosses the midpoint of each span
+
+    ``edges`` rows are (position, start, end); returns a (positions, spans) boolean matrix.
+    """
+    if len(positions) == 0 or len(spans) == 0:
+        return np.zeros((len(positions), len(spans)), dtype=bool)
+
+    at_position = np.abs(edges[None, :, 0] - positions[:, None]) <= SNAP_TOLERANCE
+    covers = (edges[:, 1][None, :] <= spans[:, None]) & (edges[:, 2][None, :] >= spans[:, None])
+    # (positions, edges) x (edges, spans) -> (positions, spans)
+    return (at_position.astype(np.int32) @ covers.T.astype(np.int32)) > 0
+
+
+def _connected_components(adjacency: np.ndarray) -> List[tuple]:
+    """Group rows and columns of a bipartite adjacency matrix into connected components
+
+    Returns (row indices, column indices) per component, ordered by first row.
+    """
+    n_rows, n_cols = adjacency.shape
+    row_seen = np.zeros(n_rows, dtype=bool)
+    components = []
+
+    for start in range(n_rows):
+        if row_seen[start] or not adjacency[start].any():
+            continue
+        rows = np.zeros(n_rows, dtype=bool)
+        rows[start] = True
+        cols = np.zeros(n_cols, dtype=bool)
+        while True:
+            new_cols = adjacency[rows].any(axis=0) & ~cols
+            cols |= new_cols
+            new_rows = adjacency[:, cols].any(axis=1) & ~rows
+            if not new_rows.any() and not new_cols.any():
+                break
+            rows |= new_rows
+        row_seen |= rows
+        components.append((np.flatnonzero(rows), np.flatnonzero(cols)))
+
+    return components
+
+
+def _join_chars(chars: List[Dict]) -> str:
+    """Join characters into text in reading order, adding spaces at visible gaps"""
+    if not chars:
+        return ""
+
+    # Lines first, splitting only where tops jump by more than the tolerance, so
+    # mixed fonts on one baseline stay on one line
+    chars = sorted(chars, key=lambda c: c["top"])
+    lines = [[chars[0]]]
+    for prev, char in zip(chars, chars[1:]):
+        if char["top"] - prev["top"] > SNAP_TOLERANCE:
+            lines.append([])
+        lines[-1].append(char)
+
+    parts = []
+    for line in lines:
+        line.sort(key=lambda c: c["x0"])
+        parts.append(" ")
+        parts.append(line[0]["text"])
+        for prev, char in zip(line, line[1:]):
+            if char["x0"] - prev["x1"] > 0.25 * char["size"] and char["text"] != " ":
+                parts.append(" ")
+            parts.append(char["text"])
+
+    return " ".join("".join(parts).split())
+
+
+class CharIndex:
+    """Grid-bucket spatial index over a page's characters
+
+    Characters are bucketed by the centre of their bounding box, so a
+    rectangle query only inspects the buckets it overlaps. Filling every
+    cell of a table touches each character a constant number of times
+    instead of rescanning the page per cell.
+    """
+
+    def __init__(self, chars: List[Dict], bucket_size: float = CHAR_BUCKET_SIZE):
+        self.chars = chars
+        self.bucket_size = bucket_size
+        n = len(chars)
+        self.cx = np.fromiter(((c["x0"] + c["x1"]) / 2 for c in chars), dtype=float, count=n)
+        self.cy = np.fromiter(((c["top"] + c["bottom"]) / 2 for c in chars), dtype=float, count=n)
+
+        bx = np.floor(self.cx / bucket_size).astype(np.int64)
+        by = np.floor(self.cy / bucket_size).astype(np.int64)
+        # Sort by bucket, keeping content-stream order within each bucket
+        self._order = np.lexsort((np.arange(n), bx, by))
+        self._buckets = {}
+        if n:
+            keys, starts = np.unique(
+                np.stack([by[self._order], bx[self._order]], axis=1), axis=0, return_index=True
+            )
+            ends = np.append(starts[1:], n)
+            self._buckets = {
+                (int(key[0]), int(key[1])): (start, end)
+                for key, start, end in zip(keys, starts, ends)
+            }
+
+    def query(self, x0: float, top: float, x1: float, bottom: float) -> np.ndarray:
+        """Indices of characters whose centre lies in [x0, x1) x [top, bottom)"""
+        size = self.bucket_size
+        parts = [
+            self._order[slice(*self._buckets[(by, bx)])]
+            for by in range(int(np.floor(top / size)), int(np.floor(bottom / size)) + 1)
+            for bx in range(int(np.floor(x0 / size)), int(np.floor(x1 / size)) + 1)
+            if (by, bx) in self._buckets
+        ]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+
+        idx = np.concatenate(parts)
+        cx, cy = self.cx[idx], self.cy[idx]
+        inside = (cx >= x0) & (cx < x1) & (cy >= top) & (cy < bottom)
+        return np.sort(idx[inside])
+
+    def text(self, bbox: tuple) -> str:
+        """Text of the characters inside a (x0, top, x1, bottom) box"""
+        return _join_chars([self.chars[i] for i in self.query(*bbox)])
+
+    def grid_cells(self, xs: np.ndarray, ys: np.ndarray) -> tuple:
+        """Locate characters in a grid given sorted column and row boundaries
+
+        Returns (char indices, row numbers, column numbers) for every character
+        inside the grid.
+        """
+        idx = self.query(xs[0], ys[0], xs[-1], ys[-1])
+        cols = np.searchsorted(xs, self.cx[idx], side="right") - 1
+        rows = np.searchsorted(ys, self.cy[idx], side="right") - 1
+        return idx, rows, cols
+
+
+class PdfDocument:
+    """A PDF parsed once per extraction and shared by classification and every engine
+
+    Pages are handed out one at a time; ``release`` drops a page's parsed
+    objects once it has been processed so long documents don't accumulate them.
+    The PDF is read from a stream, so in-memory documents only reach disk if
+    ``file_path`` is asked for.
+    """
+
+    def __init__(self, source: Union[str, DocumentSource]):
+        self._owns_source = not isinstance(source, DocumentSource)
+        self.source = DocumentSource(source) if self._owns_source else source
+        self._open()
+        self.page_count = len(self.pdf.pages)
+
+    def _open(self):
+        self._stream = self.source.stream()
+        self.pdf = pdfplumber.open(self._stream)
+
+    @property
+    def file_path(self) -> str:
+        """Path for engines that need a file (Camelot, pool workers)"""
+        return self.source.path()
+
+    def page(self, page_number: int):
+        """1-based page access"""
+        return self.pdf.pages[page_number - 1]
+
+    def release(self, page_number: int):
+        self.pdf.pages[page_number - 1].close()
+
+    def reopen(self):
+        """Drop everything parsed so far, including the parser's object cache"""
+        self._close_pdf()
+        self._open()
+
+    def _close_pdf(self):
+        self.pdf.close()
+        self._stream.close()
+
+    def close(self):
+        self._close_pdf()
+        if self._owns_source:
+            self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _rss_bytes() -> int:
+    return psutil.Process().memory_info().rss
+
+
+# Pool workers start from a clean server process rather than forking the caller,
+# whose other threads (event loop, job workers) may hold locks at the time of the fork
+POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+if POOL_CONTEXT.get_start_method() == "forkserver":
+    # Workers fork from a server that has already imported the engines
+    POOL_CONTEXT.set_forkserver_preload(["extractor"])
+
+# Document opened by this pool worker process and the (path, mtime, size) it was
+# opened from, reused across page ranges; temp file paths can be reused for other files
+_worker_document: Optional[PdfDocument] = None
+_worker_document_key: Optional[tuple] = None
+
+
+def _extract_pdf_page_range(file_path: str, pages: List[int],
+                            memory_budget: Optional[int] = None) -> tuple:
+    """Process pool entry point: (tables, engine errors) of a range of PDF pages
+
+    With a ``memory_budget`` (low-memory mode) the worker reopens its document
+    once its RSS goes over the budget, as a serial run does between windows.
+    """
+    global _worker_document, _worker_document_key
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_mtime_ns, stat.st_size)
+    if _worker_document is None or _worker_document_key != key:
+        if _worker_document is not None:
+            _worker_document.close()
+        _worker_document = PdfDocument(file_path)
+        _worker_document_key = key
+    errors = []
+    tables = TableExtractor()._extract_pdf_pages(_worker_document, pages, errors)
+
+    if memory_budget is not None and _rss_bytes() > memory_budget:
+        logger.info(f"Worker RSS above {memory_budget} bytes after page {pages[-1]}, reopening document")
+        _worker_document.reopen()
+        gc.collect()
+    return tables, errors
+
+
 class TableExtractor:
-    def __init__(self):
+    def __init__(self, result_cache: Optional[ResultCache] = None,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 spill_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None):
         self.supported_formats = ['.pdf', '.docx', '.doc']
+        self.result_cache = result_cache
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        # Parallel extractions never use more processes than this, whatever they ask for
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        # One process pool for every parallel extraction, started on first use
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=POOL_CONTEXT)
+            return self._process_pool
+
+    def close(self):
+        """Shut down the process pool, if one was started"""
+        with self._pool_lock:
+            pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _map_page_ranges(self, file_path: str, page_ranges: List[List[int]], workers: int,
+                         low_memory: bool = False,
+                         errors: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """Tables of each page range from the shared pool, in order, with at most ``workers`` in flight"""
+        pool = self._pool()
+        memory_budget = self.memory_budget if low_memory else None
+        remaining = iter(page_ranges)
+        pending = deque(pool.submit(_extract_pdf_page_range, file_path, pages, memory_budget)
+                        for pages in islice(remaining, workers))
+        try:
+            while pending:
+                chunk_tables, chunk_errors = pending.popleft().result()
+                if errors is not None:
+                    errors.extend(chunk_errors)
+                pages = next(remaining, None)
+                if pages is not None:
+                    pending.append(pool.submit(_extract_pdf_page_range, file_path, pages, memory_budget))
+                yield chunk_tables
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            with self._pool_lock:
+                if self._process_pool is pool:
+                    self._process_pool = None
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def extract_tables(self, file_path: Source, parallel: bool = False,
+                       workers: Optional[int] = None,
+                       chunk_size: Optional[int] = None,
+                       progress: Optional[Callable[[int, int], None]] = None,
+                       low_memory: bool = False,
+                       content_hash: Optional[str] = None,
+                       file_name: Optional[str] = None) -> Dict[str, Union[List[Dict], str]]:
+        """Extract tables from supported file formats
+
+        ``file_path`` may also be the document itself as bytes, a memory map or
+        a binary file object, with ``file_name`` giving its name and format;
+        it is then only written to disk for Camelot or parallel PDF mode.
 
-    def extract_tables(self, file_path: str) -> Dict[str, Union[List[Dict], str]]:
-        """Extract tables from supported file formats"""
+        With ``parallel=True`` PDF pages are split into ranges of ``chunk_size``
+        pages and processed across ``workers`` processes. ``progress`` is called
+        with ``(pages_done, page_count)`` as PDF page ranges finish.
+        ``low_memory`` processes PDF pages in windows, reopening the document
+        whenever RSS exceeds ``memory_budget`` and spilling finished tables to
+        disk; the result's ``tables`` is then a :class:`TableSpill` that reads
+        them back one at a time, and the caller removes it with
+        :func:`close_tables` once done. ``content_hash`` is the file's SHA-256
+        if already known, saving a pass over the file for the result cache.
+        """
         try:
-            file_path = Path(file_path)
-            file_extension = file_path.suffix.lower()
+            source = DocumentSource(file_path, file_name)
+        except Exception as e:
+            logger.error(f"Error reading document: {str(e)}")
+            return {"tables": [], "error": str(e), "file_name": file_name or "unknown", "status": "failed"}
+
+        with source:
+            return self._extract_source(source, parallel, workers, chunk_size, progress,
+                                        low_memory, content_hash)
 
-            if file_extension not in self.supported_formats:
-                raise ValueError(f"Unsupported file format: {file_extension}")
+    def _extract_source(self, source: DocumentSource, parallel: bool, workers: Optional[int],
+                        chunk_size: Optional[int], progress: Optional[Callable[[int, int], None]],
+                        low_memory: bool, content_hash: Optional[str]) -> Dict[str, Union[List[Dict], str]]:
+        try:
+            if source.extension not in self.supported_formats:
+                raise ValueError(f"Unsupported file format: {source.extension}")
 
-            logger.info(f"Processing file: {file_path.name}")
+            logger.info(f"Processing file: {source.name}")
 
-            if file_extension == '.pdf':
-                return self._extract_from_pdf(str(file_path))
-            elif file_extension in ['.docx', '.doc']:
-                return self._extract_from_docx(str(file_path))
+            cache_key = None
+            if self.result_cache is not None:
+                cache_key, cached = self._lookup_cached_result(source, content_hash)
+                if cached is not None:
+                    logger.info(f"Using cached result for: {source.name}")
+                    if progress:
+                        progress(1, 1)
+                    return {**cached, "file_name": source.name}
+
+            if source.extension == '.pdf':
+                result = self._extract_from_pdf(source, parallel=parallel,
+                                                workers=workers, chunk_size=chunk_size,
+                                                progress=progress, low_memory=low_memory)
+            else:
+                result = self._extract_from_docx(source)
+                if progress:
+                    progress(1, 1)
+
+            # An engine that raised may have lost tables a retry would find
+            if cache_key and result.get("status") != "failed" and not result.get("engine_errors"):
+                try:
+                    self.result_cache.put(cache_key, result)
+                except Exception as e:
+                    logger.warning(f"Could not cache extraction result: {e}")
+
+            return result
 
         except Exception as e:
             logger.error(f"Error extracting tables: {str(e)}")
             return {
                 "tables": [],
                 "error": str(e),
-                "file_name": file_path.name if 'file_path' in locals() else "unknown",
+                "file_name": source.name,
                 "status": "failed"
             }
 
-    def _extract_from_pdf(self, file_path: str) -> Dict[str, Union[List[Dict], str]]:
-        """Extract tables from PDF using Camelot and pdfplumber as fallback"""
-        tables_data = []
+    def _lookup_cached_result(self, source: DocumentSource, content_hash: Optional[str] = None) -> tuple:
+        """Return (cache_key, cached result or None) for a document
 
+        Every mode (serial, parallel, chunked, low-memory) routes pages the
+        same way, so they all share one entry per document.
+        """
+        options = {
+            "extractor": EXTRACTOR_VERSION,
+            "engines": ENGINE_VERSIONS,
+            "format": source.extension
+        }
         try:
-            logger.info("Attempting extraction with Camelot...")
-            camelot_tables = camelot.read_pdf(file_path, pages='all', flavor='lattice')
+            cache_key = self.result_cache.make_key(content_hash or source.sha256(), options)
+            return cache_key, self.result_cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Result cache lookup failed: {e}")
+            return None, None
 
-            if len(camelot_tables) > 0:
-                for i, table in enumerate(camelot_tables):
-                    df = table.df
-                    table_dict = self._process_dataframe(df, f"camelot_table_{i}")
-                    if table_dict:
-                        tables_data.append(table_dict)
+    @staticmethod
+    def _pdf_chunk_size(parallel: bool, chunk_size: Optional[int]) -> int:
+        return max(1, chunk_size or (DEFAULT_CHUNK_SIZE if parallel else 1))
 
-            if not tables_data:
-                logger.info("Camelot failed, trying pdfplumber...")
-                tables_data.extend(self._extract_with_pdfplumber(file_path))
+    def iter_tables(self, file_path: Source, parallel: bool = False,
+                    workers: Optional[int] = None,
+                    chunk_size: Optional[int] = None,
+                    low_memory: bool = False,
+                    file_name: Optional[str] = None) -> Iterator[Dict]:
+        """Yield tables one at a time as soon as their page has been processed
 
-        except Exception as e:
-            logger.warning(f"Camelot extraction failed: {e}, trying pdfplumber...")
-            tables_data.extend(self._extract_with_pdfplumber(file_path))
+        PDF pages are processed ``chunk_size`` at a time (one page by default,
+        ``DEFAULT_CHUNK_SIZE`` in parallel mode). Each table carries its 1-based
+        ``page`` (None for DOCX) and the ``source`` engine. Documents can be
+        given as for :meth:`extract_tables`.
+        """
+        with DocumentSource(file_path, file_name) as source:
+            if source.extension not in self.supported_formats:
+                raise ValueError(f"Unsupported file format: {source.extension}")
 
-        return {
+            if source.extension == '.pdf':
+                with PdfDocument(source) as document:
+                    yield from self._iter_pdf_tables(document, parallel, workers, chunk_size,
+                                                     low_memory=low_memory)
+            else:
+                yield from self._iter_docx_tables(source)
+
+    def _extract_from_pdf(self, source: DocumentSource, parallel: bool = False,
+                          workers: Optional[int] = None,
+                          chunk_size: Optional[int] = None,
+                          progress: Optional[Callable[[int, int], None]] = None,
+                          low_memory: bool = False) -> Dict[str, Union[List[Dict], str]]:
+        """Extract tables from PDF, routing each page to the engines that suit it"""
+        errors = []
+        with PdfDocument(source) as document:
+            if low_memory:
+                tables_data = self._extract_pdf_spilled(document, parallel, workers, chunk_size, progress, errors)
+            elif parallel or progress:
+                tables_data = list(self._iter_pdf_tables(document, parallel, workers, chunk_size, progress,
+                                                         errors=errors))
+            else:
+                tables_data = self._extract_pdf_pages(document, errors=errors)
+            page_count = document.page_count
+
+        page_engines = {}
+        for table in getattr(tables_data, "entries", tables_data):
+            page_engines.setdefault(str(table["page"]), table["engine"])
+        engines = list(dict.fromkeys(page_engines.values()))
+
+        result = {
             "tables": tables_data,
-            "file_name": Path(file_path).name,
+            "file_name": source.name,
             "status": "success" if tables_data else "no_tables_found",
-            "extraction_method": "camelot" if any("camelot" in t.get("source", "") for t in tables_data) else "pdfplumber"
+            "extraction_method": "+".join(engines) if engines else "none",
+            "page_engines": page_engines,
+            "page_count": page_count
         }
+        if errors:
+            result["engine_errors"] = errors
+        return result
+
+    def _extract_pdf_spilled(self, document: PdfDocument, parallel: bool, workers: Optional[int],
+                             chunk_size: Optional[int],
+                             progress: Optional[Callable[[int, int], None]],
+                             errors: Optional[List[str]] = None) -> TableSpill:
+        """Extract in low-memory mode, keeping finished tables on disk
+
+        The spill is returned open so consumers can read the tables back one
+        at a time; they close it once done.
+        """
+        spill = TableSpill(self.spill_dir)
+        try:
+            for table_dict in self._iter_pdf_tables(document, parallel, workers, chunk_size,
+                                                    progress, low_memory=True, errors=errors):
+                spill.append(table_dict)
+        except BaseException:
+            spill.close()
+            raise
+        logger.info(f"Spilled {len(spill)} tables ({spill.bytes} bytes) while extracting")
+        return spill
+
+    def _extract_pdf_pages(self, document: PdfDocument, pages: Optional[List[int]] = None,
+                           errors: Optional[List[str]] = None) -> List[Dict]:
+        """Extract tables from the given 1-based pages (all pages if None)
+
+        Each page is parsed once: it is classified, run through the in-process
+        engines of its chain and released. Pages those engines can't handle are
+        then batched into a single Camelot call per flavor. Engines that raise
+        are noted in ``errors``.
+        """
+        page_numbers = pages or range(1, document.page_count + 1)
+        tables_by_page = defaultdict(list)
+        camelot_pages = defaultdict(list)
+
+        for page_number in page_numbers:
+            page = document.page(page_number)
+            # Extracted at most once, for whichever of the classifier and the engines asks first
+            page_words = functools.cache(page.extract_words)
+            try:
+                engine = self._classify_page(page, page_words)
+            except Exception as e:
+                logger.warning(f"Could not classify page {page_number}: {e}")
+                engine = VECTOR_LATTICE
+
+            for engine in ENGINE_CHAINS.get(engine, []):
+                if engine in CAMELOT_ENGINES:
+                    camelot_pages[engine].append(page_number)
+                    break
+                found = self._run_page_engine(engine, page, page_number, page_words, errors)
+                if found:
+                    tables_by_page[page_number].extend(found)
+                    break
+
+            document.release(page_number)
+
+        for engine, engine_pages in camelot_pages.items():
+            for table_dict in self._run_camelot(engine, document.file_path, engine_pages, errors):
+                tables_by_page[table_dict["page"]].append(table_dict)
 
-    def _extract_with_pdfplumber(self, file_path: str) -> List[Dict]:
-        """Extract tables using pdfplumber"""
+        # Camelot numbers tables per call, so renumber in page order
+        tables_data = []
+        camelot_count = 0
+        for page_number in sorted(tables_by_page):
+            for table_dict in tables_by_page[page_number]:
+                if table_dict["source"] == "camelot":
+                    table_dict["table_id"] = f"camelot_table_{camelot_count}"
+                    camelot_count += 1
+                tables_data.append(table_dict)
+
+        return tables_data
+
+    def _classify_page(self, page, page_words: Optional[Callable[[], List[Dict]]] = None) -> Optional[str]:
+        """Pick an engine from ruling-line density and text layout (None: no tables)
+
+        ``page_words`` returns the page's words, if they are shared with the engines.
+        """
+        h_rulings = 0
+        v_rulings = 0
+        for edge in page.edges:
+            if edge["orientation"] == "h" and edge["width"] >= MIN_RULING_LENGTH:
+                h_rulings += 1
+            elif edge["orientation"] == "v" and edge["height"] >= MIN_RULING_LENGTH:
+                v_rulings += 1
+
+        # A full grid needs inner rulings in both directions, not just a border
+        if h_rulings >= 3 and v_rulings >= 3:
+            return VECTOR_LATTICE
+        if not page.chars:
+            return None
+        # Horizontal rules only (e.g. header/footer lines around a table)
+        if h_rulings >= 2:
+            return PDFPLUMBER
+        if self._has_column_layout((page_words or page.extract_words)()):
+            return WHITESPACE_STREAM
+        return None
+
+    def _has_column_layout(self, words: List[Dict]) -> bool:
+        """Whether several text rows are split into columns by wide gutters"""
+        rows = defaultdict(list)
+        for word in words:
+            rows[round(word["top"])].append(word)
+
+        column_rows = 0
+        for words in rows.values():
+            words.sort(key=lambda w: w["x0"])
+            gutters = sum(
+                1 for left, right in zip(words, words[1:])
+                if right["x0"] - left["x1"] >= COLUMN_GAP
+            )
+            if gutters >= 2:
+                column_rows += 1
+                if column_rows >= MIN_COLUMN_ROWS:
+                    return True
+
+        return False
+
+    def _run_page_engine(self, engine: str, page, page_number: int,
+                         page_words: Optional[Callable[[], List[Dict]]] = None,
+                         errors: Optional[List[str]] = None) -> List[Dict]:
+        """Extract tables from an already parsed page with an in-process engine"""
+        page_words = page_words or page.extract_words
+        prefix, find_tables = {
+            VECTOR_LATTICE: ("vector", self._vector_lattice_tables),
+            WHITESPACE_STREAM: ("stream", lambda page: self._whitespace_stream_tables(page, page_words())),
+            PDFPLUMBER: ("pdfplumber", self._pdfplumber_tables)
+        }[engine]
         tables_data = []
 
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
-                    tables = page.extract_tables()
-
-                    for table_num, table in enumerate(tables):
-                        if table and len(table) > 1:
-                            headers = table[0] if table[0] else [f"col_{i}" for i in range(len(table[0]))]
-                            rows = table[1:] if len(table) > 1 else []
-                            headers = [str(h).strip() if h else f"col_{i}" for i, h in enumerate(headers)]
-
-                            if rows:
-                                df = pd.DataFrame(rows, columns=headers)
-                                table_dict = self._process_dataframe(
-                                    df,
-                                    f"pdfplumber_page_{page_num}_table_{table_num}"
-                                )
-                                if table_dict:
-                                    tables_data.append(table_dict)
+            for table_num, rows in enumerate(find_tables(page)):
+                if len(rows) < 2:
+                    continue
+                df = pd.DataFrame(rows[1:], columns=normalize_headers(rows[0]))
+                table_dict = self._process_dataframe(
+                    df,
+                    f"{prefix}_page_{page_number - 1}_table_{table_num}",
+                    page=page_number
+                )
+                if table_dict:
+                    table_dict["engine"] = engine
+                    tables_data.append(table_dict)
 
         except Exception as e:
-            logger.error(f"pdfplumber extraction failed: {e}")
+            logger.warning(f"{engine} extraction failed on page {page_number}: {e}")
+            if errors is not None:
+                errors.append(f"{engine} failed on page {page_number}: {e}")
 
         return tables_data
 
-    def _extract_from_docx(self, file_path: str) -> Dict[str, Union[List[Dict], str]]:
-        """Extract tables from DOCX files"""
+    def _run_camelot(self, engine: str, file_path: str, pages: List[int],
+                     errors: Optional[List[str]] = None) -> List[Dict]:
+        """Extract tables from the given pages with one Camelot flavor"""
         tables_data = []
+        flavor = CAMELOT_ENGINES[engine]
+        page_spec = ','.join(str(p) for p in pages)
 
         try:
-            doc = Document(file_path)
-
-            for table_num, table in enumerate(doc.tables):
-                table_data = []
-                for row in table.rows:
-                    row_data = []
-                    for cell in row.cells:
-                        cell_text = ' '.join([p.text.strip() for p in cell.paragraphs])
-                        row_data.append(cell_text)
-                    table_data.append(row_data)
-
-                if table_data and len(table_data) > 1:
-                    headers = table_data[0]
-                    rows = table_data[1:]
-                    headers = [str(h).strip() if h else f"col_{i}" for i, h in enumerate(headers)]
-                    df = pd.DataFrame(rows, columns=headers)
-                    table_dict = self._process_dataframe(df, f"docx_table_{table_num}")
-                    if table_dict:
-                        tables_data.append(table_dict)
+            logger.info(f"Attempting extraction with Camelot {flavor} (pages: {page_spec})...")
+            camelot_tables = camelot.read_pdf(file_path, pages=page_spec, flavor=flavor)
+
+            for i, table in enumerate(camelot_tables):
+                table_dict = self._process_dataframe(table.df, f"camelot_table_{i}", page=int(table.page))
+                if table_dict:
+                    table_dict["engine"] = engine
+                    tables_data.append(table_dict)
+
+        except Exception as e:
+            logger.warning(f"Camelot {flavor} extraction failed on pages {page_spec}: {e}")
+            if errors is not None:
+                errors.append(f"Camelot {flavor} failed on pages {page_spec}: {e}")
+
+        return tables_data
+
+    def _iter_pdf_tables(self, document: PdfDocument, parallel: bool = False,
+                         workers: Optional[int] = None,
+                         chunk_size: Optional[int] = None,
+                         progress: Optional[Callable[[int, int], None]] = None,
+                         low_memory: bool = False,
+                         errors: Optional[List[str]] = None) -> Iterator[Dict]:
+        """Yield tables from page ranges in page order, optionally from a process pool
+
+        Serial runs share ``document``; each pool worker opens the file once.
+        Engine failures are collected in ``errors``.
+        """
+        chunk_size = self._pdf_chunk_size(parallel, chunk_size)
+        workers = min(max(1, workers or self.max_workers), self.max_workers) if parallel else 1
+        page_count = document.page_count
+
+        page_ranges = [
+            list(range(start, min(start + chunk_size, page_count + 1)))
+            for start in range(1, page_count + 1, chunk_size)
+        ]
+        workers = min(workers, len(page_ranges)) or 1
+        logger.info(f"Extracting {page_count} pages in {len(page_ranges)} chunks with {workers} workers")
+
+        if workers == 1:
+            chunk_results = self._iter_page_windows(document, page_ranges, low_memory, errors)
+        else:
+            chunk_results = self._map_page_ranges(document.file_path, page_ranges, workers, low_memory, errors)
+
+        try:
+            # Camelot numbers tables per call, so renumber across chunks to match a serial run
+            camelot_count = 0
+            pages_done = 0
+            for pages, chunk_tables in zip(page_ranges, chunk_results):
+                for table_dict in chunk_tables:
+                    if table_dict["source"] == "camelot":
+                        table_dict["table_id"] = f"camelot_table_{camelot_count}"
+                        camelot_count += 1
+                    yield table_dict
+                pages_done += len(pages)
+                if progress:
+                    progress(pages_done, page_count)
+        finally:
+            # Cancels page ranges still queued on the shared pool
+            chunk_results.close()
+
+    def _iter_page_windows(self, document: PdfDocument, page_ranges: List[List[int]],
+                           low_memory: bool = False,
+                           errors: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """Extract page ranges in turn, keeping RSS within memory_budget in low-memory mode"""
+        for pages in page_ranges:
+            yield self._extract_pdf_pages(document, pages, errors)
+
+            if low_memory and _rss_bytes() > self.memory_budget:
+                logger.info(f"RSS above {self.memory_budget} bytes after page {pages[-1]}, reopening document")
+                document.reopen()
+                gc.collect()
+
+    def _vector_lattice_tables(self, page) -> List[List[List[str]]]:
+        """Build cell grids from ruling edges and fill them with the page's characters"""
+        h_edges = np.array([
+            (e["top"], e["x0"], e["x1"]) for e in page.edges
+            if e["orientation"] == "h" and e["width"] >= MIN_RULING_LENGTH
+        ]).reshape(-1, 3)
+        v_edges = np.array([
+            (e["x0"], e["top"], e["bottom"]) for e in page.edges
+            if e["orientation"] == "v" and e["height"] >= MIN_RULING_LENGTH
+        ]).reshape(-1, 3)
+        if len(h_edges) < 2 or len(v_edges) < 2:
+            return []
+
+        h_edges[:, 0] = _snap(h_edges[:, 0])
+        v_edges[:, 0] = _snap(v_edges[:, 0])
+
+        # Rulings that cross each other belong to the same table
+        crosses = (
+            (v_edges[None, :, 0] >= h_edges[:, None, 1] - SNAP_TOLERANCE) &
+            (v_edges[None, :, 0] <= h_edges[:, None, 2] + SNAP_TOLERANCE) &
+            (h_edges[:, None, 0] >= v_edges[None, :, 1] - SNAP_TOLERANCE) &
+            (h_edges[:, None, 0] <= v_edges[None, :, 2] + SNAP_TOLERANCE)
+        )
+
+        char_index = CharIndex(page.chars)
+        grids = []
+        for h_idx, v_idx in _connected_components(crosses):
+            ys = np.unique(h_edges[h_idx, 0])
+            xs = np.unique(v_edges[v_idx, 0])
+            if len(ys) < 3 or len(xs) < 2:
+                continue
+
+            rows = self._fill_grid(char_index, xs, ys, h_edges[h_idx], v_edges[v_idx])
+            if any(cell for row in rows for cell in row):
+                grids.append((ys[0], xs[0], rows))
+
+        # Reading order: top to bottom, then left to right
+        return [rows for _, _, rows in sorted(grids, key=lambda g: (g[0], g[1]))]
+
+    def _fill_grid(self, char_index: CharIndex, xs: np.ndarray, ys: np.ndarray,
+                   h_edges: np.ndarray, v_edges: np.ndarray) -> List[List[str]]:
+        """Assign characters to grid cells by their centre point and join them into text
+
+        Text in merged cells (no ruling between neighbouring cells) goes to the
+        top-left cell of the span.
+        """
+        n_rows, n_cols = len(ys) - 1, len(xs) - 1
+        cells = [[[] for _ in range(n_cols)] for _ in range(n_rows)]
+
+        row_mids = (ys[:-1] + ys[1:]) / 2
+        col_mids = (xs[:-1] + xs[1:]) / 2
+        # has_left[r, c]: a vertical ruling separates cell (r, c) from (r, c - 1)
+        has_left = _rulings_cover(v_edges, xs[1:-1], row_mids).T
+        # has_top[r, c]: a horizontal ruling separates cell (r, c) from (r - 1, c)
+        has_top = _rulings_cover(h_edges, ys[1:-1], col_mids)
+
+        col_start = np.tile(np.arange(n_cols), (n_rows, 1))
+        for c in range(1, n_cols):
+            col_start[:, c] = np.where(has_left[:, c - 1], c, col_start[:, c - 1])
+        row_start = np.tile(np.arange(n_rows)[:, None], (1, n_cols))
+        for r in range(1, n_rows):
+            row_start[r] = np.where(has_top[r - 1], r, row_start[r - 1])
+
+        idx, rows, cols = char_index.grid_cells(xs, ys)
+        cols = col_start[rows, cols]
+        rows = row_start[rows, cols]
+        for i, row, col in zip(idx, rows, cols):
+            cells[row][col].append(char_index.chars[i])
+
+        return [[_join_chars(cell) for cell in row] for row in cells]
+
+    def _whitespace_stream_tables(self, page, words: Optional[List[Dict]] = None) -> List[List[List[str]]]:
+        """Find borderless tables from word positions
+
+        Words are grouped into rows by clustering their baselines. Runs of rows
+        containing wide gaps form table blocks, and a block's columns are split
+        at gutters where an x-projection histogram of its words is empty.
+        ``words`` are the page's words if already extracted.
+        """
+        if words is None:
+            words = page.extract_words()
+        if not words:
+            return []
+
+        x0 = np.array([w["x0"] for w in words])
+        x1 = np.array([w["x1"] for w in words])
+        bottom = np.array([w["bottom"] for w in words])
+
+        # Baseline clustering -> row id per word, rows numbered top to bottom
+        row_of = np.unique(_snap(bottom), return_inverse=True)[1]
+        order = np.lexsort((x0, row_of))
+        row_sorted = row_of[order]
+        row_bounds = np.flatnonzero(np.diff(row_sorted)) + 1
+        row_words = np.split(order, row_bounds)
+
+        # Rows with at least one column-sized gap between neighbouring words
+        gaps = x0[order][1:] - x1[order][:-1]
+        wide = (gaps >= COLUMN_GAP) & (row_sorted[1:] == row_sorted[:-1])
+        n_rows = len(row_words)
+        is_table_row = np.bincount(row_sorted[1:][wide], minlength=n_rows) > 0
+
+        # Consecutive table rows form blocks
+        blocks = []
+        start = None
+        for r in range(n_rows + 1):
+            if r < n_rows and is_table_row[r]:
+                start = r if start is None else start
+            elif start is not None:
+                if r - start >= MIN_COLUMN_ROWS:
+                    blocks.append(range(start, r))
+                start = None
+
+        tables = []
+        for block in blocks:
+            word_idx = np.concatenate([row_words[r] for r in block])
+            boundaries = self._column_gutters(x0[word_idx], x1[word_idx])
+            if len(boundaries) == 0:
+                continue
+
+            # Column of every word in the block at once; word_idx runs row by row
+            word_cols = np.searchsorted(boundaries, (x0[word_idx] + x1[word_idx]) / 2).tolist()
+            rows = []
+            position = 0
+            for r in block:
+                cells = [[] for _ in range(len(boundaries) + 1)]
+                for i, col in zip(row_words[r], word_cols[position:position + len(row_words[r])]):
+                    cells[col].append(words[i]["text"])
+                position += len(row_words[r])
+                rows.append([" ".join(cell) for cell in cells])
+            tables.append(rows)
+
+        return tables
+
+    @staticmethod
+    def _column_gutters(x0: np.ndarray, x1: np.ndarray) -> np.ndarray:
+        """Midpoints of empty vertical strips at least COLUMN_GAP / 2 wide between words"""
+        left = int(np.floor(x0.min()))
+        right = int(np.ceil(x1.max()))
+        coverage = np.zeros(right - left + 2, dtype=np.int32)
+        np.add.at(coverage, np.floor(x0).astype(int) - left, 1)
+        np.add.at(coverage, np.ceil(x1).astype(int) - left, -1)
+        empty = np.cumsum(coverage)[:-1] == 0
+
+        # Start/end indices of runs of empty columns
+        edges = np.diff(np.concatenate(([0], empty.astype(np.int8), [0])))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+        wide = (run_ends - run_starts) >= COLUMN_GAP / 2
+        return (run_starts[wide] + run_ends[wide]) / 2 + left
+
+    def _pdfplumber_tables(self, page) -> List[List[List[Optional[str]]]]:
+        """Find tables with pdfplumber and read their cell text from a character index"""
+        # One index per page instead of pdfplumber filtering every character per cell
+        char_index = CharIndex(page.chars)
+        return [
+            [[char_index.text(cell) if cell else None for cell in row.cells] for row in table.rows]
+            for table in page.find_tables()
+        ]
+
+    def _extract_from_docx(self, source: DocumentSource) -> Dict[str, Union[List[Dict], str]]:
+        """Extract tables from DOCX files"""
+        try:
+            tables_data = list(self._iter_docx_tables(source))
 
         except Exception as e:
             logger.error(f"DOCX extraction failed: {e}")
             return {
                 "tables": [],
                 "error": str(e),
-                "file_name": Path(file_path).name,
+                "file_name": source.name,
                 "status": "failed"
             }
 
         return {
             "tables": tables_data,
-            "file_name": Path(file_path).name,
+            "file_name": source.name,
             "status": "success" if tables_data else "no_tables_found",
-            "extraction_method": "python-docx"
+            "extraction_method": tables_data[-1]["engine"] if tables_data else DOCX_STREAM
         }
 
-    def _process_dataframe(self, df: pd.DataFrame, table_id: str) -> Optional[Dict]:
+    def _iter_docx_tables(self, source: DocumentSource) -> Iterator[Dict]:
+        """Yield DOCX tables in document order
+
+        Tables are streamed straight from word/document.xml; if that fails,
+        python-docx picks up from the first table not yet yielded.
+        """
+        done = 0
+        try:
+            with source.stream() as stream:
+                for table_num, table_data in enumerate(iter_docx_tables(stream)):
+                    table_dict = self._docx_table(table_data, table_num, DOCX_STREAM)
+                    if table_dict:
+                        yield table_dict
+                    done = table_num + 1
+            return
+        except Exception as e:
+            logger.warning(f"Streaming DOCX reader failed, falling back to python-docx: {e}")
+
+        with source.stream() as stream:
+            doc = Document(stream)
+        for table_num, table in enumerate(doc.tables):
+            if table_num < done:
+                continue
+            table_data = [
+                [' '.join([p.text.strip() for p in cell.paragraphs]) for cell in row.cells]
+                for row in table.rows
+            ]
+            table_dict = self._docx_table(table_data, table_num, PYTHON_DOCX)
+            if table_dict:
+                yield table_dict
+
+    def _docx_table(self, table_data: List[List[str]], table_num: int, engine: str) -> Optional[Dict]:
+        """Compact table from DOCX rows, the first row being the headers"""
+        if not table_data or len(table_data) <= 1:
+            return None
+        df = pd.DataFrame(table_data[1:], columns=normalize_headers(table_data[0]))
+        # Word wraps text inside its cells, so DOCX rows never continue one another
+        table_dict = self._process_dataframe(df, f"docx_table_{table_num}", merge_wrapped=False)
+        if table_dict:
+            table_dict["engine"] = engine
+        return table_dict
+
+    def _process_dataframe(self, df: pd.DataFrame, table_id: str, page: Optional[int] = None,
+                           merge_wrapped: bool = True) -> Optional[Dict]:
         """Process and clean DataFrame data"""
         try:
-            # Remove completely empty rows and columns
-            df = df.dropna(how='all').dropna(axis=1, how='all')
+            # Normalize cells and headers, dropping rows and columns left empty
+            df = normalize_table(df, merge_wrapped=merge_wrapped)
 
             if df.empty or len(df) == 0:
                 return None
 
-            # Clean column names
-            df.columns = [str(col).strip() if col else f"col_{i}" for i, col in enumerate(df.columns)]
-
-            # Handle duplicate column names
-            cols = pd.Series(df.columns)
-            for dup in cols[cols.duplicated()].unique():
-                cols[cols[cols == dup].index.values.tolist()] = [
-                    dup + f'_{i}' if i != 0 else dup for i in range(sum(cols == dup))
-                ]
-            df.columns = cols
-
-            return {
-                "table_id": table_id,
-                "headers": df.columns.tolist(),
-                "rows": df.values.tolist(),
-                "shape": df.shape,
-                "source": table_id.split('_')[0],
-                "data": df.to_dict('records')
-            }
+            return compact_table(df, table_id, page)
 
         except Exception as e:
             logger.error(f"Error processing DataFrame: {e}")
@@ -187,7 +1027,7 @@ class TableExtractor:
 
         for table in tables_data:
             try:
-                df = pd.DataFrame(table['data'])
+                df = table_frame(table)
                 csv_path = output_dir / f"{table['table_id']}.csv"
                 df.to_csv(csv_path, index=False)
                 csv_files.append(str(csv_path))
@@ -197,6 +1037,105 @@ class TableExtractor:
 
         return csv_files
 
+    @staticmethod
+    def _typed_column(values: List) -> pa.Array:
+        """Arrow array typed int64 or float64 when every non-empty cell is a number, else string"""
+        strings = pa.array([None if v is None else str(v).strip() for v in values], type=pa.string())
+        cells = pc.if_else(pc.equal(strings, ""), pa.scalar(None, pa.string()), strings)
+
+        if cells.null_count < len(cells) and not pc.any(pc.match_substring_regex(cells, LEADING_ZERO_PATTERN)).as_py():
+            for arrow_type in (pa.int64(), pa.float64()):
+                try:
+                    return pc.cast(cells, arrow_type)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    continue
+        return strings
+
+    def _arrow_table(self, table: Dict) -> pa.Table:
+        """Typed Arrow table built straight from a table's columns"""
+        if "columns" in table:
+            columns = [decode_column(column) for column in table["columns"]]
+        else:
+            columns = [list(column) for column in zip(*table["rows"])] or [[] for _ in table["headers"]]
+        metadata = {"table_id": table["table_id"], "page": table.get("page"), "source": table.get("source")}
+        return pa.table(
+            {header: self._typed_column(values) for header, values in zip(table["headers"], columns)},
+            metadata={b"table": json.dumps(metadata).encode("utf-8")}
+        )
+
+    def _export_arrow_files(self, tables_data: List[Dict], output_dir: Optional[str], extension: str,
+                            write: Callable[[pa.Table, Path], None]) -> List[str]:
+        if not output_dir:
+            output_dir = tempfile.gettempdir()
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(exist_ok=True)
+
+        paths = []
+
+        for table in tables_data:
+            try:
+                path = output_dir / f"{table['table_id']}.{extension}"
+                write(self._arrow_table(table), path)
+                paths.append(str(path))
+                logger.info(f"Exported {extension}: {path}")
+            except Exception as e:
+                logger.error(f"Error exporting table {table['table_id']} to {extension}: {e}")
+
+        return paths
+
+    @staticmethod
+    def _write_parquet(arrow_table: pa.Table, sink):
+        pq.write_table(arrow_table, sink, compression=PARQUET_COMPRESSION)
+
+    @staticmethod
+    def _write_arrow(arrow_table: pa.Table, sink):
+        with ipc.new_file(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+
+    def export_to_parquet(self, tables_data: List[Dict], output_dir: str = None) -> List[str]:
+        """Export tables to Parquet files with typed columns"""
+        return self._export_arrow_files(tables_data, output_dir, "parquet", self._write_parquet)
+
+    def export_to_arrow(self, tables_data: List[Dict], output_dir: str = None) -> List[str]:
+        """Export tables to Arrow IPC files with typed columns"""
+        def write(arrow_table: pa.Table, path: Path):
+            with pa.OSFile(str(path), "wb") as sink:
+                self._write_arrow(arrow_table, sink)
+
+        return self._export_arrow_files(tables_data, output_dir, "arrow", write)
+
+    def iter_export(self, table: Dict, export_format: str) -> Iterator[bytes]:
+        """Encode one table as CSV, Parquet or Arrow, yielding bytes without touching disk
+
+        CSV is produced ``CSV_BATCH_ROWS`` rows at a time; Parquet and Arrow
+        are built in memory for the one table and yielded whole.
+        """
+        if export_format == "csv":
+            yield from self._iter_csv(table)
+        elif export_format in ("parquet", "arrow"):
+            sink = pa.BufferOutputStream()
+            write = self._write_parquet if export_format == "parquet" else self._write_arrow
+            write(self._arrow_table(table), sink)
+            yield sink.getvalue().to_pybytes()
+        else:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+    def _iter_csv(self, table: Dict) -> Iterator[bytes]:
+        text = io.StringIO()
+        writer = csv.writer(text, lineterminator="\n")
+        writer.writerow(table["headers"])
+
+        rows = table_rows(table)
+        for start in range(0, len(rows), CSV_BATCH_ROWS):
+            writer.writerows(rows[start:start + CSV_BATCH_ROWS])
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+
+        if text.tell():
+            yield text.getvalue().encode("utf-8")
+
     def export_to_json(self, extraction_result: Dict, output_path: str = None) -> str:
         """Export extraction results to JSON file"""
         if not output_path:
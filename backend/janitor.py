@@ -0,0 +1,177 @@
+"""
+Background cleanup of expired uploads, extraction results and scratch files
+"""
+
+import logging
+import shutil
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from jobs import JobStore
+from upload_store import UploadStore
+
+logger = logging.getLogger(__name__)
+
+# Unreferenced documents younger than this may be about to get their upload record
+BLOB_GRACE_SECONDS = 60
+
+
+def _path_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return path.stat().st_size
+
+
+class Janitor:
+    """Thread that periodically reclaims disk used by uploads, results and scratch files
+
+    Each run forgets upload records older than ``upload_ttl`` and deletes
+    finished jobs older than ``result_ttl`` through ``delete_extraction``,
+    which also drops their tables and artifacts. Resumable uploads and
+    ``scratch`` entries (``(directory, glob)`` pairs) untouched for
+    ``scratch_ttl`` are removed. Stored documents that no upload record or
+    active job refers to are deleted once unused for ``upload_ttl``, and
+    evicted least recently used first while the upload store is over
+    ``quota_bytes``. Referenced documents are never evicted.
+    """
+
+    def __init__(self, upload_store: UploadStore, uploads: MutableMapping, job_store: JobStore,
+                 delete_extraction: Callable[[str], Optional[int]],
+                 upload_ttl: float = 24 * 3600, result_ttl: float = 7 * 24 * 3600,
+                 quota_bytes: int = 10 * 1024 * 1024 * 1024,
+                 scratch: Iterable[Tuple[str, str]] = (), scratch_ttl: float = 3600,
+                 interval: float = 300):
+        self.upload_store = upload_store
+        self.uploads = uploads
+        self.job_store = job_store
+        self.delete_extraction = delete_extraction
+        self.upload_ttl = upload_ttl
+        self.result_ttl = result_ttl
+        self.quota_bytes = quota_bytes
+        self.scratch = [(Path(directory), pattern) for directory, pattern in scratch]
+        self.scratch_ttl = scratch_ttl
+        self.interval = interval
+        self.totals = {
+            "runs": 0,
+            "bytes_reclaimed": 0,
+            "files_evicted": 0,
+            "quota_evictions": 0,
+            "uploads_expired": 0,
+            "results_expired": 0,
+            "partial_uploads_expired": 0,
+            "scratch_removed": 0
+        }
+        self.last_run = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._work, name="janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _work(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Janitor run failed: {e}")
+
+    def run_once(self) -> Dict:
+        """One cleanup pass; returns what it reclaimed"""
+        now = time.time()
+        run = dict.fromkeys(self.totals, 0)
+        run["runs"] = 1
+
+        for file_id, info in list(self.uploads.items()):
+            if now - info.get("uploaded_at", 0) > self.upload_ttl:
+                try:
+                    del self.uploads[file_id]
+                except KeyError:
+                    # Already removed, e.g. by another server process
+                    continue
+                run["uploads_expired"] += 1
+
+        for job_id in self.job_store.expire(now - self.result_ttl):
+            run["bytes_reclaimed"] += self.delete_extraction(job_id) or 0
+            run["results_expired"] += 1
+
+        count, freed = self.upload_store.expire_partial(now - self.scratch_ttl)
+        run["partial_uploads_expired"] += count
+        run["bytes_reclaimed"] += freed
+
+        for directory, pattern in self.scratch:
+            for path in directory.glob(pattern) if directory.exists() else []:
+                try:
+                    if path.stat().st_mtime > now - self.scratch_ttl:
+                        continue
+                    size = _path_size(path)
+                    if path.is_dir():
+                        shutil.rmtree(path)
+                    else:
+                        path.unlink()
+                except FileNotFoundError:
+                    continue
+                run["scratch_removed"] += 1
+                run["bytes_reclaimed"] += size
+
+        self._evict_blobs(now, run)
+
+        with self._lock:
+            for key, value in run.items():
+                self.totals[key] += value
+            self.last_run = now
+        if run["bytes_reclaimed"]:
+            logger.info(f"Janitor reclaimed {run['bytes_reclaimed']} bytes")
+        return run
+
+    def _referenced_paths(self) -> set:
+        return {info["path"] for info in self.uploads.values()} | self.job_store.active_file_paths()
+
+    def _evict_blobs(self, now: float, run: Dict):
+        blobs = sorted(self.upload_store.blobs(), key=lambda blob: blob["last_used"])
+        total = sum(blob["size"] for blob in blobs)
+        referenced = self._referenced_paths()
+
+        for blob in blobs:
+            idle = now - blob["last_used"]
+            if blob["path"] in referenced or idle < BLOB_GRACE_SECONDS:
+                continue
+            over_quota = total > self.quota_bytes
+            if idle <= self.upload_ttl and not over_quota:
+                continue
+            # Check again right before deleting; an upload may have just reused it
+            if blob["path"] in self._referenced_paths() or not self.upload_store.delete(blob["path"]):
+                continue
+            total -= blob["size"]
+            run["files_evicted"] += 1
+            run["bytes_reclaimed"] += blob["size"]
+            if idle <= self.upload_ttl:
+                run["quota_evictions"] += 1
+
+        if total > self.quota_bytes:
+            logger.warning(f"Uploads use {total} bytes, over the {self.quota_bytes} byte quota, "
+                           f"but every remaining document is still in use")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self.totals,
+                "last_run": self.last_run,
+                "upload_bytes": sum(blob["size"] for blob in self.upload_store.blobs()),
+                "quota_bytes": self.quota_bytes,
+                "upload_ttl": self.upload_ttl,
+                "result_ttl": self.result_ttl
+            }
@@ -0,0 +1,416 @@
+"""
+Durable extraction jobs backed by a local SQLite database
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import psutil
+
+from table_spill import TableSpill, close_tables, iter_result_json
+
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    file_id TEXT,
+    file_path TEXT,
+    file_name TEXT,
+    options TEXT NOT NULL DEFAULT '{}',
+    progress REAL NOT NULL DEFAULT 0,
+    table_count INTEGER,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker_pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL REFERENCES jobs (job_id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+# Result JSON is written to job_results in pieces of about this many characters,
+# so a large result never has to be held as one string
+RESULT_CHUNK_SIZE = 1 << 20
+
+# Columns returned for job status (everything but the result payload)
+STATUS_COLUMNS = (
+    "job_id", "status", "file_id", "file_name", "options", "progress",
+    "table_count", "error", "created_at", "started_at", "finished_at"
+)
+
+
+class JobStore:
+    """Persists extraction jobs and their results in a SQLite file"""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if "worker_pid" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN worker_pid INTEGER")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(sql, params)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row) -> Dict:
+        job = dict(row)
+        job["options"] = json.loads(job.get("options") or "{}")
+        if "result" in job:
+            job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, file_id: str, file_path: str, file_name: str, options: Dict) -> Dict:
+        """Queue a new extraction job"""
+        job_id = str(uuid.uuid4())
+        self._execute(
+            "INSERT INTO jobs (job_id, status, file_id, file_path, file_name, options, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, file_id, file_path, file_name, json.dumps(options), time.time())
+        )
+        return self.get(job_id)
+
+    @staticmethod
+    def _write_result(conn: sqlite3.Connection, job_id: str, result: Dict):
+        """Replace a job's stored result JSON, inserting it in pieces as it is encoded"""
+        conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+        seq = 0
+        buffer, size = [], 0
+        for piece in iter_result_json(result):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= RESULT_CHUNK_SIZE:
+                conn.execute("INSERT INTO job_results (job_id, seq, data) VALUES (?, ?, ?)",
+                             (job_id, seq, "".join(buffer)))
+                seq += 1
+                buffer, size = [], 0
+        if buffer:
+            conn.execute("INSERT INTO job_results (job_id, seq, data) VALUES (?, ?, ?)",
+                         (job_id, seq, "".join(buffer)))
+
+    def _read_result(self, conn: sqlite3.Connection, job_id: str) -> Optional[str]:
+        rows = conn.execute(
+            "SELECT data FROM job_results WHERE job_id = ? ORDER BY seq", (job_id,)
+        ).fetchall()
+        return "".join(row["data"] for row in rows) if rows else None
+
+    def record(self, job_id: str, result: Dict):
+        """Store a result produced outside the job queue as a completed job"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+                conn.execute(
+                    "INSERT INTO jobs (job_id, status, file_id, file_name, progress, table_count, "
+                    "error, created_at, started_at, finished_at) VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?)",
+                    (job_id, COMPLETED, result.get("file_id"), result.get("file_name"),
+                     len(result.get("tables", [])), result.get("error"), now, now, now)
+                )
+                self._write_result(conn, job_id, result)
+        finally:
+            conn.close()
+
+    def claim_next(self) -> Optional[Dict]:
+        """Atomically move the oldest queued job to running and return it"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT job_id, file_path, options FROM jobs WHERE status = ? "
+                    "ORDER BY created_at LIMIT 1",
+                    (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, worker_pid = ? WHERE job_id = ?",
+                    (RUNNING, time.time(), os.getpid(), row["job_id"])
+                )
+                return {
+                    "job_id": row["job_id"],
+                    "file_path": row["file_path"],
+                    "options": json.loads(row["options"])
+                }
+        finally:
+            conn.close()
+
+    def update_progress(self, job_id: str, progress: float):
+        self._execute("UPDATE jobs SET progress = ? WHERE job_id = ?", (progress, job_id))
+
+    def complete(self, job_id: str, result: Dict):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, progress = 1, table_count = ?, result = NULL, error = ?, "
+                    "finished_at = ? WHERE job_id = ?",
+                    (COMPLETED, len(result.get("tables", [])), result.get("error"), time.time(), job_id)
+                )
+                self._write_result(conn, job_id, result)
+        finally:
+            conn.close()
+
+    def fail(self, job_id: str, error: str):
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?",
+            (FAILED, error, time.time(), job_id)
+        )
+
+    def requeue_running(self) -> int:
+        """Put jobs interrupted by a restart back on the queue
+
+        Jobs still held by another live worker process are left alone, so
+        several server processes can share the database.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                rows = conn.execute(
+                    "SELECT job_id, worker_pid FROM jobs WHERE status = ?", (RUNNING,)
+                ).fetchall()
+                interrupted = [
+                    (QUEUED, row["job_id"]) for row in rows
+                    if row["worker_pid"] in (None, os.getpid()) or not psutil.pid_exists(row["worker_pid"])
+                ]
+                conn.executemany(
+                    "UPDATE jobs SET status = ?, progress = 0, started_at = NULL, worker_pid = NULL "
+                    "WHERE job_id = ?",
+                    interrupted
+                )
+        finally:
+            conn.close()
+        return len(interrupted)
+
+    def get(self, job_id: str, include_result: bool = False) -> Optional[Dict]:
+        columns = STATUS_COLUMNS + ("result",) if include_result else STATUS_COLUMNS
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f"SELECT {', '.join(columns)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            # Results written before job_results existed are still in the jobs row
+            if include_result and job["result"] is None:
+                job["result"] = self._read_result(conn, job_id)
+        finally:
+            conn.close()
+        return self._row_to_job(job)
+
+    def list(self, status: Optional[str] = None, file_id: Optional[str] = None) -> List[Dict]:
+        sql = f"SELECT {', '.join(STATUS_COLUMNS)} FROM jobs"
+        conditions = []
+        params = ()
+        if status:
+            conditions.append("status = ?")
+            params += (status,)
+        if file_id:
+            conditions.append("file_id = ?")
+            params += (file_id,)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql + " ORDER BY created_at", params).fetchall()
+        finally:
+            conn.close()
+        return [self._row_to_job(row) for row in rows]
+
+    def active_file_paths(self) -> set:
+        """Documents that queued or running jobs still need"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT file_path FROM jobs WHERE status IN (?, ?) AND file_path IS NOT NULL",
+                (QUEUED, RUNNING)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {row["file_path"] for row in rows}
+
+    def expire(self, finished_before: float) -> List[str]:
+        """Delete completed and failed jobs that finished before ``finished_before``, returning their IDs"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                job_ids = [row["job_id"] for row in conn.execute(
+                    "SELECT job_id FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                    (COMPLETED, FAILED, finished_before)
+                )]
+                conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+        finally:
+            conn.close()
+        return job_ids
+
+    def delete(self, job_id: str) -> bool:
+        return self._execute("DELETE FROM jobs WHERE job_id = ?", (job_id,)).rowcount > 0
+
+    def clear(self, status: Optional[str] = None) -> int:
+        if status:
+            return self._execute("DELETE FROM jobs WHERE status = ?", (status,)).rowcount
+        return self._execute("DELETE FROM jobs").rowcount
+
+
+class CompletedJobsView(MutableMapping):
+    """Dict-style view of completed job results, keyed by extraction/job ID"""
+
+    def __init__(self, store: JobStore):
+        self.store = store
+
+    def __getitem__(self, extraction_id: str) -> Dict:
+        job = self.store.get(extraction_id, include_result=True)
+        if not job or job["status"] != COMPLETED:
+            raise KeyError(extraction_id)
+        return job["result"]
+
+    def __setitem__(self, extraction_id: str, result: Dict):
+        self.store.record(extraction_id, result)
+
+    def __delitem__(self, extraction_id: str):
+        if extraction_id not in self or not self.store.delete(extraction_id):
+            raise KeyError(extraction_id)
+
+    def __contains__(self, extraction_id) -> bool:
+        job = self.store.get(extraction_id)
+        return job is not None and job["status"] == COMPLETED
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([job["job_id"] for job in self.store.list(COMPLETED)])
+
+    def __len__(self) -> int:
+        return len(self.store.list(COMPLETED))
+
+    def clear(self):
+        self.store.clear(COMPLETED)
+
+
+class JobRunner:
+    """Pool of worker threads that process queued jobs from a JobStore"""
+
+    def __init__(self, store: JobStore, extractor, workers: int = 2, poll_interval: float = 1.0,
+                 table_sink: Optional[Callable[[str, Iterable[Dict]], None]] = None):
+        self.store = store
+        self.extractor = extractor
+        # Receives spilled tables while they are still on disk, e.g. TableStore.put
+        self.table_sink = table_sink
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Requeue interrupted jobs and start the worker threads"""
+        requeued = self.store.requeue_running()
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted extraction jobs")
+
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, file_id: str, file_path: str, file_name: str, options: Dict) -> Dict:
+        """Queue an extraction and wake a worker"""
+        job = self.store.create(file_id, file_path, file_name, options)
+        self._wakeup.set()
+        return job
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim_next()
+            except Exception as e:
+                logger.error(f"Could not claim job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._run(job)
+
+    def _run(self, job: Dict):
+        job_id = job["job_id"]
+        logger.info(f"Running extraction job {job_id}")
+
+        def report_progress(done: int, total: int):
+            if total:
+                self.store.update_progress(job_id, done / total)
+
+        try:
+            if not job["file_path"] or not Path(job["file_path"]).exists():
+                raise FileNotFoundError("File no longer exists on server.")
+
+            result = self.extractor.extract_tables(job["file_path"], progress=report_progress, **job["options"])
+            try:
+                if result.get("status") == "failed":
+                    logger.error(f"Extraction job {job_id} failed: {result.get('error')}")
+                    self.store.fail(job_id, result.get("error") or "Extraction failed.")
+                    return
+                if self.table_sink is not None and isinstance(result["tables"], TableSpill):
+                    self.table_sink(job_id, result["tables"])
+                full_job = self.store.get(job_id)
+                self.store.complete(job_id, {
+                    **result,
+                    "file_id": full_job["file_id"],
+                    "extraction_id": job_id
+                })
+            finally:
+                close_tables(result)
+            logger.info(f"Extraction job {job_id} completed")
+
+        except Exception as e:
+            logger.error(f"Extraction job {job_id} failed: {e}")
+            self.store.fail(job_id, str(e))
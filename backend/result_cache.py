@@ -0,0 +1,159 @@
+"""
+Content-addressed, disk-backed cache of extraction results
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from table_spill import iter_result_json
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    cache_key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+"""
+
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Stores extraction results by document hash, options and engine versions
+
+    Entries are kept in a SQLite file so they survive restarts. Once the
+    stored (compressed) size exceeds ``max_bytes`` the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def make_key(content_hash: str, options: Dict) -> str:
+        """Cache key for a document hash plus everything that affects its result"""
+        settings = json.dumps(options, sort_keys=True, default=str)
+        return hashlib.sha256(f"{content_hash}:{settings}".encode("utf-8")).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT value FROM results WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE results SET last_access = ? WHERE cache_key = ?",
+                        (time.time(), cache_key)
+                    )
+        finally:
+            conn.close()
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, cache_key: str, result: Dict):
+        compressor = zlib.compressobj(1)
+        value = b"".join(
+            compressor.compress(piece.encode("utf-8")) for piece in iter_result_json(result, ensure_ascii=False)
+        ) + compressor.flush()
+        if len(value) > self.max_bytes:
+            logger.info(f"Result too large to cache ({len(value)} bytes)")
+            return
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (cache_key, value, size, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (cache_key, value, len(value), now, now)
+                )
+                self._evict(conn)
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for cache_key, size in conn.execute("SELECT cache_key, size FROM results ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((cache_key,))
+            total -= size
+
+        conn.executemany("DELETE FROM results WHERE cache_key = ?", evicted)
+        with self._lock:
+            self.evictions += len(evicted)
+        logger.info(f"Evicted {len(evicted)} cached results")
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM results")
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        try:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        finally:
+            conn.close()
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes
+            }
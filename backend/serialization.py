@@ -0,0 +1,165 @@
+"""
+Content-negotiated, optionally compressed encoding of extraction results
+"""
+
+import gzip
+import json
+import logging
+from typing import Dict, Optional, Tuple
+
+import msgpack
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import ujson
+import zstandard
+from fastapi import Request
+from fastapi.responses import Response
+
+from table_format import decode_column
+
+logger = logging.getLogger(__name__)
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+# Accept header values mapped to the media type we answer with
+MEDIA_TYPES = {
+    JSON: JSON,
+    "application/*": JSON,
+    "*/*": JSON,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    ARROW: ARROW,
+    "application/vnd.apache.arrow.file": ARROW
+}
+
+# Bodies smaller than this are sent uncompressed
+DEFAULT_COMPRESS_MIN_BYTES = 64 * 1024
+
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 5
+
+# Schema of the Arrow stream: one row per table, result fields in the schema metadata
+ARROW_SCHEMA = pa.schema([
+    ("table_id", pa.string()),
+    ("page", pa.int32()),
+    ("source", pa.string()),
+    ("engine", pa.string()),
+    ("headers", pa.list_(pa.string())),
+    ("columns", pa.list_(pa.list_(pa.string())))
+])
+
+
+def _parse_header(value: Optional[str]) -> list:
+    """Tokens of a comma separated header in preference order, dropping q=0"""
+    tokens = []
+    for position, part in enumerate((value or "").split(",")):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, q = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(q)
+                except ValueError:
+                    quality = 0.0
+        if token and quality > 0:
+            tokens.append((-quality, position, token.strip().lower()))
+    return [token for _, _, token in sorted(tokens)]
+
+
+def negotiate_media_type(accept: Optional[str]) -> Optional[str]:
+    """Media type to answer with, JSON when no Accept header; None if nothing acceptable"""
+    if not accept:
+        return JSON
+    for token in _parse_header(accept):
+        if token in MEDIA_TYPES:
+            return MEDIA_TYPES[token]
+    return None
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    for token in _parse_header(accept_encoding):
+        if token in ("zstd", "gzip"):
+            return token
+    return None
+
+
+def dumps_json(content) -> bytes:
+    return ujson.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_msgpack(content) -> bytes:
+    return msgpack.packb(content, use_bin_type=True)
+
+
+def _string_columns(table: Dict) -> list:
+    if "columns" in table:
+        columns = [decode_column(column) for column in table["columns"]]
+    else:
+        columns = list(zip(*table["rows"]))
+    return [[None if v is None else str(v) for v in column] for column in columns]
+
+
+def dumps_arrow(result: Dict) -> bytes:
+    """Arrow IPC stream with one row per table; everything else goes in the schema metadata"""
+    tables = result.get("tables", [])
+    meta = {key: value for key, value in result.items() if key != "tables"}
+    columns = {
+        "table_id": [t.get("table_id") for t in tables],
+        "page": [t.get("page") for t in tables],
+        "source": [t.get("source") for t in tables],
+        "engine": [t.get("engine") for t in tables],
+        "headers": [t.get("headers") for t in tables],
+        "columns": [_string_columns(t) for t in tables]
+    }
+    schema = ARROW_SCHEMA.with_metadata({b"result": json.dumps(meta, ensure_ascii=False).encode("utf-8")})
+    batch = pa.record_batch([pa.array(columns[f.name], type=f.type) for f in ARROW_SCHEMA], schema=schema)
+
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def compress(body: bytes, encoding: Optional[str],
+             min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES) -> Tuple[bytes, Optional[str]]:
+    """Compress ``body`` with the negotiated encoding if it is large enough"""
+    if encoding is None or len(body) < min_bytes:
+        return body, None
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body), "zstd"
+    return gzip.compress(body, compresslevel=GZIP_LEVEL), "gzip"
+
+
+def encode_response(request: Request, content: Dict,
+                    min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES,
+                    status_code: int = 200) -> Response:
+    """Serialize ``content`` as the client asked for, skipping response model validation
+
+    Arrow is only available for extraction results (dicts with ``tables``);
+    other content falls back to JSON.
+    """
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    if media_type is None:
+        return Response(
+            status_code=406,
+            content=dumps_json({"detail": f"Supported media types: {JSON}, {MSGPACK}, {ARROW}"}),
+            media_type=JSON
+        )
+
+    if media_type == ARROW and "tables" in content:
+        body = dumps_arrow(content)
+    elif media_type == MSGPACK:
+        body = dumps_msgpack(content)
+    else:
+        media_type = JSON
+        body = dumps_json(content)
+
+    body, encoding = compress(body, negotiate_encoding(request.headers.get("accept-encoding")), min_bytes)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
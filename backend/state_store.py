@@ -0,0 +1,130 @@
+"""
+Key-value state shared by the backend's worker processes
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+
+class SQLiteMapping(MutableMapping):
+    """JSON values under one namespace of a SQLite state database"""
+
+    def __init__(self, db_path: Path, namespace: str):
+        self.db_path = db_path
+        self.namespace = namespace
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(sql, (self.namespace,) + params).fetchall()
+        finally:
+            conn.close()
+
+    def __getitem__(self, key: str) -> Any:
+        rows = self._query("SELECT value FROM state WHERE namespace = ? AND key = ?", (key,))
+        if not rows:
+            raise KeyError(key)
+        return json.loads(rows[0][0])
+
+    def __setitem__(self, key: str, value: Any):
+        self._query(
+            "INSERT OR REPLACE INTO state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), time.time())
+        )
+
+    def __delitem__(self, key: str):
+        conn = self._connect()
+        try:
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM state WHERE namespace = ? AND key = ?", (self.namespace, key)
+                ).rowcount
+        finally:
+            conn.close()
+        if not deleted:
+            raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return bool(self._query("SELECT 1 FROM state WHERE namespace = ? AND key = ?", (key,)))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter([row[0] for row in self._query("SELECT key FROM state WHERE namespace = ?")])
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM state WHERE namespace = ?")[0][0]
+
+    def items(self):
+        """All entries in one query rather than a lookup per key"""
+        return [(key, json.loads(value))
+                for key, value in self._query("SELECT key, value FROM state WHERE namespace = ?")]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def clear(self):
+        self._query("DELETE FROM state WHERE namespace = ?")
+
+
+class SQLiteState:
+    """State in one SQLite file, visible to every worker process on the host"""
+
+    shared = True
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def namespace(self, name: str) -> MutableMapping:
+        return SQLiteMapping(self.db_path, name)
+
+
+class MemoryState:
+    """State in plain dicts; only for a single worker process"""
+
+    shared = False
+
+    def __init__(self):
+        self._namespaces: Dict[str, Dict] = {}
+
+    def namespace(self, name: str) -> MutableMapping:
+        return self._namespaces.setdefault(name, {})
+
+
+STATE_BACKENDS = ("memory", "sqlite")
+
+
+def open_state(backend: str, data_dir: str):
+    """State backend by name: 'sqlite' (DATA_DIR/state.sqlite3) or 'memory'"""
+    if backend == "sqlite":
+        return SQLiteState(Path(data_dir) / "state.sqlite3")
+    if backend == "memory":
+        return MemoryState()
+    raise ValueError(f"Unknown state backend '{backend}'. Use one of: {', '.join(STATE_BACKENDS)}.")
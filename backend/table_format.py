@@ -0,0 +1,79 @@
+"""
+Versioned, column-oriented representation of extracted tables
+"""
+
+from typing import Dict, List, Union
+
+import pandas as pd
+
+# Stored in every compact table so readers can tell encodings apart
+TABLE_FORMAT = "columnar-v1"
+
+# Result shapes a client can ask for
+COMPACT = "compact"
+LEGACY = "legacy"
+TABLE_FORMATS = (COMPACT, LEGACY)
+
+# Columns with at most this many distinct values per row are dictionary encoded
+DICTIONARY_RATIO = 0.5
+
+
+def encode_column(values: pd.Series) -> Union[List, Dict]:
+    """Plain list of values, or ``{"dictionary", "indices"}`` when values repeat a lot
+
+    Nulls are index -1 in the dictionary encoding.
+    """
+    indices, dictionary = pd.factorize(values, use_na_sentinel=True)
+    if len(values) < 2 or len(dictionary) > len(values) * DICTIONARY_RATIO:
+        return [None if pd.isna(v) else v for v in values.tolist()]
+    return {"dictionary": dictionary.tolist(), "indices": indices.tolist()}
+
+
+def decode_column(column: Union[List, Dict]) -> List:
+    if isinstance(column, dict):
+        dictionary = column["dictionary"]
+        return [dictionary[i] if i >= 0 else None for i in column["indices"]]
+    return column
+
+
+def compact_table(df: pd.DataFrame, table_id: str, page=None) -> Dict:
+    """Compact table dict for a cleaned DataFrame"""
+    return {
+        "table_id": table_id,
+        "format": TABLE_FORMAT,
+        "headers": df.columns.tolist(),
+        "columns": [encode_column(df.iloc[:, j]) for j in range(df.shape[1])],
+        "shape": df.shape,
+        "source": table_id.split('_')[0],
+        "page": page
+    }
+
+
+def table_rows(table: Dict) -> List[List]:
+    """Row-major cell values of a compact or legacy table"""
+    if "columns" not in table:
+        return table["rows"]
+    columns = [decode_column(column) for column in table["columns"]]
+    return [list(row) for row in zip(*columns)]
+
+
+def table_frame(table: Dict) -> pd.DataFrame:
+    return pd.DataFrame(table_rows(table), columns=table["headers"])
+
+
+def to_legacy(table: Dict) -> Dict:
+    """Expand a compact table to the original headers/rows/data shape"""
+    if "columns" not in table:
+        return table
+    rows = table_rows(table)
+    legacy = {key: value for key, value in table.items() if key not in ("columns", "format")}
+    legacy["rows"] = rows
+    legacy["data"] = [dict(zip(table["headers"], row)) for row in rows]
+    return legacy
+
+
+def format_result(result: Dict, table_format: str = COMPACT) -> Dict:
+    """Extraction result with its tables in the requested shape"""
+    if table_format == LEGACY and result.get("tables"):
+        return {**result, "tables": [to_legacy(table) for table in result["tables"]]}
+    return result
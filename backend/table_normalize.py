@@ -0,0 +1,152 @@
+"""
+Vectorized cleanup of extracted table cells and headers, shared by every engine
+"""
+
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Amounts (with any currency sign), counts, percentages and dates; a row containing
+# one is a row of its own rather than wrapped text
+NUMBER_PATTERN = r"^\W*\d[\d\s,.:/-]*\W*$"
+
+
+def _string_array(values: pd.Series) -> pa.Array:
+    """Cells of a column as Arrow strings; string columns convert without copying"""
+    try:
+        return pa.array(values, type=pa.large_string(), from_pandas=True)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # Some engines hand back numbers; text is all we keep
+        return pa.array(values.astype("string"), type=pa.large_string(), from_pandas=True)
+
+
+def _present(columns: List[pa.Array]) -> np.ndarray:
+    """Rows x columns mask of non-null cells"""
+    return np.column_stack([pc.is_valid(column).to_numpy(zero_copy_only=False) for column in columns])
+
+
+def normalize_cells(strings: pa.Array) -> pa.Array:
+    """Trim and collapse whitespace runs to one space; blank cells become null"""
+    words = pc.utf8_split_whitespace(strings)
+    collapsed = pc.utf8_trim_whitespace(pc.binary_join(words, pa.scalar(" ", strings.type)))
+    return pc.if_else(pc.equal(collapsed, ""), pa.scalar(None, collapsed.type), collapsed)
+
+
+def _blank(header) -> bool:
+    if isinstance(header, str):
+        return not header.strip()
+    return header is None or pd.isna(header) or not header
+
+
+def normalize_headers(headers: Iterable) -> List[str]:
+    """Clean, unique column names in one pass
+
+    Whitespace is collapsed, empty headers become ``col_<i>`` and repeats
+    get ``_1``, ``_2``... suffixes that never clash with another header.
+    """
+    names = [f"col_{i}" if _blank(header) else " ".join(str(header).split()) for i, header in enumerate(headers)]
+    taken = set(names)
+    seen = {}
+    unique = []
+    for name in names:
+        count = seen.get(name, 0)
+        if count:
+            while f"{name}_{count}" in taken:
+                count += 1
+            taken.add(f"{name}_{count}")
+            unique.append(f"{name}_{count}")
+        else:
+            unique.append(name)
+        seen[name] = count + 1
+    return unique
+
+
+def _anchors(continued: np.ndarray) -> np.ndarray:
+    """Index of the row each row belongs to: itself, or the last row that isn't continued"""
+    starts = np.flatnonzero(~continued)
+    return starts[np.cumsum(~continued) - 1]
+
+
+def merge_wrapped_rows(columns: List[pa.Array]) -> List[pa.Array]:
+    """Fold rows holding text wrapped over from the row above back into it
+
+    A continuation row has an empty first cell, contains no numbers, and
+    only has text in columns where its row has text, filling at most half
+    as many cells. It is never appended to a number in its row (a quantity
+    or price), so labels such as "Subtotal" don't fold into figures.
+    ``columns`` must already be normalized.
+    """
+    if len(columns) < 2 or len(columns[0]) < 2:
+        return columns
+
+    present = _present(columns)
+    filled = present.sum(axis=1)
+    continued = ~present[:, 0] & (filled > 0)
+    continued[0] = False
+    if not continued.any():
+        return columns
+
+    numeric = np.column_stack([
+        pc.fill_null(pc.match_substring_regex(column, NUMBER_PATTERN), False).to_numpy(zero_copy_only=False)
+        for column in columns
+    ])
+    continued &= ~numeric.any(axis=1)
+
+    # Dropping a candidate can change which row the ones after it continue, so
+    # re-check against the new anchors until nothing changes
+    while continued.any():
+        anchors = _anchors(continued)
+        fits = (~(present & ~present[anchors]).any(axis=1) & ~(present & numeric[anchors]).any(axis=1)
+                & (2 * filled <= filled[anchors]))
+        still = continued & fits
+        if (still == continued).all():
+            break
+        continued = still
+
+    if not continued.any():
+        return columns
+
+    anchors = _anchors(continued)
+    rows = np.flatnonzero(continued)
+    merged = []
+    for j, column in enumerate(columns):
+        wrapped = rows[present[rows, j]]
+        if wrapped.size:
+            # Only the cells that change leave Arrow; rows come in order, so anchors do too
+            texts = {}
+            targets = anchors[wrapped]
+            for anchor, head, tail in zip(targets, pc.take(column, targets).to_pylist(),
+                                          pc.take(column, wrapped).to_pylist()):
+                texts[anchor] = f"{texts.get(anchor, head)} {tail}"
+            mask = np.zeros(len(column), dtype=bool)
+            mask[list(texts)] = True
+            column = pc.replace_with_mask(column, mask, pa.array(list(texts.values()), type=column.type))
+        merged.append(pc.filter(column, ~continued))
+    return merged
+
+
+def normalize_table(df: pd.DataFrame, merge_wrapped: bool = True) -> pd.DataFrame:
+    """Cleaned copy of an extracted table, without empty rows and columns
+
+    Cells are trimmed with whitespace runs collapsed to one space, blank
+    cells become null, wrapped rows are merged (if ``merge_wrapped``) and
+    headers are cleaned and made unique. All cells go through Arrow's string
+    kernels as one array rather than being cleaned column by column.
+    """
+    if df.shape[1] == 0:
+        return pd.DataFrame()
+
+    row_count = len(df)
+    cells = normalize_cells(pa.concat_arrays([_string_array(df.iloc[:, j]) for j in range(df.shape[1])]))
+    columns = [cells.slice(j * row_count, row_count) for j in range(df.shape[1])]
+    if merge_wrapped:
+        columns = merge_wrapped_rows(columns)
+
+    present = _present(columns)
+    keep_rows = present.any(axis=1)
+    keep_columns = np.flatnonzero(present.any(axis=0))
+    headers = normalize_headers(df.columns[j] for j in keep_columns)
+    return pa.table([pc.filter(columns[j], keep_rows) for j in keep_columns], names=headers).to_pandas()
@@ -0,0 +1,111 @@
+"""
+Temporary on-disk columnar store for tables produced during an extraction
+"""
+
+import json
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from table_format import decode_column, encode_column
+
+logger = logging.getLogger(__name__)
+
+# Schema metadata key holding everything about a table except its cells
+META_KEY = b"table"
+
+
+def table_to_arrow(table_dict: Dict) -> pa.Table:
+    """Arrow table of a compact table's cells as string columns, other fields in the schema metadata"""
+    columns = [
+        [None if value is None else str(value) for value in decode_column(column)]
+        for column in table_dict["columns"]
+    ]
+    meta = {key: value for key, value in table_dict.items() if key != "columns"}
+    return pa.table(
+        {f"c{j}": pa.array(column, type=pa.string()) for j, column in enumerate(columns)},
+        metadata={META_KEY: json.dumps(meta, ensure_ascii=False).encode("utf-8")}
+    )
+
+
+def table_from_arrow(arrow_table: pa.Table) -> Dict:
+    """Inverse of table_to_arrow"""
+    table_dict = json.loads(arrow_table.schema.metadata[META_KEY])
+    table_dict["columns"] = [
+        encode_column(pd.Series(column.to_pylist(), dtype=object)) for column in arrow_table.columns
+    ]
+    return table_dict
+
+
+def iter_result_json(result: Dict, ensure_ascii: bool = True) -> Iterator[str]:
+    """JSON text of an extraction result in pieces, encoding one table at a time
+
+    Spilled tables are read back from disk as they are encoded, so a large
+    result never has to be in memory as Python objects all at once.
+    """
+    if "tables" not in result:
+        yield json.dumps(result, ensure_ascii=ensure_ascii)
+        return
+
+    fields = {key: value for key, value in result.items() if key != "tables"}
+    yield json.dumps(fields, ensure_ascii=ensure_ascii)[:-1] + (", " if fields else "") + '"tables": ['
+    for i, table_dict in enumerate(result["tables"]):
+        yield ("," if i else "") + json.dumps(table_dict, ensure_ascii=ensure_ascii)
+    yield "]}"
+
+
+def close_tables(result: Dict):
+    """Remove the spill behind a low-memory result once its tables have been consumed"""
+    tables = result.get("tables")
+    if isinstance(tables, TableSpill):
+        tables.close()
+
+
+class TableSpill:
+    """Appends finished tables to Arrow IPC files in a temp directory
+
+    Lets an extraction drop each table from memory as soon as it is produced.
+    Iterating reads them back one at a time, in order, until :meth:`close`.
+    ``entries`` keeps each table's page and engine for the result summary.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        if directory:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        self.path = Path(tempfile.mkdtemp(prefix="spill_", dir=directory))
+        self.count = 0
+        self.bytes = 0
+        self.entries: List[Dict] = []
+
+    def append(self, table_dict: Dict):
+        table_path = self.path / f"{self.count:06d}.arrow"
+        with pa.OSFile(str(table_path), "wb") as sink:
+            arrow_table = table_to_arrow(table_dict)
+            with ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+        self.bytes += table_path.stat().st_size
+        self.count += 1
+        self.entries.append({"page": table_dict.get("page"), "engine": table_dict.get("engine")})
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self.count):
+            with pa.memory_map(str(self.path / f"{i:06d}.arrow")) as source:
+                yield table_from_arrow(ipc.open_file(source).read_all())
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
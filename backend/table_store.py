@@ -0,0 +1,168 @@
+"""
+Per-table columnar store for reading windows of large extracted tables
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+from table_format import TABLE_FORMAT, encode_column
+from table_spill import META_KEY, table_to_arrow
+
+logger = logging.getLogger(__name__)
+
+# Row filter operators; gt/ge/lt/le compare numerically when the value is a number
+FILTER_OPS = ("eq", "ne", "contains", "gt", "ge", "lt", "le")
+FILTER_PATTERN = re.compile(rf"^(?P<column>.+?):(?P<op>{'|'.join(FILTER_OPS)}):(?P<value>.*)$", re.S)
+NUMBER_PATTERN = r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$"
+
+COMPARE = {"gt": pc.greater, "ge": pc.greater_equal, "lt": pc.less, "le": pc.less_equal}
+
+
+def parse_filter(expression: str) -> Tuple[str, str, str]:
+    """Split ``column:op:value`` into its parts"""
+    match = FILTER_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"Invalid filter '{expression}'. Use column:op:value with op one of {', '.join(FILTER_OPS)}.")
+    return match.group("column"), match.group("op"), match.group("value")
+
+
+def _as_number(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _filter_mask(column: pa.ChunkedArray, op: str, value: str) -> pa.ChunkedArray:
+    if op == "eq":
+        return pc.equal(column, value)
+    if op == "ne":
+        return pc.not_equal(column, value)
+    if op == "contains":
+        return pc.match_substring(column, value, ignore_case=True)
+
+    number = _as_number(value)
+    if number is None:
+        return COMPARE[op](column, value)
+    # Non-numeric cells become null and never match a numeric range
+    numeric = pc.if_else(pc.match_substring_regex(column, NUMBER_PATTERN), column, None)
+    return COMPARE[op](pc.cast(pc.utf8_trim_whitespace(numeric), pa.float64()), number)
+
+
+class TableStore:
+    """Keeps each extracted table as a memory-mapped Arrow IPC file
+
+    Tables live under ``root/<extraction_id>/`` and are written once per
+    extraction; windows are then read without loading the rest of the table.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _dir(self, extraction_id: str) -> Path:
+        return self.root / extraction_id
+
+    def _table_path(self, extraction_id: str, index: int) -> Path:
+        return self._dir(extraction_id) / f"{index:06d}.arrow"
+
+    def has(self, extraction_id: str) -> bool:
+        return (self._dir(extraction_id) / "index.json").exists()
+
+    def put(self, extraction_id: str, tables: Iterable[Dict]):
+        """Write every table of an extraction, replacing anything stored before"""
+        with self._lock:
+            staging = self.root / f".{extraction_id}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir()
+
+            table_ids = []
+            for index, table_dict in enumerate(tables):
+                arrow_table = table_to_arrow(table_dict)
+                with pa.OSFile(str(staging / f"{index:06d}.arrow"), "wb") as sink:
+                    with ipc.new_file(sink, arrow_table.schema) as writer:
+                        writer.write_table(arrow_table)
+                table_ids.append(table_dict["table_id"])
+
+            (staging / "index.json").write_text(json.dumps(table_ids))
+            shutil.rmtree(self._dir(extraction_id), ignore_errors=True)
+            os.replace(staging, self._dir(extraction_id))
+
+    def size(self, extraction_id: str) -> int:
+        """Bytes on disk used by an extraction's tables"""
+        path = self._dir(extraction_id)
+        return sum(f.stat().st_size for f in path.iterdir()) if path.exists() else 0
+
+    def delete(self, extraction_id: str) -> bool:
+        path = self._dir(extraction_id)
+        if not path.exists():
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        return True
+
+    def clear(self):
+        for path in self.root.iterdir():
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _open(self, extraction_id: str, table_id: str) -> Optional[pa.Table]:
+        table_ids = json.loads((self._dir(extraction_id) / "index.json").read_text())
+        if table_id not in table_ids:
+            return None
+        source = pa.memory_map(str(self._table_path(extraction_id, table_ids.index(table_id))))
+        return ipc.open_file(source).read_all()
+
+    def window(self, extraction_id: str, table_id: str, offset: int = 0, limit: int = 100,
+               columns: Optional[List[str]] = None, filters: Optional[List[str]] = None) -> Optional[Dict]:
+        """Rows ``offset`` to ``offset + limit`` of a table as a compact table dict
+
+        ``columns`` selects and orders columns by header; ``filters`` are
+        ``column:op:value`` expressions that must all match. ``total_rows``
+        counts the rows matching the filters. Returns None for unknown tables;
+        raises ValueError for unknown columns or bad filters.
+        """
+        arrow_table = self._open(extraction_id, table_id)
+        if arrow_table is None:
+            return None
+
+        meta = json.loads(arrow_table.schema.metadata[META_KEY])
+        headers = meta["headers"]
+
+        def column_index(name: str) -> int:
+            if name not in headers:
+                raise ValueError(f"Unknown column '{name}'.")
+            return headers.index(name)
+
+        selected = [column_index(name) for name in columns] if columns else list(range(len(headers)))
+
+        mask = None
+        for expression in filters or []:
+            name, op, value = parse_filter(expression)
+            condition = _filter_mask(arrow_table.column(column_index(name)), op, value)
+            mask = condition if mask is None else pc.and_kleene(mask, condition)
+
+        if mask is not None:
+            arrow_table = arrow_table.filter(mask)
+        page = arrow_table.slice(offset, limit)
+
+        return {
+            "table_id": table_id,
+            "format": TABLE_FORMAT,
+            "headers": [headers[j] for j in selected],
+            "columns": [encode_column(page.column(j).to_pandas()) for j in selected],
+            "shape": (page.num_rows, len(selected)),
+            "source": meta.get("source"),
+            "page": meta.get("page"),
+            "offset": offset,
+            "total_rows": arrow_table.num_rows
+        }
@@ -0,0 +1,392 @@
+"""
+Content-addressed storage for uploaded documents
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import psutil
+from fastapi import UploadFile
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Chunk size suggested to clients of resumable uploads
+DEFAULT_SESSION_CHUNK_SIZE = 8 * 1024 * 1024
+# Room for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+# A lock file left without its owner's PID (a crash right after creating it) counts as stale after this long
+LOCK_PID_GRACE = 60
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the store's size limit"""
+
+
+class ChunkRejected(Exception):
+    """Raised when a resumable upload chunk can't be accepted"""
+
+
+class OffsetMismatch(ChunkRejected):
+    """A chunk did not start where the upload currently ends"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload continues at offset {offset}.")
+        self.offset = offset
+
+
+class ChecksumMismatch(ChunkRejected):
+    """A chunk or finished file did not match its SHA-256"""
+
+
+class UploadStore:
+    """Uploaded documents kept once per content hash
+
+    Uploads are streamed to a staging file ``chunk_size`` bytes at a time and
+    hashed as they are written. The finished file is renamed to
+    ``<sha256><extension>``, so uploading the same document again keeps a
+    single copy on disk.
+
+    Resumable uploads keep their partial file and metadata under
+    ``.partial/``; the bytes on disk are the only record of progress, so a
+    client can pick up where it left off even after a restart. Writers hold
+    a ``.lock`` file, created exclusively and naming their PID, so every
+    worker process on the host sees an upload that is being written.
+    """
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.partial_dir = self.root / ".partial"
+        self.partial_dir.mkdir(exist_ok=True)
+
+    def path_for(self, sha256: str, extension: str) -> Path:
+        return self.root / f"{sha256}{extension}"
+
+    def check_size(self, size: int):
+        if size > self.max_bytes:
+            raise UploadTooLarge(f"File exceeds the maximum upload size of {self.max_bytes} bytes.")
+
+    async def save(self, upload: UploadFile, extension: str) -> Dict:
+        """Store an upload, returning its ``path``, ``sha256``, ``size`` and whether it was a ``duplicate``
+
+        Raises UploadTooLarge as soon as the size is known to exceed ``max_bytes``.
+        """
+        if upload.size is not None:
+            self.check_size(upload.size)
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while chunk := await upload.read(self.chunk_size):
+                    size += len(chunk)
+                    self.check_size(size)
+                    f.write(chunk)
+                    digest.update(chunk)
+            return self._commit(temp_path, digest.hexdigest(), size, extension)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def _commit(self, temp_path: str, sha256: str, size: int, extension: str) -> Dict:
+        """Move a fully written staging file to its content address"""
+        path = self.path_for(sha256, extension)
+        duplicate = path.exists()
+        if duplicate:
+            os.unlink(temp_path)
+            self.touch(str(path))
+            logger.info(f"Upload {sha256[:12]} already stored, reusing it")
+        else:
+            os.replace(temp_path, path)
+        return {"path": str(path), "sha256": sha256, "size": size, "duplicate": duplicate}
+
+    def touch(self, path: str):
+        """Mark a stored document as just used; its mtime is its last use"""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def blobs(self) -> List[Dict]:
+        """Every stored document with its ``path``, ``size`` and ``last_used`` time"""
+        blobs = []
+        for path in self.root.iterdir():
+            if path.is_file() and path.suffix != ".part":
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                blobs.append({"path": str(path), "size": stat.st_size, "last_used": stat.st_mtime})
+        return blobs
+
+    def delete(self, path: str) -> bool:
+        """Remove a stored document; callers make sure nothing references it any more"""
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _partial_path(self, upload_id: str) -> Path:
+        return self.partial_dir / f"{upload_id}.part"
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.partial_dir / f"{upload_id}.json"
+
+    def _lock_path(self, upload_id: str) -> Path:
+        return self.partial_dir / f"{upload_id}.lock"
+
+    @staticmethod
+    def _stale_lock(lock_path: Path) -> bool:
+        """Whether a lock file was left behind by a process that has exited"""
+        try:
+            owner = lock_path.read_text()
+            modified = lock_path.stat().st_mtime
+        except FileNotFoundError:
+            return True
+        if not owner.strip().isdigit():
+            return time.time() - modified > LOCK_PID_GRACE
+        return not psutil.pid_exists(int(owner))
+
+    @contextmanager
+    def _claim(self, upload_id: str):
+        """Hold an upload against other requests in any process on the host
+
+        Raises ChunkRejected if another request holds it. A lock file works
+        the same on every platform and, unlike a lock on the partial file,
+        doesn't keep that file open while finish() renames it.
+        """
+        lock_path = self._lock_path(upload_id)
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not self._stale_lock(lock_path):
+                raise ChunkRejected("Another request is writing this upload.")
+            logger.info(f"Taking over stale lock of upload {upload_id}")
+            lock_path.unlink(missing_ok=True)
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                raise ChunkRejected("Another request is writing this upload.")
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        try:
+            yield
+        finally:
+            lock_path.unlink(missing_ok=True)
+
+    def begin(self, filename: str, extension: str, size: int) -> Dict:
+        """Start a resumable upload of ``size`` bytes"""
+        self.check_size(size)
+        upload_id = str(uuid.uuid4())
+        meta = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "extension": extension,
+            "size": size,
+            "created_at": time.time()
+        }
+        self._partial_path(upload_id).touch()
+        self._meta_path(upload_id).write_text(json.dumps(meta))
+        return {**meta, "offset": 0, "chunk_size": DEFAULT_SESSION_CHUNK_SIZE}
+
+    def status(self, upload_id: str) -> Optional[Dict]:
+        """Metadata of a resumable upload with the ``offset`` it continues at; None if unknown"""
+        try:
+            uuid.UUID(upload_id)
+            meta = json.loads(self._meta_path(upload_id).read_text())
+            offset = self._partial_path(upload_id).stat().st_size
+        except (FileNotFoundError, ValueError):
+            return None
+        return {**meta, "offset": offset}
+
+    async def write_chunk(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes],
+                          sha256: str) -> Optional[Dict]:
+        """Append a chunk at ``offset``, keeping it only if it matches ``sha256``
+
+        Returns the updated status, or None for unknown uploads. Raises
+        OffsetMismatch if ``offset`` isn't where the upload ends,
+        ChecksumMismatch if the chunk is corrupt and UploadTooLarge if it
+        runs past the declared size.
+        """
+        status = self.status(upload_id)
+        if status is None:
+            return None
+        if offset != status["offset"]:
+            raise OffsetMismatch(status["offset"])
+
+        digest = hashlib.sha256()
+        end = offset
+        with self._claim(upload_id):
+            # Another process may have appended a chunk, or finished the upload, since the status was read
+            current = self.status(upload_id)
+            if current is None:
+                return None
+            if offset != current["offset"]:
+                raise OffsetMismatch(current["offset"])
+
+            with open(self._partial_path(upload_id), "r+b") as f:
+                f.seek(offset)
+                try:
+                    async for chunk in chunks:
+                        end += len(chunk)
+                        if end > status["size"]:
+                            raise UploadTooLarge(f"Chunk runs past the declared size of {status['size']} bytes.")
+                        f.write(chunk)
+                        digest.update(chunk)
+                    if digest.hexdigest() != sha256.lower():
+                        raise ChecksumMismatch("Chunk does not match its SHA-256.")
+                except BaseException:
+                    # Drop whatever part of the chunk was written so the client can resend it
+                    f.truncate(offset)
+                    raise
+        return {**status, "offset": end}
+
+    def finish(self, upload_id: str, sha256: Optional[str] = None) -> Optional[Dict]:
+        """Move a fully received upload into the content-addressed store
+
+        Returns the stored file as :meth:`save` does, plus the upload's
+        ``filename`` and ``extension``, or None for unknown uploads.
+        """
+        if self.status(upload_id) is None:
+            return None
+        with self._claim(upload_id):
+            # Another request may have finished the upload while this one waited
+            status = self.status(upload_id)
+            if status is None:
+                return None
+            if status["offset"] != status["size"]:
+                raise OffsetMismatch(status["offset"])
+
+            partial_path = self._partial_path(upload_id)
+            digest = hashlib.sha256()
+            with open(partial_path, "rb") as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                    digest.update(chunk)
+            if sha256 and digest.hexdigest() != sha256.lower():
+                raise ChecksumMismatch("File does not match its SHA-256.")
+
+            stored = self._commit(str(partial_path), digest.hexdigest(), status["size"], status["extension"])
+            self._meta_path(upload_id).unlink(missing_ok=True)
+        return {**stored, "filename": status["filename"], "extension": status["extension"]}
+
+    def abort(self, upload_id: str) -> bool:
+        """Discard a resumable upload"""
+        try:
+            uuid.UUID(upload_id)
+        except ValueError:
+            return False
+        found = self._meta_path(upload_id).exists()
+        self._partial_path(upload_id).unlink(missing_ok=True)
+        self._meta_path(upload_id).unlink(missing_ok=True)
+        # Only a crashed writer leaves one behind; a live one no longer has anything to write to
+        self._lock_path(upload_id).unlink(missing_ok=True)
+        return found
+
+    def expire_partial(self, older_than: float) -> tuple:
+        """Discard resumable uploads not written to since ``older_than``; returns (count, bytes)"""
+        count = 0
+        freed = 0
+        for meta_path in self.partial_dir.glob("*.json"):
+            partial_path = self._partial_path(meta_path.stem)
+            try:
+                size = partial_path.stat().st_size if partial_path.exists() else 0
+                last_write = max(meta_path.stat().st_mtime,
+                                 partial_path.stat().st_mtime if partial_path.exists() else 0)
+            except FileNotFoundError:
+                continue
+            if last_write < older_than and self._abort_idle(meta_path.stem):
+                count += 1
+                freed += size
+        return count, freed
+
+    def _abort_idle(self, upload_id: str) -> bool:
+        """Abort an upload unless a request in any process is writing it"""
+        try:
+            with self._claim(upload_id):
+                return self.abort(upload_id)
+        except ChunkRejected:
+            return False
+
+    def clear_partial(self) -> int:
+        """Discard every unfinished resumable upload"""
+        upload_ids = [path.stem for path in self.partial_dir.glob("*.json")]
+        for upload_id in upload_ids:
+            self.abort(upload_id)
+        return len(upload_ids)
+
+
+class UploadSizeLimit:
+    """ASGI middleware answering 413 to upload requests over the store's size limit
+
+    A declared Content-Length over the limit is rejected before any of the
+    body is read; bodies without one (chunked transfers) are counted as
+    they arrive and cut off as soon as they pass it. Either way the form
+    parser never spools an oversized upload to disk.
+    """
+
+    def __init__(self, app, store: UploadStore, paths: Tuple[str, ...]):
+        self.app = app
+        self.store = store
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self.store.max_bytes + MULTIPART_OVERHEAD
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        too_large = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Look like a disconnect so the app stops reading
+                    too_large = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            # Whatever the app makes of the cut-off body is replaced by the 413
+            if not too_large:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not too_large:
+                raise
+        if too_large:
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        logger.warning(f"Rejecting upload to {scope['path']}: body exceeds {self.store.max_bytes} bytes")
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"File exceeds the maximum upload size of {self.store.max_bytes} bytes."}
+        )
+        await response(scope, receive, send)
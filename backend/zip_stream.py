@@ -0,0 +1,53 @@
+"""
+ZIP archives written straight into a response stream
+"""
+
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+# Earliest timestamp a ZIP entry can carry; a fixed one keeps archives byte-for-byte reproducible
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+class _ChunkBuffer:
+    """Write-only, unseekable sink that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(entries: Iterable[Tuple[str, Iterator[bytes], int]],
+             date_time: Tuple[int, int, int, int, int, int] = ZIP_EPOCH) -> Iterator[bytes]:
+    """Yield a ZIP archive of ``(name, chunks, compression)`` entries as it is built
+
+    Each entry's chunks are compressed and passed on as they arrive, so only
+    one chunk of one entry is held in memory at a time. Sizes and CRCs go in
+    data descriptors since the output can't be seeked back into. Every
+    entry is stamped with ``date_time``, so the same entries always give
+    the same archive.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w", allowZip64=True) as archive:
+        for name, chunks, compression in entries:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = compression
+            with archive.open(info, mode="w", force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            yield buffer.drain()
+    yield buffer.drain()
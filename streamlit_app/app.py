@@ -7,6 +7,7 @@ from typing import Dict, List, Any, Optional
 from pathlib import Path
 import tempfile
 import os
+import time
 
 # Configuration
 BACKEND_URL = "http://localhost:8000"
@@ -108,17 +109,35 @@ class BackendAPI:
             return {"success": False, "error": f"Upload error: {str(e)}"}
     
     @staticmethod
-    def extract_tables(file_data: bytes, filename: str) -> Dict[str, Any]:
-        """Extract tables from uploaded file"""
+    def extract_tables(file_data: bytes, filename: str, poll_interval: float = 1.0,
+                       max_wait: float = 1800) -> Dict[str, Any]:
+        """Extract tables from uploaded file via a backend job"""
         try:
-            files = {"file": (filename, file_data)}
-            response = requests.post(f"{BACKEND_URL}/extract", files=files, timeout=60)
-            
-            if response.status_code == 200:
-                return {"success": True, "data": response.json()}
-            else:
+            upload = BackendAPI.upload_file(file_data, filename)
+            if not upload["success"]:
+                return upload
+
+            response = requests.post(
+                f"{BACKEND_URL}/jobs",
+                json={"file_id": upload["data"]["file_id"]},
+                timeout=30
+            )
+            if response.status_code != 202:
                 return {"success": False, "error": f"Extraction failed: {response.text}"}
-                
+
+            job_id = response.json()["job_id"]
+            deadline = time.time() + max_wait
+            while time.time() < deadline:
+                job = requests.get(f"{BACKEND_URL}/jobs/{job_id}", timeout=10).json()
+                if job["status"] == "completed":
+                    result = requests.get(f"{BACKEND_URL}/jobs/{job_id}/result", timeout=60)
+                    return {"success": True, "data": result.json()}
+                if job["status"] == "failed":
+                    return {"success": False, "error": f"Extraction failed: {job['error']}"}
+                time.sleep(poll_interval)
+
+            return {"success": False, "error": f"Extraction job {job_id} is still running"}
+
         except requests.exceptions.ConnectionError:
             return {"success": False, "error": "Backend server not running"}
         except Exception as e:
@@ -311,7 +330,7 @@ class FileValidator:
     """File validation utilities"""
     
     SUPPORTED_EXTENSIONS = ['.pdf', '.docx', '.doc']
-    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
+    MAX_FILE_SIZE = 512 * 1024 * 1024  # 512 MB; large files upload in resumable chunks
     
     @staticmethod
     def validate_file(uploaded_file) -> Dict[str, Any]:
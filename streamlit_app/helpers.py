@@ -3,15 +3,24 @@ import streamlit as st
 import requests
 import pandas as pd
 import json
+import hashlib
+import time
 from io import BytesIO
 import base64
 
 # Backend API configuration
 BACKEND_URL = "http://localhost:8000"  # Adjust based on your FastAPI server
 
+# Files larger than this are sent through the resumable chunked upload endpoints
+CHUNKED_UPLOAD_THRESHOLD = 32 * 1024 * 1024
+CHUNK_RETRIES = 5
+
 def upload_file_to_backend(uploaded_file):
     """Upload file to FastAPI backend and return response"""
     try:
+        if uploaded_file.size > CHUNKED_UPLOAD_THRESHOLD:
+            return upload_file_in_chunks(uploaded_file)
+
         files = {"file": (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type)}
         response = requests.post(f"{BACKEND_URL}/upload", files=files)
         
@@ -27,6 +36,64 @@ def upload_file_to_backend(uploaded_file):
         st.error(f"Upload error: {str(e)}")
         return None
 
+def _upload_offset(upload_url):
+    """Offset the backend expects the next chunk at, or None if it can't be reached"""
+    try:
+        response = requests.get(upload_url, timeout=30)
+        return response.json()["offset"] if response.status_code == 200 else None
+    except requests.exceptions.RequestException:
+        return None
+
+def upload_file_in_chunks(uploaded_file):
+    """Upload a large file chunk by chunk, resuming from the backend's offset after failures"""
+    size = uploaded_file.size
+    response = requests.post(f"{BACKEND_URL}/uploads", json={"filename": uploaded_file.name, "size": size})
+    if response.status_code != 200:
+        st.error(f"Upload failed: {response.text}")
+        return None
+
+    session = response.json()
+    upload_url = f"{BACKEND_URL}/uploads/{session['upload_id']}"
+    progress_bar = st.progress(0.0, text=f"Uploading {uploaded_file.name}")
+    offset = 0
+    failures = 0
+
+    while offset < size:
+        uploaded_file.seek(offset)
+        chunk = uploaded_file.read(session["chunk_size"])
+        try:
+            response = requests.put(
+                upload_url,
+                params={"offset": offset},
+                data=chunk,
+                headers={"X-Chunk-SHA256": hashlib.sha256(chunk).hexdigest()},
+                timeout=300
+            )
+            if response.status_code == 200:
+                offset = response.json()["offset"]
+                failures = 0
+                progress_bar.progress(offset / size, text=f"Uploading {uploaded_file.name}")
+                continue
+        except requests.exceptions.RequestException:
+            pass
+
+        failures += 1
+        if failures > CHUNK_RETRIES:
+            st.error(f"Upload failed after {CHUNK_RETRIES} retries. Please try again.")
+            return None
+        time.sleep(2 ** failures)
+        # Pick up wherever the backend got to before the failure
+        resumed = _upload_offset(upload_url)
+        if resumed is not None:
+            offset = resumed
+
+    response = requests.post(f"{upload_url}/complete", timeout=300)
+    progress_bar.empty()
+    if response.status_code == 200:
+        return response.json()
+    st.error(f"Upload failed: {response.text}")
+    return None
+
 def extract_tables_from_backend(file_path):
     """Extract tables from uploaded file via backend API"""
     try:
@@ -76,6 +143,37 @@ def create_download_link(data, filename, file_format="csv"):
     
     return href
 
+def fetch_table_window(extraction_id, table_id, offset=0, limit=10, columns=None, where=None):
+    """Fetch a window of rows from one extracted table as (DataFrame, total matching rows)"""
+    try:
+        params = {"offset": offset, "limit": limit, "table_format": "legacy"}
+        if columns:
+            params["columns"] = columns
+        if where:
+            params["where"] = where
+        response = requests.get(f"{BACKEND_URL}/extractions/{extraction_id}/tables/{table_id}", params=params)
+
+        if response.status_code == 200:
+            window = response.json()
+            return pd.DataFrame(window["rows"], columns=window["headers"]), window["total_rows"]
+        else:
+            st.error(f"Table fetch failed: {response.text}")
+            return None, 0
+    except Exception as e:
+        st.error(f"Table fetch error: {str(e)}")
+        return None, 0
+
+def table_to_dataframe(table):
+    """DataFrame from a compact (column-oriented) or legacy table dict"""
+    if "columns" in table:
+        columns = [
+            [column["dictionary"][i] if i >= 0 else None for i in column["indices"]]
+            if isinstance(column, dict) else column
+            for column in table["columns"]
+        ]
+        return pd.DataFrame(dict(enumerate(columns))).set_axis(table["headers"], axis=1)
+    return pd.DataFrame(table.get("rows", []), columns=table.get("headers"))
+
 def display_table_preview(tables_data, max_rows=10):
     """Display a preview of extracted tables"""
     if not tables_data or 'tables' not in tables_data:
@@ -96,22 +194,27 @@ def display_table_preview(tables_data, max_rows=10):
     for i, table in enumerate(tables):
         st.subheader(f"Table {i+1}")
         
-        # Convert to DataFrame if it's a list of lists
-        if isinstance(table, list):
-            df = pd.DataFrame(table[1:], columns=table[0] if table else [])
-        else:
-            df = pd.DataFrame(table)
-        
-        # Display preview
-        if len(df) > max_rows:
-            st.write(f"Showing first {max_rows} rows of {len(df)} total rows:")
-            st.dataframe(df.head(max_rows))
-        else:
-            st.dataframe(df)
+        # Preview just the first rows; the backend serves them without sending the whole table
+        preview = None
+        if isinstance(table, dict) and tables_data.get("extraction_id"):
+            preview, total_rows = fetch_table_window(tables_data["extraction_id"], table["table_id"], limit=max_rows)
+
+        df = None
+        if preview is None:
+            # Convert to DataFrame if it's a list of lists
+            if isinstance(table, list):
+                df = pd.DataFrame(table[1:], columns=table[0] if table else [])
+            else:
+                df = table_to_dataframe(table)
+            preview, total_rows = df.head(max_rows), len(df)
+
+        if total_rows > max_rows:
+            st.write(f"Showing first {max_rows} rows of {total_rows} total rows:")
+        st.dataframe(preview)
         
         # Add selection checkbox
         if st.checkbox(f"Include Table {i+1} in export", value=True, key=f"table_{i}"):
-            selected_tables.append(df)
+            selected_tables.append(df if df is not None else table_to_dataframe(table))
         
         st.divider()
     
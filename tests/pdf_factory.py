@@ -0,0 +1,98 @@
+"""
+Minimal PDF writer for building test documents with text and ruling lines
+"""
+
+from typing import Dict, List, Tuple
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def page_content(texts: List[Tuple[float, float, str]] = (),
+                 lines: List[Tuple[float, float, float, float]] = ()) -> bytes:
+    """Content stream for text at (x, top) and lines from (x0, top0) to (x1, top1)
+
+    Coordinates are measured from the top-left corner like pdfplumber's.
+    """
+    ops = []
+    for x0, top0, x1, top1 in lines:
+        ops.append(f"{x0} {PAGE_HEIGHT - top0} m {x1} {PAGE_HEIGHT - top1} l S")
+    for x, top, text in texts:
+        # Baseline sits ~10pt below the top of 12pt text
+        ops.append(f"BT /F1 12 Tf {x} {PAGE_HEIGHT - top - 10} Td ({_escape(text)}) Tj ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def grid_page(rows: List[List[str]], x0: float = 50, top: float = 50,
+              col_width: float = 100, row_height: float = 20) -> Dict:
+    """Page spec for a fully ruled table"""
+    n_cols = max(len(r) for r in rows)
+    bottom = top + row_height * len(rows)
+    right = x0 + col_width * n_cols
+    lines = [(x0, top + i * row_height, right, top + i * row_height) for i in range(len(rows) + 1)]
+    lines += [(x0 + j * col_width, top, x0 + j * col_width, bottom) for j in range(n_cols + 1)]
+    texts = [
+        (x0 + j * col_width + 4, top + i * row_height + 4, cell)
+        for i, row in enumerate(rows) for j, cell in enumerate(row) if cell
+    ]
+    return {"texts": texts, "lines": lines}
+
+
+def borderless_page(rows: List[List[str]], x0: float = 50, top: float = 50,
+                    col_width: float = 120, row_height: float = 18) -> Dict:
+    """Page spec for a table laid out in columns without any rulings"""
+    texts = [
+        (x0 + j * col_width, top + i * row_height, cell)
+        for i, row in enumerate(rows) for j, cell in enumerate(row) if cell
+    ]
+    return {"texts": texts, "lines": []}
+
+
+def prose_page(paragraph: List[str], x0: float = 50, top: float = 50) -> Dict:
+    """Page spec for plain running text"""
+    return {"texts": [(x0, top + i * 16, line) for i, line in enumerate(paragraph)], "lines": []}
+
+
+def write_pdf(path, pages: List[Dict]) -> str:
+    """Write pages (dicts with ``texts``/``lines``) to a PDF file"""
+    n_pages = len(pages)
+    font_id = 3
+    first_page_id = 4
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: (
+            "<< /Type /Pages /Kids [" +
+            " ".join(f"{first_page_id + 2 * i} 0 R" for i in range(n_pages)) +
+            f"] /Count {n_pages} >>"
+        ).encode(),
+        font_id: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for i, spec in enumerate(pages):
+        page_id = first_page_id + 2 * i
+        content = page_content(spec.get("texts", []), spec.get("lines", []))
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        ).encode()
+        objects[page_id + 1] = f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += f"{obj_id} 0 obj\n".encode() + objects[obj_id] + b"\nendobj\n"
+
+    xref_offset = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+    for obj_id in range(1, size):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+    return str(path)
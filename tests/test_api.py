@@ -0,0 +1,603 @@
+import pytest
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from pathlib import Path
+import sys
+
+# Keep job database and other backend state out of the real data directory
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="document_workflow_test_"))
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+import msgpack
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.testclient import TestClient
+import app as backend
+import jobs
+
+SAMPLE_DIR = Path(__file__).parent.parent / "sample docs"
+SAMPLE_PDF = SAMPLE_DIR / "sample-invoice.pdf"
+SAMPLE_DOCX = SAMPLE_DIR / "school-timetable-template.docx"
+
+
+@pytest.fixture
+def client():
+    with TestClient(backend.app) as client:
+        yield client
+
+
+def upload(client, path):
+    """Upload a sample document and return its file ID"""
+    with open(path, "rb") as f:
+        response = client.post("/upload", files={"file": (path.name, f)})
+    assert response.status_code == 200
+    return response.json()["file_id"]
+
+
+class TestUpload:
+    """Test cases for the upload endpoint"""
+
+    def test_upload_returns_hash(self, client):
+        with open(SAMPLE_DOCX, "rb") as f:
+            response = client.post("/upload", files={"file": (SAMPLE_DOCX.name, f)})
+
+        assert response.status_code == 200
+        assert response.json()["sha256"] == hashlib.sha256(SAMPLE_DOCX.read_bytes()).hexdigest()
+        assert backend.temp_files[response.json()["file_id"]]["sha256"] == response.json()["sha256"]
+
+    def test_duplicate_uploads_share_storage(self, client):
+        first = upload(client, SAMPLE_PDF)
+        second = upload(client, SAMPLE_PDF)
+
+        assert first != second
+        assert backend.temp_files[first]["path"] == backend.temp_files[second]["path"]
+
+    def test_upload_too_large(self, client, monkeypatch):
+        monkeypatch.setattr(backend.upload_store, "max_bytes", 100)
+
+        with open(SAMPLE_PDF, "rb") as f:
+            response = client.post("/upload", files={"file": (SAMPLE_PDF.name, f)})
+
+        assert response.status_code == 413
+
+    def test_oversized_body_rejected_before_parsing(self, client, monkeypatch):
+        monkeypatch.setattr(backend.upload_store, "max_bytes", 100)
+
+        async def never(*args):
+            raise AssertionError("oversized upload reached the store")
+        monkeypatch.setattr(backend.upload_store, "save", never)
+
+        body = b"x" * (backend.upload_store.max_bytes + 128 * 1024)
+        response = client.post("/upload", files={"file": ("big.pdf", body)})
+        assert response.status_code == 413
+
+        # Without a Content-Length the body is counted as it arrives
+        def chunks():
+            for _ in range(4):
+                yield body[:64 * 1024]
+        response = client.post("/upload", content=chunks(),
+                               headers={"Content-Type": "multipart/form-data; boundary=x"})
+        assert response.status_code == 413
+
+    def test_unsupported_file_type(self, client):
+        response = client.post("/upload", files={"file": ("notes.txt", b"hello")})
+
+        assert response.status_code == 400
+
+
+class TestUploadAndExtract:
+    """Test cases for the one-shot upload+extract endpoint"""
+
+    def test_small_file_extracted_from_memory(self, client):
+        uploads = len(backend.temp_files)
+        with open(SAMPLE_DOCX, "rb") as f:
+            response = client.post("/extract/upload", files={"file": (SAMPLE_DOCX.name, f)})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "success"
+        assert body["file_id"] is None
+        assert body["file_name"] == SAMPLE_DOCX.name
+        assert len(backend.temp_files) == uploads
+        assert client.get(f"/extractions/{body['extraction_id']}/tables/{body['tables'][0]['table_id']}").status_code == 200
+
+    def test_large_file_stored_first(self, client, monkeypatch):
+        monkeypatch.setattr(backend, "INLINE_EXTRACT_MAX_BYTES", 100)
+        with open(SAMPLE_DOCX, "rb") as f:
+            response = client.post("/extract/upload", files={"file": (SAMPLE_DOCX.name, f)})
+
+        assert response.status_code == 200
+        file_id = response.json()["file_id"]
+        assert backend.temp_files[file_id]["sha256"] == hashlib.sha256(SAMPLE_DOCX.read_bytes()).hexdigest()
+
+    def test_unsupported_file_type(self, client):
+        response = client.post("/extract/upload", files={"file": ("notes.txt", b"hello")})
+
+        assert response.status_code == 400
+
+    def test_extractions_listed_without_results(self, client, monkeypatch):
+        with open(SAMPLE_DOCX, "rb") as f:
+            body = client.post("/extract/upload", files={"file": (SAMPLE_DOCX.name, f)}).json()
+
+        def fail(*args):
+            raise AssertionError("stored result was read")
+        monkeypatch.setattr(backend.job_store, "_read_result", fail)
+        listed = {e["extraction_id"]: e for e in client.get("/extractions").json()["extractions"]}
+
+        assert listed[body["extraction_id"]] == {
+            "extraction_id": body["extraction_id"],
+            "file_name": SAMPLE_DOCX.name,
+            "status": "success",
+            "table_count": len(body["tables"])
+        }
+
+
+class TestDelete:
+    """Test cases for the per-ID delete endpoints"""
+
+    def test_delete_extraction(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+        extraction_id = client.post("/extract", json={"file_id": file_id}).json()["extraction_id"]
+        client.get(f"/extractions/{extraction_id}/tables/table_1")
+
+        response = client.delete(f"/extractions/{extraction_id}")
+
+        assert response.status_code == 200
+        assert client.get(f"/extractions/{extraction_id}").status_code == 404
+        assert not backend.table_store.has(extraction_id)
+        assert client.delete(f"/extractions/{extraction_id}").status_code == 404
+
+    def test_delete_file_with_its_extractions(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+        path = backend.temp_files[file_id]["path"]
+        extraction_id = client.post("/extract", json={"file_id": file_id}).json()["extraction_id"]
+
+        response = client.delete(f"/files/{file_id}")
+
+        assert response.status_code == 200
+        assert response.json()["extractions_deleted"] == 1
+        assert file_id not in backend.temp_files
+        # The stored document goes only once no other upload shares it
+        shared = any(info["path"] == path for info in backend.temp_files.values())
+        assert Path(path).exists() == shared
+        assert client.get(f"/extractions/{extraction_id}").status_code == 404
+
+    def test_delete_unknown_file(self, client):
+        assert client.delete("/files/missing").status_code == 404
+
+
+class TestResumableUpload:
+    """Test cases for the chunked upload endpoints"""
+
+    def test_resumed_upload_can_be_extracted(self, client):
+        data = SAMPLE_DOCX.read_bytes()
+        session = client.post("/uploads", json={"filename": SAMPLE_DOCX.name, "size": len(data)}).json()
+        url = f"/uploads/{session['upload_id']}"
+
+        def put(offset, chunk):
+            return client.put(url, params={"offset": offset}, content=chunk,
+                              headers={"X-Chunk-SHA256": hashlib.sha256(chunk).hexdigest()})
+
+        assert put(0, data[:1000]).json()["offset"] == 1000
+        # A retried chunk is rejected with the offset to resume from
+        retried = put(0, data[:1000])
+        assert retried.status_code == 409
+        assert retried.headers["Upload-Offset"] == "1000"
+        assert client.get(url).json()["offset"] == 1000
+        put(1000, data[1000:])
+
+        response = client.post(f"{url}/complete", json={"sha256": hashlib.sha256(data).hexdigest()})
+
+        assert response.status_code == 200
+        extraction = client.post("/extract", json={"file_id": response.json()["file_id"]})
+        assert extraction.json()["status"] == "success"
+
+    def test_bad_chunk_checksum(self, client):
+        session = client.post("/uploads", json={"filename": "big.pdf", "size": 10}).json()
+
+        response = client.put(f"/uploads/{session['upload_id']}", params={"offset": 0},
+                              content=b"x" * 10, headers={"X-Chunk-SHA256": "0" * 64})
+
+        assert response.status_code == 422
+
+    def test_upload_size_must_be_positive(self, client):
+        for size in (-1, 0):
+            response = client.post("/uploads", json={"filename": "big.pdf", "size": size})
+
+            assert response.status_code == 422
+
+    def test_unknown_upload(self, client):
+        assert client.get("/uploads/missing").status_code == 404
+        assert client.delete("/uploads/missing").status_code == 404
+
+
+class TestExtract:
+    """Test cases for the extraction endpoints"""
+
+    def test_extract_docx(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+
+        response = client.post("/extract", json={"file_id": file_id})
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "success"
+        assert len(response.json()["tables"]) == 1
+
+    def test_extract_unknown_file(self, client):
+        response = client.post("/extract", json={"file_id": "missing"})
+
+        assert response.status_code == 404
+
+    def test_extract_table_formats(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+
+        compact = client.post("/extract", json={"file_id": file_id}).json()["tables"][0]
+        legacy = client.post("/extract", json={"file_id": file_id, "table_format": "legacy"}).json()["tables"][0]
+
+        assert compact["format"] == "columnar-v1"
+        assert "rows" not in compact and "data" not in compact
+        assert legacy["rows"] and legacy["data"][0] == dict(zip(legacy["headers"], legacy["rows"][0]))
+
+    def test_extract_workers_bounded(self, client):
+        file_id = upload(client, SAMPLE_PDF)
+
+        too_many = backend.MAX_PDF_WORKERS + 1
+        assert client.post("/extract", json={"file_id": file_id, "parallel": True,
+                                             "workers": too_many}).status_code == 422
+        assert client.get(f"/extract/{file_id}", params={"workers": 0}).status_code == 422
+        assert client.post("/jobs", json={"file_id": file_id, "workers": too_many}).status_code == 422
+
+    def test_extract_invalid_table_format(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+
+        response = client.post("/extract", json={"file_id": file_id, "table_format": "xml"})
+
+        assert response.status_code == 400
+
+    def test_extract_stream(self, client):
+        file_id = upload(client, SAMPLE_PDF)
+
+        response = client.get(f"/extract/{file_id}/stream")
+
+        assert response.status_code == 200
+        tables = [json.loads(line) for line in response.text.splitlines()]
+        assert len(tables) > 0
+        assert all("page" in t for t in tables)
+
+
+class TestTableWindow:
+    """Test cases for windowed table reads"""
+
+    def test_table_window(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+        extraction = client.post("/extract", json={"file_id": file_id}).json()
+        table = extraction["tables"][0]
+        url = f"/extractions/{extraction['extraction_id']}/tables/{table['table_id']}"
+
+        window = client.get(url, params={"limit": 2, "columns": table["headers"][:2],
+                                         "table_format": "legacy"}).json()
+
+        assert window["headers"] == table["headers"][:2]
+        assert len(window["rows"]) == 2
+        assert window["total_rows"] == table["shape"][0]
+
+    def test_table_window_errors(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+        extraction_id = client.post("/extract", json={"file_id": file_id}).json()["extraction_id"]
+
+        assert client.get(f"/extractions/{extraction_id}/tables/missing").status_code == 404
+        assert client.get(f"/extractions/{extraction_id}/tables/docx_table_0",
+                          params={"where": "bad filter"}).status_code == 400
+        assert client.get("/extractions/missing/tables/docx_table_0").status_code == 404
+
+
+class TestDownload:
+    """Test cases for exported downloads"""
+
+    def test_download_parquet(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+        extraction_id = client.post("/extract", json={"file_id": file_id}).json()["extraction_id"]
+
+        response = client.get(f"/download/{extraction_id}/parquet")
+
+        assert response.status_code == 200
+        assert pq.read_table(pa.BufferReader(response.content)).num_rows > 0
+
+    def test_download_zip_has_every_table(self, client, monkeypatch):
+        file_id = upload(client, SAMPLE_DOCX)
+        extraction = client.post("/extract", json={"file_id": file_id}).json()
+        # Record a second copy of the table so the download spans several files
+        result = backend.extraction_cache[extraction["extraction_id"]]
+        second = {**result["tables"][0], "table_id": "docx_table_1"}
+        backend.extraction_cache["multi"] = {**result, "tables": result["tables"] + [second]}
+
+        response = client.get("/download/multi/csv")
+
+        assert response.headers["content-type"] == "application/zip"
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert archive.namelist() == ["manifest.json", "docx_table_0.csv", "docx_table_1.csv"]
+        manifest = json.loads(archive.read("manifest.json"))
+        assert [t["file"] for t in manifest["tables"]] == ["docx_table_0.csv", "docx_table_1.csv"]
+        assert archive.read("docx_table_0.csv") == archive.read("docx_table_1.csv")
+
+    def test_download_cached_with_etag(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+        extraction_id = client.post("/extract", json={"file_id": file_id}).json()["extraction_id"]
+        hits = backend.artifact_cache.stats()["hits"]
+
+        first = client.get(f"/download/{extraction_id}/csv")
+        second = client.get(f"/download/{extraction_id}/csv")
+        revalidated = client.get(f"/download/{extraction_id}/csv", headers={"If-None-Match": first.headers["etag"]})
+
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+        assert revalidated.status_code == 304
+        assert backend.artifact_cache.stats()["hits"] == hits + 2
+
+    def test_download_json_table_format(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+        extraction_id = client.post("/extract", json={"file_id": file_id}).json()["extraction_id"]
+
+        legacy = client.get(f"/download/{extraction_id}/json")
+        compact = client.get(f"/download/{extraction_id}/json", params={"table_format": "compact"})
+
+        assert "rows" in legacy.json()["tables"][0]
+        assert "columns" not in legacy.json()["tables"][0]
+        assert compact.json()["tables"][0]["format"] == "columnar-v1"
+        # Each shape is cached under its own key
+        assert legacy.headers["etag"] != compact.headers["etag"]
+        assert client.get(f"/download/{extraction_id}/json", params={"table_format": "wide"}).status_code == 400
+
+    def test_download_invalid_format(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+        extraction_id = client.post("/extract", json={"file_id": file_id}).json()["extraction_id"]
+
+        assert client.get(f"/download/{extraction_id}/xlsx").status_code == 400
+
+
+class TestSerialization:
+    """Test cases for content negotiation and response compression"""
+
+    def extract(self, client, **headers):
+        file_id = upload(client, SAMPLE_DOCX)
+        return client.post("/extract", json={"file_id": file_id}, headers=headers)
+
+    def test_msgpack(self, client):
+        response = self.extract(client, accept="application/msgpack")
+
+        assert response.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content)["status"] == "success"
+
+    def test_arrow(self, client):
+        response = self.extract(client, accept="application/vnd.apache.arrow.stream")
+
+        batch = pa.ipc.open_stream(response.content).read_all()
+        assert batch.num_rows == 1
+        assert batch.column("table_id")[0].as_py() == "docx_table_0"
+        assert json.loads(batch.schema.metadata[b"result"])["status"] == "success"
+
+    def test_unsupported_media_type(self, client):
+        response = self.extract(client, accept="text/csv")
+
+        assert response.status_code == 406
+
+    def test_large_bodies_compressed(self, client, monkeypatch):
+        monkeypatch.setattr(backend, "RESPONSE_COMPRESS_MIN_BYTES", 0)
+
+        response = self.extract(client, **{"accept-encoding": "gzip;q=0.5, zstd"})
+
+        assert response.headers["content-encoding"] == "zstd"
+        # The test client decodes the body transparently
+        assert response.json()["status"] == "success"
+
+    def test_small_bodies_not_compressed(self, client):
+        response = self.extract(client, **{"accept-encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json()["status"] == "success"
+
+    def test_encoded_off_the_event_loop(self, client, monkeypatch):
+        threads = []
+        encode = backend.encode_result
+        monkeypatch.setattr(backend, "encode_result",
+                            lambda *args: threads.append(threading.current_thread()) or encode(*args))
+
+        assert self.extract(client).status_code == 200
+        # Encoding ran in one of the thread pool's workers rather than on the event loop
+        assert threads and "AnyIO worker thread" in threads[0].name
+
+
+class TestBackpressure:
+    """Test cases for bounded extraction concurrency"""
+
+    def test_extract_rejected_when_pool_full(self, client, monkeypatch):
+        pool = backend.ExtractionPool(max_workers=1, max_queue=0)
+        monkeypatch.setattr(backend, "extraction_pool", pool)
+        file_id = upload(client, SAMPLE_DOCX)
+
+        pool.acquire()
+        try:
+            response = client.post("/extract", json={"file_id": file_id})
+        finally:
+            pool.release()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(backend.EXTRACT_RETRY_AFTER)
+        assert pool.stats()["rejected"] == 1
+
+    def test_extract_runs_on_pool(self, client, monkeypatch):
+        pool = backend.ExtractionPool(max_workers=1, max_queue=0)
+        monkeypatch.setattr(backend, "extraction_pool", pool)
+        file_id = upload(client, SAMPLE_DOCX)
+
+        response = client.post("/extract", json={"file_id": file_id})
+
+        assert response.status_code == 200
+        assert pool.stats()["running"] == 0
+
+    def test_stream_slot_released_if_client_gone_before_start(self, client, monkeypatch):
+        pool = backend.ExtractionPool(max_workers=1, max_queue=0)
+        monkeypatch.setattr(backend, "extraction_pool", pool)
+        file_id = upload(client, SAMPLE_PDF)
+
+        async def disconnected(message):
+            raise OSError("client went away")
+
+        async def run():
+            response = await backend.extract_tables_stream(file_id, workers=None, chunk_size=None,
+                                                           table_format=backend.COMPACT)
+            with pytest.raises(Exception):
+                await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, disconnected)
+
+        asyncio.run(run())
+
+        assert pool.stats()["running"] == 0
+
+    def test_stream_closed_after_item_in_flight(self):
+        cleaned = []
+
+        def pages():
+            try:
+                yield 1
+                time.sleep(0.2)
+                yield 2
+            finally:
+                cleaned.append(True)
+
+        tables = pages()
+        next(tables)
+        # Still producing its second item when the client goes away
+        worker = threading.Thread(target=next, args=(tables,))
+        worker.start()
+        time.sleep(0.05)
+
+        backend.close_iterator(tables)
+
+        worker.join()
+        assert cleaned == [True]
+
+    def test_stats(self, client):
+        response = client.get("/stats")
+
+        assert response.status_code == 200
+        assert "extraction_pool" in response.json()
+        assert response.json()["extraction_cache"]["max_bytes"] == backend.MEMORY_CACHE_MAX_BYTES
+
+    def test_extraction_readable_after_memory_eviction(self, client):
+        file_id = upload(client, SAMPLE_DOCX)
+        extraction_id = client.post("/extract", json={"file_id": file_id}).json()["extraction_id"]
+
+        backend.extraction_cache.invalidate(extraction_id)
+        backend.temp_files.invalidate(file_id)
+
+        assert client.get(f"/extractions/{extraction_id}").status_code == 200
+        assert client.post("/extract", json={"file_id": file_id}).status_code == 200
+
+
+class TestJobs:
+    """Test cases for the asynchronous job API"""
+
+    def wait_for_job(self, client, job_id, timeout=60):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = client.get(f"/jobs/{job_id}").json()
+            if job["status"] in ("completed", "failed"):
+                return job
+            time.sleep(0.1)
+        raise AssertionError(f"Job {job_id} did not finish")
+
+    def test_job_lifecycle(self, client):
+        file_id = upload(client, SAMPLE_PDF)
+
+        response = client.post("/jobs", json={"file_id": file_id})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        job = self.wait_for_job(client, job_id)
+        assert job["status"] == "completed"
+        assert job["progress"] == 1
+
+        result = client.get(f"/jobs/{job_id}/result").json()
+        assert len(result["tables"]) == job["table_count"]
+
+        # Completed jobs are served as extractions
+        assert client.get(f"/extractions/{job_id}").status_code == 200
+
+    def test_low_memory_job_fills_table_store(self, client, monkeypatch):
+        # A cached result is already in memory and isn't spilled
+        monkeypatch.setattr(backend.extractor, "result_cache", None)
+        file_id = upload(client, SAMPLE_PDF)
+
+        job_id = client.post("/jobs", json={"file_id": file_id, "low_memory": True}).json()["job_id"]
+
+        job = self.wait_for_job(client, job_id)
+        assert job["status"] == "completed"
+        # Spilled tables were written to the table store before the spill was removed
+        assert backend.table_store.has(job_id)
+        table_id = client.get(f"/jobs/{job_id}/result").json()["tables"][0]["table_id"]
+        assert client.get(f"/extractions/{job_id}/tables/{table_id}").status_code == 200
+
+    def test_corrupt_pdf_job_fails(self, client):
+        with open(SAMPLE_PDF, "rb") as f:
+            response = client.post("/upload", files={"file": ("corrupt.pdf", f.read()[:200])})
+        file_id = response.json()["file_id"]
+
+        job_id = client.post("/jobs", json={"file_id": file_id}).json()["job_id"]
+
+        job = self.wait_for_job(client, job_id)
+        assert job["status"] == "failed"
+        assert job["error"]
+        assert client.get(f"/jobs/{job_id}/result").status_code == 422
+
+    def test_job_result_not_ready(self):
+        # No lifespan, so no workers pick the job up
+        client = TestClient(backend.app)
+        job = backend.job_store.create("file", "/missing.pdf", "missing.pdf", {})
+
+        response = client.get(f"/jobs/{job['job_id']}/result")
+
+        assert response.status_code == 409
+        backend.job_store.delete(job["job_id"])
+
+    def test_job_unknown(self, client):
+        assert client.get("/jobs/missing").status_code == 404
+
+    def test_interrupted_jobs_are_requeued(self):
+        store = backend.JobStore(Path(tempfile.mkdtemp()) / "jobs.sqlite3")
+        job = store.create("file", "/missing.pdf", "missing.pdf", {})
+        store.claim_next()
+
+        assert store.requeue_running() == 1
+        assert store.get(job["job_id"])["status"] == "queued"
+
+    def test_jobs_of_live_workers_not_requeued(self, monkeypatch):
+        store = backend.JobStore(Path(tempfile.mkdtemp()) / "jobs.sqlite3")
+        store.create("file", "/missing.pdf", "missing.pdf", {})
+        # Claimed by a different, still running server process
+        monkeypatch.setattr(os, "getpid", lambda: os.getppid())
+        store.claim_next()
+        monkeypatch.undo()
+
+        assert store.requeue_running() == 0
+
+    def test_large_result_stored_in_pieces(self, monkeypatch):
+        store = backend.JobStore(Path(tempfile.mkdtemp()) / "jobs.sqlite3")
+        monkeypatch.setattr(jobs, "RESULT_CHUNK_SIZE", 64)
+        result = {"status": "success", "tables": [{"table_id": f"t{i}", "data": [["x" * 50]]} for i in range(5)]}
+
+        store.record("big", result)
+
+        assert store.get("big", include_result=True)["result"] == result
+        store.delete("big")
+        conn = store._connect()
+        assert conn.execute("SELECT COUNT(*) FROM job_results").fetchone()[0] == 0
+        conn.close()
@@ -0,0 +1,92 @@
+import pytest
+import threading
+import time
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from artifact_cache import ArtifactCache, etag_matches
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtifactCache(tmp_path / "artifacts", max_bytes=250)
+
+
+def put(cache, extraction_id, table_id, size=100):
+    key = cache.make_key(extraction_id, "csv", table_id, {})
+    return cache.put(key, extraction_id, iter([b"a" * (size // 2), b"b" * (size - size // 2)]), "text/csv", "t.csv")
+
+
+class TestArtifactCache:
+    """Test cases for the rendered download cache"""
+
+    def test_round_trip(self, cache):
+        artifact = put(cache, "ext1", "t0")
+
+        cached = cache.get(artifact["cache_key"])
+        assert cached["etag"] == artifact["etag"]
+        assert Path(cached["path"]).read_bytes() == b"a" * 50 + b"b" * 50
+
+    def test_least_recently_used_evicted(self, cache):
+        first = put(cache, "ext1", "t0")
+        second = put(cache, "ext1", "t1")
+        cache.get(first["cache_key"])
+
+        put(cache, "ext2", "t0")
+
+        assert cache.get(second["cache_key"]) is None
+        assert not Path(second["path"]).exists()
+        assert cache.get(first["cache_key"]) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_delete_extraction(self, cache):
+        artifact = put(cache, "ext1", "t0")
+        put(cache, "ext2", "t0")
+
+        assert cache.delete_extraction("ext1") == 1
+        assert cache.get(artifact["cache_key"]) is None
+        assert cache.stats()["entries"] == 1
+
+    def test_concurrent_misses_render_once(self, tmp_path):
+        cache = ArtifactCache(tmp_path / "artifacts")
+        key = cache.make_key("ext1", "csv", None, {})
+        renders = []
+
+        def render():
+            renders.append(True)
+            time.sleep(0.05)
+            return iter([b"data"]), "text/csv", "t.csv"
+
+        artifacts = []
+        threads = [
+            threading.Thread(target=lambda: artifacts.append(cache.get_or_render(key, "ext1", render)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(renders) == 1
+        assert len({(a["path"], a["etag"]) for a in artifacts}) == 1
+
+    def test_rerender_never_overwrites_served_file(self, cache):
+        key = cache.make_key("ext1", "csv", None, {})
+        first = cache.put(key, "ext1", iter([b"first"]), "text/csv", "t.csv")
+
+        second = cache.put(key, "ext1", iter([b"second"]), "text/csv", "t.csv")
+
+        assert second["path"] != first["path"]
+        assert Path(second["path"]).read_bytes() == b"second"
+        assert cache.get(key)["etag"] == second["etag"]
+        assert not Path(first["path"]).exists()
+
+    def test_etag_matches(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc", "def"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"def"', '"abc"')
+        assert not etag_matches(None, '"abc"')
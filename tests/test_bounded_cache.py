@@ -0,0 +1,99 @@
+import pytest
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+import bounded_cache
+from bounded_cache import BoundedCache, approx_size
+
+
+@pytest.fixture
+def spill():
+    return {}
+
+
+def entry(size):
+    return {"data": "x" * size}
+
+
+class TestBoundedCache:
+    """Test cases for the in-memory LRU/TTL cache"""
+
+    def test_hits_served_from_memory(self, spill):
+        cache = BoundedCache(spill, max_bytes=10_000)
+        cache["a"] = entry(100)
+        spill.clear()
+
+        assert cache["a"] == entry(100)
+        assert cache.stats()["hits"] == 1
+
+    def test_memory_ceiling_evicts_least_recently_used(self, spill):
+        size = approx_size(entry(1000))
+        cache = BoundedCache(spill, max_bytes=size * 2)
+        cache["a"] = entry(1000)
+        cache["b"] = entry(1000)
+        cache["a"]
+
+        cache["c"] = entry(1000)
+
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["entries"] == 2
+        assert stats["bytes"] <= size * 2
+        # Evicted entries come back from disk
+        assert cache["b"] == entry(1000)
+        assert cache.stats()["misses"] == 1
+
+    def test_ttl_expires_memory_copy(self, spill, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(bounded_cache.time, "monotonic", lambda: now[0])
+        cache = BoundedCache(spill, ttl=60)
+        cache["a"] = entry(10)
+
+        now[0] += 61
+
+        assert cache["a"] == entry(10)
+        assert cache.stats()["expirations"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_oversized_entries_stay_on_disk(self, spill):
+        cache = BoundedCache(spill, max_bytes=100)
+        cache["a"] = entry(1000)
+
+        assert cache.stats()["entries"] == 0
+        assert cache["a"] == entry(1000)
+
+    def test_delete_and_clear(self, spill):
+        cache = BoundedCache(spill)
+        cache["a"] = entry(10)
+        cache["b"] = entry(10)
+
+        del cache["a"]
+        assert "a" not in cache
+        assert "a" not in spill
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["bytes"] == 0
+
+    def test_invalidate_rereads_spill(self, spill):
+        cache = BoundedCache(spill)
+        cache["a"] = entry(10)
+        spill["a"] = entry(20)
+
+        cache.invalidate("a")
+
+        assert cache["a"] == entry(20)
+
+    def test_revalidate_sees_deletes_made_elsewhere(self, spill):
+        cache = BoundedCache(spill, revalidate=True)
+        cache["a"] = entry(10)
+        del spill["a"]
+
+        assert "a" not in cache
+        with pytest.raises(KeyError):
+            cache["a"]
+        assert cache.stats()["entries"] == 0
+
@@ -0,0 +1,111 @@
+import pytest
+import io
+import mmap
+import os
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from document_source import BufferReader, DocumentSource
+from extractor import TableExtractor, PdfDocument
+from result_cache import file_sha256
+
+SAMPLE_DIR = Path(__file__).parent.parent / "sample docs"
+SAMPLE_PDF = SAMPLE_DIR / "sample-invoice.pdf"
+SAMPLE_DOCX = SAMPLE_DIR / "school-timetable-template.docx"
+
+
+class TestBufferReader:
+    """Test cases for the zero-copy buffer stream"""
+
+    def test_readers_keep_their_own_position(self):
+        data = b"0123456789"
+        first, second = BufferReader(data), BufferReader(data)
+
+        assert first.read(4) == b"0123"
+        assert second.read(2) == b"01"
+        first.seek(-2, io.SEEK_END)
+        assert first.read() == b"89"
+        assert second.tell() == 2
+
+    def test_close_releases_mmap(self, tmp_path):
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"abc")
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        reader = BufferReader(mapped)
+        assert reader.read() == b"abc"
+
+        reader.close()
+        mapped.close()
+
+
+class TestDocumentSource:
+    """Test cases for documents given as paths or in memory"""
+
+    def test_bytes_need_a_name(self):
+        source = DocumentSource(SAMPLE_PDF.read_bytes(), "invoice.PDF")
+
+        assert source.in_memory
+        assert source.name == "invoice.PDF"
+        assert source.extension == ".pdf"
+
+    def test_name_from_file_object(self):
+        with open(SAMPLE_DOCX, "rb") as f, DocumentSource(f) as source:
+            assert source.name == SAMPLE_DOCX.name
+            assert source.stream().read() == SAMPLE_DOCX.read_bytes()
+
+    def test_hash_matches_file(self):
+        assert DocumentSource(SAMPLE_PDF.read_bytes()).sha256() == file_sha256(str(SAMPLE_PDF))
+
+    def test_path_written_only_when_asked(self):
+        with DocumentSource(SAMPLE_PDF.read_bytes(), SAMPLE_PDF.name) as source:
+            path = source.path()
+            assert source.path() == path
+            assert Path(path).suffix == ".pdf"
+            assert Path(path).read_bytes() == SAMPLE_PDF.read_bytes()
+
+        assert not os.path.exists(path)
+
+    def test_path_source_is_not_copied(self):
+        assert DocumentSource(str(SAMPLE_PDF)).path() == str(SAMPLE_PDF)
+
+
+class TestInMemoryExtraction:
+    """Extracting from memory gives the same tables as extracting from disk"""
+
+    @pytest.mark.parametrize("sample", [SAMPLE_PDF, SAMPLE_DOCX])
+    def test_matches_path_extraction(self, sample):
+        extractor = TableExtractor()
+        expected = extractor.extract_tables(str(sample))["tables"]
+
+        from_bytes = extractor.extract_tables(sample.read_bytes(), file_name=sample.name)
+        from_buffer = extractor.extract_tables(io.BytesIO(sample.read_bytes()), file_name=sample.name)
+        with open(sample, "rb") as f:
+            from_file = extractor.extract_tables(f)
+
+        assert from_bytes["file_name"] == sample.name
+        assert from_bytes["tables"] == from_buffer["tables"] == from_file["tables"] == expected
+
+    def test_iter_tables_from_bytes(self):
+        extractor = TableExtractor()
+        tables = list(extractor.iter_tables(SAMPLE_DOCX.read_bytes(), file_name=SAMPLE_DOCX.name))
+
+        assert [t["table_id"] for t in tables] == [
+            t["table_id"] for t in extractor.extract_tables(str(SAMPLE_DOCX))["tables"]
+        ]
+
+    def test_unsupported_format(self):
+        result = TableExtractor().extract_tables(b"hello", file_name="notes.txt")
+
+        assert result["status"] == "failed"
+        assert result["file_name"] == "notes.txt"
+
+    def test_pdf_document_writes_file_path_lazily(self):
+        with DocumentSource(SAMPLE_PDF.read_bytes(), SAMPLE_PDF.name) as source:
+            with PdfDocument(source) as document:
+                assert document.page_count > 0
+                assert source._temp_path is None
+                assert Path(document.file_path).read_bytes() == SAMPLE_PDF.read_bytes()
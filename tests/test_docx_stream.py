@@ -0,0 +1,101 @@
+import pytest
+import io
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx_stream import iter_docx_tables
+
+SAMPLE_DOCX = Path(__file__).parent.parent / "sample docs" / "school-timetable-template.docx"
+
+
+def python_docx_rows(source):
+    """Table text the way the python-docx engine reads it"""
+    return [
+        [[" ".join(p.text.strip() for p in cell.paragraphs) for cell in row.cells] for row in table.rows]
+        for table in Document(source).tables
+    ]
+
+
+def saved(document):
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def grid_table(document, rows, cols):
+    table = document.add_table(rows=rows, cols=cols)
+    for i, row in enumerate(table.rows):
+        for j, cell in enumerate(row.cells):
+            cell.text = f"r{i}c{j}"
+    return table
+
+
+class TestDocxStream:
+    """Test cases for the streaming DOCX table reader"""
+
+    def test_sample_matches_python_docx(self):
+        assert list(iter_docx_tables(str(SAMPLE_DOCX))) == python_docx_rows(str(SAMPLE_DOCX))
+
+    def test_merged_cells(self):
+        document = Document()
+        table = grid_table(document, 4, 4)
+        table.cell(0, 0).merge(table.cell(0, 1))  # gridSpan
+        table.cell(1, 2).merge(table.cell(3, 2))  # vMerge
+        table.cell(1, 0).merge(table.cell(2, 1))  # both
+        data = saved(document)
+
+        tables = list(iter_docx_tables(io.BytesIO(data)))
+
+        assert tables == python_docx_rows(io.BytesIO(data))
+        assert tables[0][0][:2] == ["r0c0 r0c1", "r0c0 r0c1"]
+        assert tables[0][3][2] == "r1c2 r2c2 r3c2"
+
+    def test_grid_before_skipped(self):
+        document = Document()
+        table = grid_table(document, 2, 3)
+        tr = table.rows[1]._tr
+        tr.remove(tr.tc_lst[0])
+        grid_before = OxmlElement("w:gridBefore")
+        grid_before.set(qn("w:val"), "1")
+        tr.get_or_add_trPr().append(grid_before)
+        data = saved(document)
+
+        tables = list(iter_docx_tables(io.BytesIO(data)))
+
+        assert tables == python_docx_rows(io.BytesIO(data))
+        assert tables[0][1] == ["r1c1", "r1c2"]
+
+    def test_only_top_level_tables(self):
+        document = Document()
+        document.add_paragraph("Before")
+        outer = grid_table(document, 2, 2)
+        outer.cell(1, 1).add_table(rows=1, cols=1).cell(0, 0).text = "nested"
+        document.add_paragraph("Between")
+        grid_table(document, 2, 2)
+        data = saved(document)
+
+        tables = list(iter_docx_tables(io.BytesIO(data)))
+
+        assert len(tables) == 2
+        assert tables == python_docx_rows(io.BytesIO(data))
+
+    def test_run_text(self):
+        document = Document()
+        cell = grid_table(document, 1, 1).cell(0, 0)
+        paragraph = cell.paragraphs[0]
+        paragraph.add_run().add_break()
+        paragraph.add_run("after\tbreak")
+        cell.add_paragraph("second")
+        data = saved(document)
+
+        assert list(iter_docx_tables(io.BytesIO(data))) == python_docx_rows(io.BytesIO(data))
+
+    def test_not_a_docx(self):
+        with pytest.raises(Exception):
+            list(iter_docx_tables(io.BytesIO(b"not a zip")))
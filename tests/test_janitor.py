@@ -0,0 +1,151 @@
+import pytest
+import os
+import time
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from janitor import Janitor
+from jobs import JobStore
+from upload_store import UploadStore
+
+HOUR = 3600
+
+
+@pytest.fixture
+def upload_store(tmp_path):
+    return UploadStore(tmp_path / "uploads")
+
+
+@pytest.fixture
+def job_store(tmp_path):
+    return JobStore(tmp_path / "jobs.sqlite3")
+
+
+def add_blob(upload_store, name, size, idle):
+    """A stored document last used ``idle`` seconds ago"""
+    path = upload_store.root / f"{name}.pdf"
+    path.write_bytes(b"x" * size)
+    last_used = time.time() - idle
+    os.utime(path, (last_used, last_used))
+    return str(path)
+
+
+def make_janitor(upload_store, uploads, job_store, **kwargs):
+    deleted = []
+
+    def delete_extraction(extraction_id):
+        deleted.append(extraction_id)
+        return 10
+
+    janitor = Janitor(upload_store, uploads, job_store, delete_extraction,
+                      upload_ttl=HOUR, result_ttl=HOUR, **kwargs)
+    return janitor, deleted
+
+
+class TestJanitor:
+    """Test cases for the background janitor"""
+
+    def test_expired_upload_records_forgotten(self, upload_store, job_store):
+        uploads = {
+            "old": {"path": "/a.pdf", "uploaded_at": time.time() - 2 * HOUR},
+            "new": {"path": "/b.pdf", "uploaded_at": time.time()}
+        }
+        janitor, _ = make_janitor(upload_store, uploads, job_store)
+
+        assert janitor.run_once()["uploads_expired"] == 1
+        assert list(uploads) == ["new"]
+
+    def test_upload_removed_concurrently_skipped(self, upload_store, job_store):
+        class RacingUploads(dict):
+            # Another process deletes "gone" after it was listed
+            def __delitem__(self, key):
+                if key == "gone":
+                    raise KeyError(key)
+                super().__delitem__(key)
+
+        old = time.time() - 2 * HOUR
+        uploads = RacingUploads(gone={"path": "/a.pdf", "uploaded_at": old},
+                                old={"path": "/b.pdf", "uploaded_at": old})
+        janitor, _ = make_janitor(upload_store, uploads, job_store)
+
+        assert janitor.run_once()["uploads_expired"] == 1
+        assert "old" not in uploads
+
+    def test_unused_unreferenced_blobs_deleted(self, upload_store, job_store):
+        stale = add_blob(upload_store, "stale", 100, idle=2 * HOUR)
+        kept = add_blob(upload_store, "referenced", 100, idle=2 * HOUR)
+        fresh = add_blob(upload_store, "fresh", 100, idle=120)
+        janitor, _ = make_janitor(upload_store, {"f": {"path": kept, "uploaded_at": time.time()}}, job_store)
+
+        run = janitor.run_once()
+
+        assert run["files_evicted"] == 1
+        assert run["bytes_reclaimed"] == 100
+        assert not Path(stale).exists()
+        assert Path(kept).exists()
+        assert Path(fresh).exists()
+
+    def test_quota_evicts_least_recently_used_first(self, upload_store, job_store):
+        oldest = add_blob(upload_store, "oldest", 100, idle=600)
+        older = add_blob(upload_store, "older", 100, idle=300)
+        newest = add_blob(upload_store, "newest", 100, idle=120)
+        janitor, _ = make_janitor(upload_store, {}, job_store, quota_bytes=150)
+
+        run = janitor.run_once()
+
+        assert run["quota_evictions"] == 2
+        assert not Path(oldest).exists()
+        assert not Path(older).exists()
+        assert Path(newest).exists()
+
+    def test_documents_of_active_jobs_kept(self, upload_store, job_store):
+        path = add_blob(upload_store, "queued", 100, idle=2 * HOUR)
+        job_store.create("file", path, "queued.pdf", {})
+        janitor, _ = make_janitor(upload_store, {}, job_store, quota_bytes=0)
+
+        janitor.run_once()
+
+        assert Path(path).exists()
+
+    def test_old_results_expired(self, upload_store, job_store):
+        job_store.record("old", {"tables": []})
+        job_store._execute("UPDATE jobs SET finished_at = ? WHERE job_id = 'old'", (time.time() - 2 * HOUR,))
+        job_store.record("new", {"tables": []})
+        janitor, deleted = make_janitor(upload_store, {}, job_store)
+
+        run = janitor.run_once()
+
+        assert deleted == ["old"]
+        assert run["results_expired"] == 1
+        assert job_store.get("old") is None
+        assert job_store.get("new") is not None
+
+    def test_stale_scratch_removed(self, upload_store, job_store, tmp_path):
+        spill = tmp_path / "spill"
+        stale = spill / "spill_old"
+        stale.mkdir(parents=True)
+        (stale / "000000.arrow").write_bytes(b"x" * 50)
+        os.utime(stale, (time.time() - 2 * HOUR,) * 2)
+        (spill / "spill_new").mkdir()
+        janitor, _ = make_janitor(upload_store, {}, job_store, scratch=[(spill, "spill_*")])
+
+        run = janitor.run_once()
+
+        assert run["scratch_removed"] == 1
+        assert run["bytes_reclaimed"] == 50
+        assert [p.name for p in spill.iterdir()] == ["spill_new"]
+
+    def test_stats_accumulate(self, upload_store, job_store):
+        add_blob(upload_store, "stale", 100, idle=2 * HOUR)
+        janitor, _ = make_janitor(upload_store, {}, job_store)
+
+        janitor.run_once()
+        janitor.run_once()
+
+        stats = janitor.stats()
+        assert stats["runs"] == 2
+        assert stats["files_evicted"] == 1
+        assert stats["upload_bytes"] == 0
@@ -0,0 +1,105 @@
+import pytest
+import json
+import shutil
+import zlib
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from document_source import DocumentSource
+from extractor import TableExtractor
+from result_cache import ResultCache, file_sha256
+
+SAMPLE_DOCX = Path(__file__).parent.parent / "sample docs" / "school-timetable-template.docx"
+SAMPLE_PDF = Path(__file__).parent.parent / "sample docs" / "sample-invoice.pdf"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path / "results.sqlite3")
+
+
+class TestResultCache:
+    """Test cases for the content-addressed result cache"""
+
+    def test_repeat_extraction_hits_cache(self, cache, tmp_path):
+        extractor = TableExtractor(result_cache=cache)
+        # Same bytes under a different name still hit the cache
+        copy = tmp_path / "copy.docx"
+        shutil.copy(SAMPLE_DOCX, copy)
+
+        first = extractor.extract_tables(str(SAMPLE_DOCX))
+        second = extractor.extract_tables(str(copy))
+
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hits"] == 1
+        assert second["file_name"] == "copy.docx"
+        assert second["tables"][0]["columns"] == first["tables"][0]["columns"]
+
+    def test_known_hash_skips_hashing(self, cache, monkeypatch):
+        extractor = TableExtractor(result_cache=cache)
+        content_hash = file_sha256(str(SAMPLE_DOCX))
+        extractor.extract_tables(str(SAMPLE_DOCX))
+
+        def fail(source):
+            raise AssertionError("file was hashed again")
+        monkeypatch.setattr(DocumentSource, "sha256", fail)
+        extractor.extract_tables(str(SAMPLE_DOCX), content_hash=content_hash)
+
+        assert cache.stats()["hits"] == 1
+
+    def test_modes_share_an_entry(self, cache):
+        extractor = TableExtractor(result_cache=cache)
+        progress = []
+
+        serial = extractor.extract_tables(str(SAMPLE_PDF))
+        chunked = extractor.extract_tables(str(SAMPLE_PDF), parallel=True, workers=1, chunk_size=2,
+                                           progress=lambda done, total: progress.append(done),
+                                           low_memory=True)
+
+        assert cache.stats()["hits"] == 1
+        assert chunked["tables"] == json.loads(json.dumps(serial["tables"]))
+        assert progress == [1]
+
+    def test_engine_failure_not_cached(self, cache, monkeypatch):
+        extractor = TableExtractor(result_cache=cache)
+
+        def fail(page):
+            raise RuntimeError("engine crashed")
+        monkeypatch.setattr(extractor, "_vector_lattice_tables", fail)
+        failed = extractor.extract_tables(str(SAMPLE_PDF))
+        monkeypatch.undo()
+        retried = extractor.extract_tables(str(SAMPLE_PDF))
+
+        assert failed["engine_errors"]
+        assert "engine_errors" not in retried
+        assert retried["tables"]
+        assert cache.stats()["hits"] == 0
+
+    def test_options_are_part_of_key(self, cache):
+        assert cache.make_key("abc", {"chunk_size": 1}) != cache.make_key("abc", {"chunk_size": 2})
+        assert cache.make_key("abc", {"a": 1, "b": 2}) == cache.make_key("abc", {"b": 2, "a": 1})
+
+    def test_survives_reopen(self, cache):
+        cache.put("key", {"tables": [], "status": "no_tables_found"})
+
+        reopened = ResultCache(cache.db_path)
+
+        assert reopened.get("key")["status"] == "no_tables_found"
+
+    def test_lru_eviction(self, tmp_path):
+        payload = {"tables": [{"rows": [[str(i) * 20 for i in range(10)]]}]}
+        size = len(zlib.compress(json.dumps(payload).encode(), 1))
+        # Room for two entries
+        cache = ResultCache(tmp_path / "results.sqlite3", max_bytes=size * 2)
+
+        cache.put("a", payload)
+        cache.put("b", payload)
+        cache.get("a")
+        cache.put("c", payload)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
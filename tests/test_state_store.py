@@ -0,0 +1,66 @@
+import pytest
+import multiprocessing
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from state_store import MemoryState, SQLiteState, open_state
+
+
+def write_from_other_process(db_path):
+    SQLiteState(db_path).namespace("uploads")["from-child"] = {"path": "/tmp/b.pdf"}
+
+
+class TestSQLiteState:
+    """Test cases for the SQLite state backend"""
+
+    def test_round_trip(self, tmp_path):
+        uploads = SQLiteState(tmp_path / "state.sqlite3").namespace("uploads")
+
+        uploads["a"] = {"path": "/tmp/a.pdf", "size": 3}
+
+        assert uploads["a"] == {"path": "/tmp/a.pdf", "size": 3}
+        assert "a" in uploads
+        assert list(uploads) == ["a"]
+        assert dict(uploads.items()) == {"a": {"path": "/tmp/a.pdf", "size": 3}}
+
+    def test_namespaces_are_separate(self, tmp_path):
+        state = SQLiteState(tmp_path / "state.sqlite3")
+        state.namespace("uploads")["a"] = 1
+
+        state.namespace("other").clear()
+
+        assert "a" not in state.namespace("other")
+        assert len(state.namespace("uploads")) == 1
+
+    def test_missing_keys(self, tmp_path):
+        uploads = SQLiteState(tmp_path / "state.sqlite3").namespace("uploads")
+
+        with pytest.raises(KeyError):
+            uploads["missing"]
+        with pytest.raises(KeyError):
+            del uploads["missing"]
+
+    def test_visible_across_processes(self, tmp_path):
+        db_path = tmp_path / "state.sqlite3"
+        state = SQLiteState(db_path)
+
+        child = multiprocessing.get_context("spawn").Process(target=write_from_other_process, args=(db_path,))
+        child.start()
+        child.join(30)
+
+        assert state.namespace("uploads")["from-child"] == {"path": "/tmp/b.pdf"}
+
+
+class TestOpenState:
+    """Test cases for choosing a state backend"""
+
+    def test_backends(self, tmp_path):
+        assert isinstance(open_state("memory", tmp_path), MemoryState)
+        assert open_state("sqlite", tmp_path).shared
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            open_state("redis", tmp_path)
@@ -0,0 +1,412 @@
+import pytest
+import json
+import random
+import time
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+import pdfplumber
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from table_format import compact_table, table_rows
+from table_spill import close_tables
+import extractor as extractor_module
+from extractor import TableExtractor, CharIndex, PdfDocument, VECTOR_LATTICE, LATTICE, WHITESPACE_STREAM, PDFPLUMBER
+from pdf_factory import write_pdf, grid_page, borderless_page, prose_page
+
+SAMPLE_DIR = Path(__file__).parent.parent / "sample docs"
+SAMPLE_PDF = SAMPLE_DIR / "sample-invoice.pdf"
+SAMPLE_DOCX = SAMPLE_DIR / "school-timetable-template.docx"
+
+TABLE_ROWS = [
+    ["Name", "Qty", "Price"],
+    ["Apple", "3", "1.20"],
+    ["Pear", "5", "0.80"],
+    ["Plum", "7", "2.10"]
+]
+
+
+@pytest.fixture
+def mixed_pdf(tmp_path):
+    """Ruled table, borderless table and plain text on pages 1-3"""
+    return write_pdf(tmp_path / "mixed.pdf", [
+        grid_page(TABLE_ROWS),
+        borderless_page(TABLE_ROWS),
+        prose_page(["Lorem ipsum dolor sit amet, consectetur", "adipiscing elit sed do eiusmod"])
+    ])
+
+
+def run_engine(extractor, engine, pdf_path, page_number=1):
+    """Run one in-process engine on a single page of a PDF"""
+    with PdfDocument(pdf_path) as document:
+        return extractor._run_page_engine(engine, document.page(page_number), page_number)
+
+
+class TestParallelExtraction:
+    """Test cases for page-parallel PDF extraction"""
+
+    def setup_method(self):
+        self.extractor = TableExtractor()
+
+    def test_parallel_matches_serial(self):
+        """Parallel mode returns the same tables, ids and order as a serial run"""
+        serial = self.extractor.extract_tables(str(SAMPLE_PDF))
+        parallel = self.extractor.extract_tables(str(SAMPLE_PDF), parallel=True, workers=2, chunk_size=1)
+
+        assert parallel["status"] == "success"
+        assert [t["table_id"] for t in parallel["tables"]] == [t["table_id"] for t in serial["tables"]]
+        assert [t["columns"] for t in parallel["tables"]] == [t["columns"] for t in serial["tables"]]
+
+    def test_workers_capped_server_side(self, monkeypatch):
+        def no_pool(*args, **kwargs):
+            raise AssertionError("a process pool was started")
+        monkeypatch.setattr(extractor_module, "ProcessPoolExecutor", no_pool)
+        extractor = TableExtractor(max_workers=1)
+
+        result = extractor.extract_tables(str(SAMPLE_PDF), parallel=True, workers=5000, chunk_size=1)
+
+        assert result["status"] == "success"
+
+    def test_pool_workers_are_not_forked(self):
+        # Forking a threaded server process can deadlock the child
+        assert extractor_module.POOL_CONTEXT.get_start_method() in ("forkserver", "spawn")
+
+    def test_parallel_single_worker(self):
+        """A single worker processes chunks in-process"""
+        result = self.extractor.extract_tables(str(SAMPLE_PDF), parallel=True, workers=1, chunk_size=2)
+
+        assert result["status"] == "success"
+        assert len(result["tables"]) > 0
+
+
+class TestLowMemory:
+    """Test cases for bounded-memory PDF extraction"""
+
+    def test_low_memory_matches_default(self, mixed_pdf, tmp_path):
+        extractor = TableExtractor(spill_dir=str(tmp_path / "spill"))
+
+        default = extractor.extract_tables(mixed_pdf)
+        low_memory = extractor.extract_tables(mixed_pdf, low_memory=True)
+
+        # Spilled tables come back through JSON metadata, so shape is a list
+        assert list(low_memory["tables"]) == json.loads(json.dumps(default["tables"]))
+        assert low_memory["page_engines"] == default["page_engines"]
+        # Tables stay on disk until the consumer is done with them
+        close_tables(low_memory)
+        assert list((tmp_path / "spill").iterdir()) == []
+
+    def test_document_reopened_over_budget(self, mixed_pdf, monkeypatch):
+        reopened = []
+        monkeypatch.setattr(PdfDocument, "reopen", lambda document: reopened.append(True))
+        extractor = TableExtractor(memory_budget=0)
+
+        result = extractor.extract_tables(mixed_pdf, low_memory=True, chunk_size=1)
+        close_tables(result)
+
+        assert result["status"] == "success"
+        # Reopened between each of the three one-page windows
+        assert len(reopened) == 2
+
+
+class TestIterTables:
+    """Test cases for the streaming iter_tables generator"""
+
+    def setup_method(self):
+        self.extractor = TableExtractor()
+
+    def test_iter_tables_pdf_matches_extract(self):
+        """Streamed PDF tables carry page numbers and match the batch result"""
+        streamed = list(self.extractor.iter_tables(str(SAMPLE_PDF)))
+        batch = self.extractor.extract_tables(str(SAMPLE_PDF))
+
+        assert [t["table_id"] for t in streamed] == [t["table_id"] for t in batch["tables"]]
+        pages = [t["page"] for t in streamed]
+        assert pages == sorted(pages)
+        assert all(t["source"] for t in streamed)
+
+    def test_iter_tables_docx(self):
+        """DOCX tables are yielded without a page number"""
+        tables = list(self.extractor.iter_tables(str(SAMPLE_DOCX)))
+
+        assert len(tables) == 1
+        assert tables[0]["page"] is None
+        assert tables[0]["source"] == "docx"
+
+    def test_docx_streamed(self):
+        result = self.extractor.extract_tables(str(SAMPLE_DOCX))
+
+        assert result["extraction_method"] == "docx-stream"
+        assert result["tables"][0]["engine"] == "docx-stream"
+
+    def test_docx_falls_back_to_python_docx(self, monkeypatch):
+        def broken(path):
+            raise ValueError("unreadable document.xml")
+        monkeypatch.setattr(extractor_module, "iter_docx_tables", broken)
+
+        streamed = TableExtractor().extract_tables(str(SAMPLE_DOCX))
+
+        assert streamed["extraction_method"] == "python-docx"
+        assert streamed["tables"][0]["columns"] == self.extractor.extract_tables(str(SAMPLE_DOCX))["tables"][0]["columns"]
+
+    def test_iter_tables_is_lazy(self):
+        """Tables are available before the whole document is processed"""
+        tables = self.extractor.iter_tables(str(SAMPLE_PDF))
+
+        first = next(tables)
+        tables.close()
+
+        assert first["page"] == 1
+
+    def test_iter_tables_unsupported_format(self):
+        """Unsupported formats raise as soon as iteration starts"""
+        with pytest.raises(ValueError):
+            next(self.extractor.iter_tables("notes.txt"))
+
+
+class TestPageRouting:
+    """Test cases for per-page engine selection"""
+
+    def setup_method(self):
+        self.extractor = TableExtractor()
+
+    def test_classify_pages(self, mixed_pdf):
+        with pdfplumber.open(mixed_pdf) as pdf:
+            engines = [self.extractor._classify_page(page) for page in pdf.pages]
+
+        assert engines == [VECTOR_LATTICE, WHITESPACE_STREAM, None]
+
+    def test_page_engines_reported(self, mixed_pdf):
+        result = self.extractor.extract_tables(mixed_pdf)
+
+        assert result["page_engines"] == {"1": VECTOR_LATTICE, "2": WHITESPACE_STREAM}
+        assert result["extraction_method"] == f"{VECTOR_LATTICE}+{WHITESPACE_STREAM}"
+        assert [t["page"] for t in result["tables"]] == [1, 2]
+        assert [t["table_id"] for t in result["tables"]] == ["vector_page_0_table_0", "stream_page_1_table_0"]
+
+    def test_words_extracted_once_per_page(self, mixed_pdf, monkeypatch):
+        calls = []
+        original = pdfplumber.page.Page.extract_words
+        monkeypatch.setattr(pdfplumber.page.Page, "extract_words",
+                            lambda page, **kwargs: calls.append(page.page_number) or original(page, **kwargs))
+
+        with PdfDocument(mixed_pdf) as document:
+            tables = self.extractor._extract_pdf_pages(document)
+
+        # The whitespace page's words serve both the classifier and the engine
+        assert [t["page"] for t in tables] == [1, 2]
+        assert calls.count(2) == 1
+
+    def test_fallback_retries_only_failed_pages(self, mixed_pdf, monkeypatch):
+        page_calls = []
+        camelot_calls = []
+
+        def fake_page_engine(engine, page, page_number, page_words=None, errors=None):
+            page_calls.append((engine, page_number))
+            if engine in (VECTOR_LATTICE, PDFPLUMBER):
+                return []
+            return [{"table_id": f"{engine}_{page_number}", "source": engine, "page": page_number, "engine": engine}]
+
+        def fake_camelot(engine, file_path, pages, errors=None):
+            camelot_calls.append((engine, pages))
+            return [{"table_id": "camelot_table_0", "source": "camelot", "page": p, "engine": engine} for p in pages]
+
+        monkeypatch.setattr(self.extractor, "_run_page_engine", fake_page_engine)
+        monkeypatch.setattr(self.extractor, "_run_camelot", fake_camelot)
+        with PdfDocument(mixed_pdf) as document:
+            tables = self.extractor._extract_pdf_pages(document)
+
+        assert page_calls == [(VECTOR_LATTICE, 1), (PDFPLUMBER, 1), (WHITESPACE_STREAM, 2)]
+        assert camelot_calls == [(LATTICE, [1])]
+        assert [t["page"] for t in tables] == [1, 2]
+
+    def test_pages_released_after_processing(self, mixed_pdf, monkeypatch):
+        released = []
+        original_release = PdfDocument.release
+
+        def tracking_release(document, page_number):
+            released.append(page_number)
+            original_release(document, page_number)
+
+        monkeypatch.setattr(PdfDocument, "release", tracking_release)
+        result = self.extractor.extract_tables(mixed_pdf)
+
+        assert released == [1, 2, 3]
+        assert result["page_count"] == 3
+
+
+class TestVectorLattice:
+    """Test cases for the vector-based lattice engine"""
+
+    def setup_method(self):
+        self.extractor = TableExtractor()
+
+    def test_grid_cells(self, tmp_path):
+        pdf_path = write_pdf(tmp_path / "grid.pdf", [grid_page(TABLE_ROWS)])
+
+        tables = run_engine(self.extractor, VECTOR_LATTICE, pdf_path)
+
+        assert len(tables) == 1
+        assert tables[0]["headers"] == TABLE_ROWS[0]
+        assert table_rows(tables[0]) == TABLE_ROWS[1:]
+        assert tables[0]["engine"] == VECTOR_LATTICE
+
+    def test_merged_header_cell(self, tmp_path):
+        page = grid_page([["Fruit basket summary", "", ""]] + TABLE_ROWS)
+        # Drop the interior vertical rulings inside the first row
+        page["lines"] = [
+            line for line in page["lines"]
+            if not (line[0] == line[2] and line[0] not in (50, 350))
+        ] + [(150, 70, 150, 150), (250, 70, 250, 150)]
+        pdf_path = write_pdf(tmp_path / "merged.pdf", [page])
+
+        tables = run_engine(self.extractor, VECTOR_LATTICE, pdf_path)
+
+        assert tables[0]["headers"][0] == "Fruit basket summary"
+        assert table_rows(tables[0])[0] == TABLE_ROWS[0]
+
+    def test_tables_in_reading_order(self, tmp_path):
+        lower = grid_page(TABLE_ROWS, top=400)
+        upper = grid_page([["A", "B"], ["1", "2"]], top=50)
+        # Lower table's rulings come first in the content stream
+        page = {"texts": lower["texts"] + upper["texts"], "lines": lower["lines"] + upper["lines"]}
+        pdf_path = write_pdf(tmp_path / "two.pdf", [page])
+
+        tables = run_engine(self.extractor, VECTOR_LATTICE, pdf_path)
+
+        assert [t["headers"] for t in tables] == [["A", "B"], TABLE_ROWS[0]]
+
+
+class TestWhitespaceStream:
+    """Test cases for the whitespace-clustering stream engine"""
+
+    def setup_method(self):
+        self.extractor = TableExtractor()
+
+    def test_borderless_table(self, tmp_path):
+        rows = [["Name", "Qty", "Unit price"], ["Big Apple", "3", "1.20"], ["Pear", "5", "0.80"], ["Plum", "7", "2.10"]]
+        page = borderless_page(rows, top=100)
+        page["texts"] += prose_page(["Statement for March"])["texts"]
+        pdf_path = write_pdf(tmp_path / "statement.pdf", [page])
+
+        with pdfplumber.open(pdf_path) as pdf:
+            tables = self.extractor._whitespace_stream_tables(pdf.pages[0])
+
+        # Multi-word cells stay together and the title line is not part of the table
+        assert tables == [rows]
+
+    def test_prose_has_no_tables(self, tmp_path):
+        pdf_path = write_pdf(tmp_path / "prose.pdf", [prose_page(["Lorem ipsum dolor sit amet"] * 5)])
+
+        with pdfplumber.open(pdf_path) as pdf:
+            assert self.extractor._whitespace_stream_tables(pdf.pages[0]) == []
+
+
+def make_chars(n_rows, n_cols, chars_per_cell=4, cell_width=20, cell_height=10):
+    """Synthetic pdfplumber-style characters laid out in a dense grid"""
+    chars = []
+    for i in range(n_rows):
+        for j in range(n_cols):
+            for k in range(chars_per_cell):
+                x = j * cell_width + k * 4
+                chars.append({
+                    "x0": x, "x1": x + 3, "top": i * cell_height + 1, "bottom": i * cell_height + 8,
+                    "text": "abcdefghij"[k % 10], "size": 6
+                })
+    return chars
+
+
+class TestCharIndex:
+    """Test cases for the per-page character spatial index"""
+
+    def test_query_matches_brute_force(self):
+        rng = random.Random(0)
+        chars = []
+        for _ in range(2000):
+            x, y = rng.uniform(0, 600), rng.uniform(0, 800)
+            chars.append({"x0": x, "x1": x + 4, "top": y, "bottom": y + 8, "text": "x", "size": 8})
+        index = CharIndex(chars)
+
+        for _ in range(50):
+            x0, top = rng.uniform(0, 500), rng.uniform(0, 700)
+            x1, bottom = x0 + rng.uniform(1, 100), top + rng.uniform(1, 100)
+            expected = [
+                i for i, c in enumerate(chars)
+                if x0 <= (c["x0"] + c["x1"]) / 2 < x1 and top <= (c["top"] + c["bottom"]) / 2 < bottom
+            ]
+            assert index.query(x0, top, x1, bottom).tolist() == expected
+
+    def test_cell_text(self):
+        index = CharIndex(make_chars(2, 2))
+
+        assert index.text((20, 10, 40, 20)) == "abcd"
+        assert index.text((500, 500, 600, 600)) == ""
+
+    def test_mixed_tops_stay_on_one_line(self):
+        # Different fonts on one baseline put tops on both sides of a rounding boundary
+        def char(text, x, top):
+            return {"x0": x, "x1": x + 5, "top": top, "bottom": top + 8, "text": text, "size": 8}
+        chars = [char("A", 0, 100.6), char("B", 5, 100.6), char("C", 20, 100.4), char("D", 25, 100.4),
+                 char("E", 0, 112)]
+
+        assert extractor_module._join_chars(chars) == "AB CD E"
+
+    def test_grid_cells(self):
+        index = CharIndex(make_chars(3, 3))
+
+        idx, rows, cols = index.grid_cells([0, 20, 40], [0, 10, 20])
+
+        assert len(idx) == 16
+        assert set(zip(rows.tolist(), cols.tolist())) == {(0, 0), (0, 1), (1, 0), (1, 1)}
+
+    def test_dense_page_assembly(self):
+        """5,000 cells assemble without rescanning the page per cell"""
+        chars = make_chars(100, 50)
+
+        start = time.time()
+        index = CharIndex(chars)
+        cells = [index.text((j * 20, i * 10, j * 20 + 20, i * 10 + 10)) for i in range(100) for j in range(50)]
+        elapsed = time.time() - start
+
+        assert cells == ["abcd"] * 5000
+        assert elapsed < 5
+
+    def test_pdfplumber_path_uses_index(self, tmp_path):
+        pdf_path = write_pdf(tmp_path / "grid.pdf", [grid_page(TABLE_ROWS)])
+
+        tables = run_engine(TableExtractor(), PDFPLUMBER, pdf_path)
+
+        assert tables[0]["headers"] == TABLE_ROWS[0]
+        assert table_rows(tables[0]) == TABLE_ROWS[1:]
+
+
+class TestArrowExport:
+    """Test cases for typed Parquet and Arrow exports"""
+
+    def setup_method(self):
+        self.extractor = TableExtractor()
+        df = pd.DataFrame(
+            [["Apple", "3", "1.20", "007"], ["Pear", "", "0.80", "012"]],
+            columns=["Name", "Qty", "Price", "Code"]
+        )
+        self.tables = [compact_table(df, "docx_table_0"), compact_table(df.iloc[:, :2], "docx_table_1")]
+
+    def test_parquet_columns_are_typed(self, tmp_path):
+        paths = self.extractor.export_to_parquet(self.tables, tmp_path)
+
+        table = pq.read_table(paths[0])
+        assert len(paths) == 2
+        assert table.schema.types == [pa.string(), pa.int64(), pa.float64(), pa.string()]
+        assert table.column("Qty").to_pylist() == [3, None]
+        assert table.column("Code").to_pylist() == ["007", "012"]
+
+    def test_arrow_export(self, tmp_path):
+        paths = self.extractor.export_to_arrow(self.tables, tmp_path)
+
+        with pa.memory_map(paths[1]) as source:
+            table = pa.ipc.open_file(source).read_all()
+        assert table.column_names == ["Name", "Qty"]
+        assert json.loads(table.schema.metadata[b"table"])["table_id"] == "docx_table_1"
@@ -0,0 +1,46 @@
+import pytest
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+import pandas as pd
+from table_format import compact_table, format_result, table_rows, to_legacy, LEGACY
+
+ROWS = [["Mon", "Maths", "9:00"], ["Mon", "Art", "10:00"], ["Mon", None, "11:00"], ["Tue", "Maths", "9:00"]]
+
+
+@pytest.fixture
+def table():
+    df = pd.DataFrame(ROWS, columns=["Day", "Subject", "Time"])
+    return compact_table(df, "docx_table_0")
+
+
+class TestTableFormat:
+    """Test cases for the compact columnar table format"""
+
+    def test_repeated_values_are_dictionary_encoded(self, table):
+        day, subject, time = table["columns"]
+
+        assert day == {"dictionary": ["Mon", "Tue"], "indices": [0, 0, 0, 1]}
+        assert subject == {"dictionary": ["Maths", "Art"], "indices": [0, 1, -1, 0]}
+        # Mostly distinct columns stay plain lists
+        assert time == ["9:00", "10:00", "11:00", "9:00"]
+
+    def test_rows_round_trip(self, table):
+        assert table_rows(table) == ROWS
+
+    def test_legacy_shape(self, table):
+        legacy = to_legacy(table)
+
+        assert legacy["rows"] == ROWS
+        assert legacy["data"][1] == {"Day": "Mon", "Subject": "Art", "Time": "10:00"}
+        assert "columns" not in legacy and "format" not in legacy
+        assert to_legacy(legacy) is legacy
+
+    def test_format_result(self, table):
+        result = {"tables": [table], "status": "success"}
+
+        assert format_result(result) is result
+        assert format_result(result, LEGACY)["tables"][0]["rows"] == ROWS
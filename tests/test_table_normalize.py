@@ -0,0 +1,134 @@
+import pandas as pd
+import pyarrow as pa
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from table_normalize import normalize_cells, normalize_headers, normalize_table, merge_wrapped_rows
+
+
+def rows(df):
+    """Cell values with nulls as None"""
+    return [[None if pd.isna(v) else v for v in row] for row in df.itertuples(index=False)]
+
+
+class TestNormalizeCells:
+    """Test cases for whitespace cleanup"""
+
+    def test_trims_and_collapses(self):
+        cells = pa.array(["  a  b ", "x\ny\tz", "plain", "a b"])
+
+        assert normalize_cells(cells).to_pylist() == ["a b", "x y z", "plain", "a b"]
+
+    def test_blanks_become_null(self):
+        cells = pa.array(["", "   ", "\n", None, "0"])
+
+        assert normalize_cells(cells).to_pylist() == [None, None, None, None, "0"]
+
+
+class TestNormalizeHeaders:
+    """Test cases for header cleanup and de-duplication"""
+
+    def test_blank_headers_are_numbered(self):
+        assert normalize_headers([" Name ", None, "", "  ", "Total\nAmount"]) == [
+            "Name", "col_1", "col_2", "col_3", "Total Amount"
+        ]
+
+    def test_duplicates_get_suffixes(self):
+        assert normalize_headers(["a", "b", "a", "a", "b"]) == ["a", "b", "a_1", "a_2", "b_1"]
+
+    def test_suffix_never_clashes(self):
+        headers = normalize_headers(["a", "a", "a_1"])
+
+        assert headers == ["a", "a_2", "a_1"]
+        assert len(set(headers)) == 3
+
+    def test_camelot_integer_columns(self):
+        assert normalize_headers([0, 1, 2]) == ["col_0", "1", "2"]
+
+
+class TestMergeWrappedRows:
+    """Test cases for folding wrapped text back into its row"""
+
+    def test_merges_wrapped_description(self):
+        columns = [
+            pa.array(["Widget", None, None, "Gadget"]),
+            pa.array(["A long", "description that", "wraps", "Short"]),
+            pa.array(["10,00 €", None, None, "5"])
+        ]
+
+        merged = merge_wrapped_rows(columns)
+
+        assert [column.to_pylist() for column in merged] == [
+            ["Widget", "Gadget"],
+            ["A long description that wraps", "Short"],
+            ["10,00 €", "5"]
+        ]
+
+    def test_rows_with_numbers_are_kept(self):
+        columns = [
+            pa.array(["Invoice", None, None]),
+            pa.array(["Fee", "Total", "VAT 19 %"]),
+            pa.array(["10", None, None]),
+            pa.array(["10,00 €", "381,12 €", "72,41 €"])
+        ]
+
+        assert merge_wrapped_rows(columns) == columns
+
+    def test_text_not_appended_to_numbers(self):
+        columns = [
+            pa.array(["Widget", None, None]),
+            pa.array(["2", "blue", "Subtotal"]),
+            pa.array(["$5.00", None, None])
+        ]
+
+        assert merge_wrapped_rows(columns) == columns
+
+    def test_grouped_rows_are_kept(self):
+        # A blank first cell under a group label isn't wrapped text
+        columns = [
+            pa.array(["North", None]),
+            pa.array(["Springfield", "Shelbyville"]),
+            pa.array(["Open", "Closed"])
+        ]
+
+        assert merge_wrapped_rows(columns) == columns
+
+
+class TestNormalizeTable:
+    """Test cases for the full normalization stage"""
+
+    def test_drops_blank_rows_and_columns(self):
+        df = pd.DataFrame(
+            [["a", " ", "1"], ["", "", "  "], [None, "\n", None], ["b", "", "2"]],
+            columns=["Name", "Empty", "Value"]
+        )
+
+        normalized = normalize_table(df)
+
+        assert normalized.columns.tolist() == ["Name", "Value"]
+        assert rows(normalized) == [["a", "1"], ["b", "2"]]
+
+    def test_merge_can_be_disabled(self):
+        df = pd.DataFrame([["Widget", "A long"], [None, "description"]], columns=["Item", "Text"])
+
+        assert rows(normalize_table(df)) == [["Widget", "A long description"]]
+        assert rows(normalize_table(df, merge_wrapped=False)) == [["Widget", "A long"], [None, "description"]]
+
+    def test_numbers_become_text(self):
+        df = pd.DataFrame({"a": [1, None], "b": ["x", "y"]})
+
+        assert rows(normalize_table(df, merge_wrapped=False)) == [["1.0", "x"], [None, "y"]]
+
+    def test_large_table(self):
+        df = pd.DataFrame({"id": [f" {i} " for i in range(100000)], "text": ["a  b"] * 100000})
+
+        normalized = normalize_table(df)
+
+        assert normalized.shape == (100000, 2)
+        assert rows(normalized.head(1)) == [["0", "a b"]]
+
+    def test_no_columns(self):
+        assert normalize_table(pd.DataFrame(index=range(3))).empty
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from table_spill import TableSpill, close_tables, iter_result_json
+
+TABLE = {
+    "table_id": "pdfplumber_page_0_table_0",
+    "format": "columnar-v1",
+    "headers": ["Name", "Qty"],
+    "columns": [["Äpfel", None, "Birnen"], {"dictionary": ["3"], "indices": [0, 0, 0]}],
+    "shape": [3, 2],
+    "source": "pdfplumber",
+    "page": 1,
+    "engine": "pdfplumber"
+}
+
+
+class TestTableSpill:
+    """Test cases for the on-disk table spill store"""
+
+    def test_round_trip_in_order(self, tmp_path):
+        with TableSpill(tmp_path) as spill:
+            spill.append(TABLE)
+            spill.append({**TABLE, "table_id": "second", "columns": [[], []], "shape": [0, 2]})
+
+            tables = list(spill)
+
+        assert tables[0] == TABLE
+        assert tables[1]["table_id"] == "second"
+        assert tables[1]["columns"] == [[], []]
+
+    def test_close_removes_files(self, tmp_path):
+        spill = TableSpill(tmp_path)
+        spill.append(TABLE)
+        spill.close()
+
+        assert not spill.path.exists()
+
+    def test_result_json_reads_tables_back_one_at_a_time(self, tmp_path):
+        spill = TableSpill(tmp_path)
+        spill.append(TABLE)
+        spill.append({**TABLE, "table_id": "second"})
+        result = {"file_name": "a.pdf", "tables": spill, "status": "success"}
+
+        decoded = json.loads("".join(iter_result_json(result)))
+
+        assert decoded == {"file_name": "a.pdf", "status": "success", "tables": [TABLE, {**TABLE, "table_id": "second"}]}
+        close_tables(result)
+        assert not spill.path.exists()
+
+    def test_result_json_without_tables(self):
+        for result in ({"tables": []}, {"error": "boom"}):
+            assert json.loads("".join(iter_result_json(result))) == result
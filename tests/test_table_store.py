@@ -0,0 +1,56 @@
+import pytest
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+import pandas as pd
+from table_format import compact_table, table_rows
+from table_store import TableStore, parse_filter
+
+ROWS = [[f"item {i}", str(i), "fruit" if i % 2 else "veg"] for i in range(1000)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TableStore(tmp_path / "tables")
+    df = pd.DataFrame(ROWS, columns=["Name", "Qty", "Kind"])
+    store.put("ext1", [compact_table(df, "docx_table_0")])
+    return store
+
+
+class TestTableStore:
+    """Test cases for windowed reads from the columnar table store"""
+
+    def test_window(self, store):
+        window = store.window("ext1", "docx_table_0", offset=10, limit=5)
+
+        assert table_rows(window) == ROWS[10:15]
+        assert window["total_rows"] == 1000
+        assert window["shape"] == (5, 3)
+
+    def test_column_projection(self, store):
+        window = store.window("ext1", "docx_table_0", limit=2, columns=["Kind", "Name"])
+
+        assert window["headers"] == ["Kind", "Name"]
+        assert table_rows(window) == [["veg", "item 0"], ["fruit", "item 1"]]
+
+    def test_filters(self, store):
+        window = store.window("ext1", "docx_table_0", limit=100,
+                              filters=["Kind:eq:fruit", "Qty:ge:10", "Qty:lt:20", "Name:contains:ITEM 1"])
+
+        # Numeric range, not string ordering ("9" > "10" as text)
+        assert [row[1] for row in table_rows(window)] == ["11", "13", "15", "17", "19"]
+        assert window["total_rows"] == 5
+
+    def test_unknown_table_and_column(self, store):
+        assert store.window("ext1", "missing") is None
+        with pytest.raises(ValueError):
+            store.window("ext1", "docx_table_0", columns=["Price"])
+        with pytest.raises(ValueError):
+            parse_filter("Qty>5")
+
+    def test_delete(self, store):
+        assert store.delete("ext1")
+        assert not store.has("ext1")
@@ -0,0 +1,167 @@
+import pytest
+import asyncio
+import hashlib
+import io
+import os
+import subprocess
+import time
+from pathlib import Path
+import sys
+
+# Add backend to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+from fastapi import UploadFile
+from upload_store import UploadStore, UploadTooLarge, ChunkRejected, OffsetMismatch, ChecksumMismatch
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UploadStore(tmp_path / "uploads", max_bytes=1000, chunk_size=64)
+
+
+def save(store, data, size=None):
+    upload = UploadFile(file=io.BytesIO(data), filename="doc.pdf", size=size)
+    return asyncio.run(store.save(upload, ".pdf"))
+
+
+def write_chunk(store, upload_id, offset, data, sha256=None):
+    async def chunks():
+        yield data
+    sha256 = sha256 or hashlib.sha256(data).hexdigest()
+    return asyncio.run(store.write_chunk(upload_id, offset, chunks(), sha256))
+
+
+class TestUploadStore:
+    """Test cases for the content-addressed upload store"""
+
+    def test_stored_under_hash(self, store):
+        data = b"%PDF" * 100
+
+        stored = save(store, data)
+
+        assert stored["sha256"] == hashlib.sha256(data).hexdigest()
+        assert stored["size"] == len(data)
+        assert Path(stored["path"]).name == f"{stored['sha256']}.pdf"
+        assert Path(stored["path"]).read_bytes() == data
+
+    def test_duplicates_share_a_file(self, store):
+        first = save(store, b"same bytes")
+        second = save(store, b"same bytes")
+
+        assert not first["duplicate"]
+        assert second["duplicate"]
+        assert first["path"] == second["path"]
+        assert [p.name for p in store.root.glob("*.pdf")] == [Path(first["path"]).name]
+
+    def test_declared_size_rejected_up_front(self, store):
+        with pytest.raises(UploadTooLarge):
+            save(store, b"", size=1001)
+
+    def test_streamed_size_rejected(self, store):
+        with pytest.raises(UploadTooLarge):
+            save(store, b"x" * 1001)
+
+        assert [p for p in store.root.iterdir() if p.is_file()] == []
+
+
+class TestResumableUpload:
+    """Test cases for chunked, resumable uploads"""
+
+    def test_chunks_assemble_into_stored_file(self, store):
+        data = b"0123456789" * 50
+        session = store.begin("big.pdf", ".pdf", len(data))
+
+        write_chunk(store, session["upload_id"], 0, data[:200])
+        write_chunk(store, session["upload_id"], 200, data[200:])
+        stored = store.finish(session["upload_id"], hashlib.sha256(data).hexdigest())
+
+        assert Path(stored["path"]).read_bytes() == data
+        assert stored["filename"] == "big.pdf"
+        assert store.status(session["upload_id"]) is None
+
+    def test_corrupt_chunk_discarded(self, store):
+        session = store.begin("big.pdf", ".pdf", 100)
+        write_chunk(store, session["upload_id"], 0, b"a" * 40)
+
+        with pytest.raises(ChecksumMismatch):
+            write_chunk(store, session["upload_id"], 40, b"b" * 40, sha256="0" * 64)
+
+        assert store.status(session["upload_id"])["offset"] == 40
+
+    def test_resume_after_restart(self, store):
+        session = store.begin("big.pdf", ".pdf", 100)
+        write_chunk(store, session["upload_id"], 0, b"a" * 60)
+
+        reopened = UploadStore(store.root, max_bytes=1000)
+
+        assert reopened.status(session["upload_id"])["offset"] == 60
+        with pytest.raises(OffsetMismatch) as error:
+            write_chunk(reopened, session["upload_id"], 0, b"a" * 60)
+        assert error.value.offset == 60
+
+    def test_incomplete_upload_not_finished(self, store):
+        session = store.begin("big.pdf", ".pdf", 100)
+        write_chunk(store, session["upload_id"], 0, b"a" * 60)
+
+        with pytest.raises(OffsetMismatch):
+            store.finish(session["upload_id"])
+
+    def test_chunk_past_declared_size(self, store):
+        session = store.begin("big.pdf", ".pdf", 50)
+
+        with pytest.raises(UploadTooLarge):
+            write_chunk(store, session["upload_id"], 0, b"a" * 60)
+        assert store.status(session["upload_id"])["offset"] == 0
+
+    def test_declared_size_too_large(self, store):
+        with pytest.raises(UploadTooLarge):
+            store.begin("big.pdf", ".pdf", 1001)
+
+    def test_abort(self, store):
+        session = store.begin("big.pdf", ".pdf", 100)
+
+        assert store.abort(session["upload_id"])
+        assert store.status(session["upload_id"]) is None
+        assert not store.abort("../etc")
+
+    def test_upload_being_written_elsewhere(self, store):
+        data = b"a" * 100
+        session = store.begin("big.pdf", ".pdf", len(data))
+        write_chunk(store, session["upload_id"], 0, data)
+
+        # The lock another live worker process holds while it writes a chunk
+        lock_path = store.partial_dir / f"{session['upload_id']}.lock"
+        lock_path.write_text(str(os.getppid()))
+        with pytest.raises(ChunkRejected):
+            store.finish(session["upload_id"])
+        assert store.expire_partial(time.time() + 60) == (0, 0)
+        lock_path.unlink()
+
+        assert Path(store.finish(session["upload_id"])["path"]).read_bytes() == data
+        assert not lock_path.exists()
+
+    def test_lock_of_exited_process_taken_over(self, store):
+        session = store.begin("big.pdf", ".pdf", 40)
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        (store.partial_dir / f"{session['upload_id']}.lock").write_text(str(exited.pid))
+
+        assert write_chunk(store, session["upload_id"], 0, b"a" * 40)["offset"] == 40
+
+    def test_chunk_written_elsewhere_moves_offset(self, store):
+        session = store.begin("big.pdf", ".pdf", 100)
+        stale = store.status(session["upload_id"])
+        write_chunk(store, session["upload_id"], 0, b"a" * 40)
+
+        async def chunks():
+            yield b"b" * 40
+        # A worker that read the status before the chunk above landed
+        other_worker = UploadStore(store.root, max_bytes=1000)
+        reads = [stale]
+        other_worker.status = lambda upload_id: reads.pop() if reads else store.status(upload_id)
+
+        with pytest.raises(OffsetMismatch) as error:
+            asyncio.run(other_worker.write_chunk(session["upload_id"], 0, chunks(),
+                                                 hashlib.sha256(b"b" * 40).hexdigest()))
+        assert error.value.offset == 40